@@ -1,9 +1,20 @@
-from flask import Flask, render_template, request, redirect, session
-from planner import generate_weekly_plan
-from db import get_connection
+import hmac
+import json
+import os
+from datetime import date, time
+from itertools import islice
+
+from flask import Flask, render_template, request, redirect, session, jsonify, Response, stream_with_context
+from planner import (
+    SESSION_STATUSES, due_reviews, get_weekly_plan, iter_plan, set_session_status, simulate_weekly_plan, weekly_plan_since,
+)
+from planner_reviews import MAX_REVIEWS_PER_DAY, NEXT_REVIEW_SQL
+from db import close_request_connection, get_connection, get_pool, init_app
+from cache import bump_data_version, dashboard_cache, data_version, plan_cache
 
 app = Flask(__name__)
 app.secret_key = "simple_secret_key"   # required for sessions
+init_app(app)   # pooled connections are returned at the end of each request
 
 
 # ---------------- LOGIN ----------------
@@ -63,15 +74,11 @@ def register():
 
 
 # ---------------- DASHBOARD ----------------
-@app.route("/dashboard")
-def dashboard():
-    if "user_id" not in session:
-        return redirect("/login")
-
-    user_id = session["user_id"]
-    db = get_connection()
-    cur = db.cursor(dictionary=True)
-
+def fetch_dashboard_rows(cur, user_id):
+    """
+    Topics and exams are fetched with separate queries: joining both to
+    subjects in one query returns topics x exams rows per subject.
+    """
     cur.execute("""
         SELECT 
             s.subject_id,
@@ -82,26 +89,32 @@ def dashboard():
             t.difficulty_level,
             t.importance,
             t.confidence_level,
-            t.hours_required,
-
-            e.exam_id,
-            e.exam_name,
-            e.exam_date
+            t.hours_required
 
         FROM subjects s
         LEFT JOIN topics t ON s.subject_id = t.subject_id
-        LEFT JOIN exams e ON s.subject_id = e.subject_id
         WHERE s.user_id = %s
-        ORDER BY s.created_at DESC, t.topic_id ASC
+        ORDER BY s.created_at DESC, s.subject_id, t.topic_id ASC
     """, (user_id,))
+    topic_rows = cur.fetchall()
 
-    rows = cur.fetchall()
-    cur.close()
-    db.close()
+    cur.execute("""
+        SELECT DISTINCT e.subject_id, e.exam_name, e.exam_date
+        FROM exams e
+        JOIN subjects s ON s.subject_id = e.subject_id
+        WHERE s.user_id = %s
+        ORDER BY e.exam_date
+    """, (user_id,))
+    exam_rows = cur.fetchall()
+
+    return topic_rows, exam_rows
 
+
+def build_dashboard_subjects(topic_rows, exam_rows):
+    """Group the rows of fetch_dashboard_rows() by subject in one pass over each."""
     subjects = {}
 
-    for row in rows:
+    for row in topic_rows:
         sid = row["subject_id"]
 
         if sid not in subjects:
@@ -112,7 +125,6 @@ def dashboard():
                 "exams": []
             }
 
-        # topics
         if row["topic_id"]:
             subjects[sid]["topics"].append({
                 "topic_name": row["topic_name"],
@@ -122,16 +134,38 @@ def dashboard():
                 "hours_required": row["hours_required"]
             })
 
-        # exams (avoid duplicates)
-        if row["exam_id"]:
-            exam = {
+    for row in exam_rows:
+        if row["subject_id"] in subjects:
+            subjects[row["subject_id"]]["exams"].append({
                 "exam_name": row["exam_name"],
                 "exam_date": row["exam_date"]
-            }
-            if exam not in subjects[sid]["exams"]:
-                subjects[sid]["exams"].append(exam)
+            })
+
+    return list(subjects.values())
+
+
+@app.route("/dashboard")
+def dashboard():
+    if "user_id" not in session:
+        return redirect("/login")
+
+    user_id = session["user_id"]
+    db = get_connection()
+    version = data_version(db, user_id)   # read before querying, see VersionedLRUCache
+    subjects = dashboard_cache.get(user_id, version)
+
+    if subjects is None:
+        cur = db.cursor(dictionary=True)
 
-    return render_template("dashboard.html", subjects=list(subjects.values()))
+        topic_rows, exam_rows = fetch_dashboard_rows(cur, user_id)
+
+        cur.close()
+
+        subjects = build_dashboard_subjects(topic_rows, exam_rows)
+        dashboard_cache.put(user_id, version, subjects)
+    db.close()
+
+    return render_template("dashboard.html", subjects=subjects)
 
 
 # ---------------- DELETE SUBJECT ----------------
@@ -166,6 +200,7 @@ def delete_subject(subject_id):
         # 5) Finally delete the subject
         cur.execute("DELETE FROM subjects WHERE subject_id=%s", (subject_id,))
 
+        bump_data_version(cur, (user_id,))
         db.commit()
     except Exception as e:
         db.rollback()
@@ -228,6 +263,7 @@ def add_topics():
                      float(hours[i]))
                 )
 
+            bump_data_version(cur, (user_id,))
             db.commit()
         except Exception as e:
             db.rollback()
@@ -275,9 +311,10 @@ def edit_topics(subject_id):
         try:
             # Update each topic
             for i, tid in enumerate(topic_ids):
-                cur.execute("""
+                cur.execute(f"""
                     UPDATE topics 
-                    SET topic_name=%s, difficulty_level=%s, importance=%s, confidence_level=%s, hours_required=%s
+                    SET topic_name=%s, difficulty_level=%s, importance=%s, confidence_level=%s, hours_required=%s,
+                        next_review_date={NEXT_REVIEW_SQL}
                     WHERE topic_id=%s AND subject_id=%s
                 """, (
                     topic_names[i].strip(),
@@ -288,6 +325,7 @@ def edit_topics(subject_id):
                     int(tid),
                     subject_id
                 ))
+            bump_data_version(cur, (user_id,))
             db.commit()
         except Exception as e:
             db.rollback()
@@ -344,6 +382,7 @@ def exams():
                 (subject_id, exam_name, exam_date)
             )
 
+        bump_data_version(cur, (user_id,))
         db.commit()
         cur.close()
         db.close()
@@ -387,6 +426,7 @@ def preferences():
             ON DUPLICATE KEY UPDATE daily_study_hours = %s
         """, (user_id, hours, hours))
 
+        bump_data_version(cur, (user_id,))
         db.commit()
         cur.close()
         db.close()
@@ -397,6 +437,104 @@ def preferences():
     return render_template("preferences.html")
 
 
+# ---------------- AVAILABILITY ----------------
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def parse_availability_form(form):
+    """
+    (kind, weekday, on_date, start_time, end_time) of an availability form,
+    raising ValueError with the message for the user if it is not valid.
+    """
+    kind = form.get("kind")
+    try:
+        start_time = time.fromisoformat(form["start_time"]) if form.get("start_time") else None
+        end_time = time.fromisoformat(form["end_time"]) if form.get("end_time") else None
+    except ValueError:
+        raise ValueError("Times must be given as HH:MM") from None
+
+    if kind == "weekly":
+        try:
+            weekday = int(form.get("weekday", ""))
+        except ValueError:
+            weekday = None
+        if weekday not in range(7) or start_time is None or end_time is None or start_time >= end_time:
+            raise ValueError("A weekly window needs a weekday and a start before its end")
+        return kind, weekday, None, start_time, end_time
+    if kind == "blackout":
+        try:
+            on_date = date.fromisoformat(form.get("on_date", ""))
+        except ValueError:
+            raise ValueError("A blackout needs a date (YYYY-MM-DD)") from None
+        if (start_time is None) != (end_time is None) or (start_time and start_time >= end_time):
+            raise ValueError("A blackout is a whole day or a start before its end")
+        return kind, None, on_date, start_time, end_time
+    raise ValueError("Unknown availability kind")
+
+
+@app.route("/availability", methods=["GET", "POST"])
+def availability():
+    if "user_id" not in session:
+        return redirect("/login")
+
+    user_id = session["user_id"]
+    db = get_connection()
+    cur = db.cursor(dictionary=True)
+
+    if request.method == "POST":
+        try:
+            kind, weekday, on_date, start_time, end_time = parse_availability_form(request.form)
+        except ValueError as e:
+            cur.close()
+            db.close()
+            return str(e), 400
+
+        if kind == "weekly":
+            cur.execute(
+                "INSERT INTO availability (user_id, kind, weekday, start_time, end_time) VALUES (%s, 'weekly', %s, %s, %s)",
+                (user_id, weekday, start_time, end_time)
+            )
+        else:
+            cur.execute(
+                "INSERT INTO availability (user_id, kind, on_date, start_time, end_time) VALUES (%s, 'blackout', %s, %s, %s)",
+                (user_id, on_date, start_time, end_time)
+            )
+
+        bump_data_version(cur, (user_id,))
+        db.commit()
+        cur.close()
+        db.close()
+        return redirect("/availability")
+
+    cur.execute("""
+        SELECT availability_id, kind, weekday, on_date, start_time, end_time
+        FROM availability
+        WHERE user_id=%s AND (kind='weekly' OR on_date >= CURDATE())
+        ORDER BY kind DESC, weekday, on_date, start_time
+    """, (user_id,))
+    entries = cur.fetchall()
+
+    cur.close()
+    db.close()
+    return render_template("availability.html", entries=entries, weekdays=WEEKDAYS)
+
+
+@app.route("/availability/delete/<int:availability_id>", methods=["POST"])
+def delete_availability(availability_id):
+    if "user_id" not in session:
+        return redirect("/login")
+
+    user_id = session["user_id"]
+    db = get_connection()
+    cur = db.cursor()
+    cur.execute("DELETE FROM availability WHERE availability_id=%s AND user_id=%s", (availability_id, user_id))
+    bump_data_version(cur, (user_id,))
+    db.commit()
+    cur.close()
+    db.close()
+    return redirect("/availability")
+
+
 # ---------------- WEEKLY PLAN ----------------
 @app.route("/plan/weekly")
 def weekly_plan():
@@ -404,9 +542,159 @@ def weekly_plan():
         return redirect("/login")
 
     user_id = session["user_id"]
-    weekly_plan_data = generate_weekly_plan(user_id)
+    weekly_plan_data = get_weekly_plan(user_id)
 
     return render_template("weekly_plan.html", weekly_plan=weekly_plan_data)
 
+
+# Changes to the weekly plan since the one a client shows (?since=, the
+# "version" token of its last response), so it can patch the plan instead of
+# reloading it; "full" answers carry the whole plan
+@app.route("/plan/weekly/changes")
+def weekly_plan_changes():
+    if "user_id" not in session:
+        return jsonify({"error": "Not logged in"}), 401
+
+    plan, version, diff = weekly_plan_since(session["user_id"], request.args.get("since"))
+    return jsonify({"version": version, "full": diff is None, "days": [
+        dict(day, date=day["date"].isoformat()) for day in (plan if diff is None else diff)
+    ]})
+
+
+# Plan up to the user's last exam (or ?days=N days), planned lazily:
+# ?offset=&limit= returns one page of days, ?stream=1 sends all days as JSON
+# lines, each as soon as it is planned
+@app.route("/plan/days")
+def plan_days():
+    if "user_id" not in session:
+        return jsonify({"error": "Not logged in"}), 401
+
+    days = iter_plan(session["user_id"], days=request.args.get("days", type=int))
+
+    if request.args.get("stream"):
+        # The inputs are loaded: don't hold a pooled connection while a slow
+        # client reads the stream (stream_with_context keeps the request alive)
+        close_request_connection()
+
+        def day_lines():
+            for day in days:
+                yield json.dumps(dict(day, date=day["date"].isoformat())) + "\n"
+        return Response(stream_with_context(day_lines()), mimetype="application/x-ndjson")
+
+    offset = max(request.args.get("offset", 0, type=int), 0)
+    limit = min(max(request.args.get("limit", 14, type=int), 1), 100)
+    page = list(islice(days, offset, offset + limit))
+    return jsonify({
+        "offset": offset,
+        "days": [dict(day, date=day["date"].isoformat()) for day in page],
+        "more": next(days, None) is not None,
+    })
+
+
+# What-if planning without touching the saved preferences: POST a JSON body
+# {"variants": [{"daily_hours": 3}, {"priority_weights": {"importance": 0.6}},
+# {"preferred_minutes": 40, "minimum_minutes": 25}], "days": 7}, or GET
+# ?daily_hours=1.5&daily_hours=3 to compare daily hours. Returns the coverage
+# metrics of every variant (planner_engine.plan_metrics()).
+@app.route("/plan/simulate", methods=["GET", "POST"])
+def simulate_plan():
+    if "user_id" not in session:
+        return jsonify({"error": "Not logged in"}), 401
+
+    if request.method == "POST":
+        body = request.get_json(silent=True) or {}
+        variants = body.get("variants") or [{}]
+        days = body.get("days", 7)
+    else:
+        variants = [{"daily_hours": h} for h in request.args.getlist("daily_hours", type=float)] or [{}]
+        days = request.args.get("days", 7, type=int)
+
+    if not isinstance(variants, list) or not all(isinstance(v, dict) for v in variants):
+        return jsonify({"error": "variants must be a list of objects"}), 400
+    if not isinstance(days, int) or not 1 <= days <= 31:
+        return jsonify({"error": "days must be between 1 and 31"}), 400
+    try:
+        results = simulate_weekly_plan(session["user_id"], variants, days=days)
+    except (ValueError, TypeError) as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(results)
+
+
+# ---------------- REVIEWS ----------------
+# Topics due for spaced-repetition review today (?limit=N, default
+# planner_reviews.MAX_REVIEWS_PER_DAY)
+@app.route("/reviews/due")
+def reviews_due():
+    if "user_id" not in session:
+        return jsonify({"error": "Not logged in"}), 401
+
+    limit = max(1, min(request.args.get("limit", MAX_REVIEWS_PER_DAY, type=int), 100))
+    reviews = due_reviews(session["user_id"], limit=limit)
+    return jsonify([
+        dict(r, last_studied=r["last_studied"] and r["last_studied"].isoformat(),
+             next_review_date=r["next_review_date"].isoformat())
+        for r in reviews
+    ])
+
+
+# ---------------- SESSION STATUS ----------------
+@app.route("/sessions/<int:session_id>/<status>", methods=["POST"])
+def update_session_status(session_id, status):
+    if "user_id" not in session:
+        return redirect("/login")
+    if status not in SESSION_STATUSES:
+        return "Unknown session status", 400
+
+    user_id = session["user_id"]
+    db = get_connection()
+    cur = db.cursor()
+
+    try:
+        # Also updates the topic's completed minutes, times_studied, last_studied and next_review_date
+        found = set_session_status(cur, user_id, session_id, status)
+        if found:
+            bump_data_version(cur, (user_id,))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        return f"Error updating session: {str(e)}", 500
+    finally:
+        cur.close()
+        db.close()
+
+    if not found:
+        return "Session not found or not authorized", 403
+    return redirect(request.referrer or "/plan/weekly")
+
+
+# ---------------- METRICS ----------------
+# Scrapers send "Authorization: Bearer <METRICS_TOKEN>"; without a configured
+# token only logged-in users can read the metrics
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+
+def metrics_allowed():
+    if METRICS_TOKEN:
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme == "Bearer" and hmac.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+            return True
+    return "user_id" in session
+
+
+@app.route("/metrics/pool")
+def pool_metrics():
+    if not metrics_allowed():
+        return jsonify({"error": "Not authorized"}), 401
+    # Cheap snapshot of the connection pool counters and histograms, safe to scrape every second
+    return jsonify(get_pool().stats())
+
+
+@app.route("/metrics/cache")
+def cache_metrics():
+    if not metrics_allowed():
+        return jsonify({"error": "Not authorized"}), 401
+    return jsonify({"dashboard": dashboard_cache.stats(), "plan": plan_cache.stats()})
+
+
 if __name__ == "__main__":
     app.run(debug=True)
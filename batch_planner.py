@@ -0,0 +1,136 @@
+"""
+Batch planner: precompute the week plan of every active user (a user with at
+least one topic), e.g. from a nightly or hourly cron job.
+
+Users are streamed in chunks of --chunk-size by user_id. Each chunk is loaded
+with a handful of set-based queries (planner_loader.load_packed_plan_inputs_bulk),
+planned in a pool of --workers processes (planner_engine.plan_weeks with the
+planner.PLANNER_SOLVER planner) and written back in one transaction: the
+chunk's pending sessions in the planned week are replaced by the new plan, so
+running the job twice does not duplicate sessions. Only the main process talks to MySQL; chunks travel to
+and from the workers as plain tuples, which pickle cheaply.
+
+    python batch_planner.py --workers 4 --chunk-size 500
+    python batch_planner.py --dry-run              # plan without writing
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from db import get_connection
+from cache import bump_data_version
+from planner import PLANNER_SOLVER, replace_pending_sessions, session_rows
+from planner_engine import plan_weeks
+from planner_loader import load_packed_plan_inputs_bulk, unpack_plan_inputs
+
+PLAN_DAYS = 7
+
+
+def active_user_chunks(cur, chunk_size):
+    """Yield lists of user_ids with at least one topic, keyset-paginated."""
+    last_user_id = 0
+    while True:
+        cur.execute("""
+            SELECT DISTINCT s.user_id
+            FROM subjects s
+            JOIN topics t ON t.subject_id = s.subject_id
+            WHERE s.user_id > %s
+            ORDER BY s.user_id
+            LIMIT %s
+        """, (last_user_id, chunk_size))
+        user_ids = [r["user_id"] for r in cur.fetchall()]
+        if not user_ids:
+            return
+        yield user_ids
+        last_user_id = user_ids[-1]
+
+
+def plan_chunk(packed, start_date):
+    """Worker: plan a chunk of packed inputs. Returns (user_ids, session rows)."""
+    rows = []
+    for user_id, plan in plan_weeks([unpack_plan_inputs(p) for p in packed], start_date, PLAN_DAYS, PLANNER_SOLVER):
+        for day in plan:
+            rows.extend(session_rows(user_id, day["date"], day["sessions"]))
+    return [p[0] for p in packed], rows
+
+
+def write_plans(db, user_ids, rows, start_date):
+    """Replace the pending sessions of the planned users for the planned week."""
+    if not user_ids:
+        return 0
+    cur = db.cursor()
+    try:
+        replace_pending_sessions(cur, user_ids, start_date, start_date + datetime.timedelta(days=PLAN_DAYS), rows)
+        # The app's workers see the new sessions at their next read of the version
+        bump_data_version(cur, user_ids)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cur.close()
+    return len(rows)
+
+
+def run(start_date, workers, chunk_size, dry_run=False):
+    db = get_connection()
+    read_cur = db.cursor(dictionary=True)
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 0 else None
+    in_flight = deque()   # chunks being planned while the next ones load, written in order
+    users = sessions = 0
+    started = time.perf_counter()
+
+    def write_oldest():
+        nonlocal users, sessions
+        planned = in_flight.popleft()
+        user_ids, rows = planned.result() if pool is not None else planned
+        users += len(user_ids)
+        if not dry_run:
+            sessions += write_plans(db, user_ids, rows, start_date)
+        elapsed = time.perf_counter() - started
+        print(f"{users} users, {sessions} sessions written, {users / elapsed:,.1f} users/s", file=sys.stderr)
+
+    try:
+        for user_ids in active_user_chunks(read_cur, chunk_size):
+            packed = load_packed_plan_inputs_bulk(read_cur, user_ids, start_date)
+            db.commit()   # end the read snapshot before writing
+            if pool is not None:
+                in_flight.append(pool.submit(plan_chunk, packed, start_date))
+            else:
+                in_flight.append(plan_chunk(packed, start_date))
+            if len(in_flight) > max(workers, 1):
+                write_oldest()
+        while in_flight:
+            write_oldest()
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        read_cur.close()
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    return users, sessions, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="planning processes, 0 plans in this process (default: CPU count)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="users loaded, planned and written together")
+    parser.add_argument("--start-date", type=datetime.date.fromisoformat, default=None,
+                        help="first day of the plans, YYYY-MM-DD (default: today)")
+    parser.add_argument("--dry-run", action="store_true", help="plan without writing sessions")
+    args = parser.parse_args()
+
+    start_date = args.start_date or datetime.date.today()
+    users, sessions, elapsed = run(start_date, args.workers, args.chunk_size, args.dry_run)
+    rate = users / elapsed if elapsed else 0.0
+    print(f"planned {users} users from {start_date} in {elapsed:.2f}s ({rate:,.1f} users/s), {sessions} sessions written")
+
+
+if __name__ == "__main__":
+    main()
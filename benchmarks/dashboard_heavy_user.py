@@ -0,0 +1,183 @@
+"""
+Dashboard benchmark with a synthetic heavy user.
+
+Compares the former dashboard data path (subjects LEFT JOIN topics LEFT JOIN
+exams, deduplicated with `exam not in list`) with the current one
+(app.fetch_dashboard_rows + app.build_dashboard_subjects).
+
+By default the rows are generated in memory, which measures the Python side
+only. With --db a synthetic user is inserted into the database configured for
+db.py (DB_* / DATABASE_URL), both paths run their queries against it, and the
+user is deleted again afterwards.
+
+    python benchmarks/dashboard_heavy_user.py --subjects 20 --topics 200 --exams 8
+    python benchmarks/dashboard_heavy_user.py --db
+"""
+import argparse
+import datetime
+import os
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import build_dashboard_subjects, fetch_dashboard_rows  # noqa: E402
+
+JOIN_QUERY = """
+    SELECT
+        s.subject_id, s.subject_name,
+        t.topic_id, t.topic_name, t.difficulty_level, t.importance,
+        t.confidence_level, t.hours_required,
+        e.exam_id, e.exam_name, e.exam_date
+    FROM subjects s
+    LEFT JOIN topics t ON s.subject_id = t.subject_id
+    LEFT JOIN exams e ON s.subject_id = e.subject_id
+    WHERE s.user_id = %s
+    ORDER BY s.created_at DESC, t.topic_id ASC
+"""
+
+
+def build_from_join(rows):
+    """The former dashboard assembly, kept here for comparison."""
+    subjects = {}
+    for row in rows:
+        sid = row["subject_id"]
+        if sid not in subjects:
+            subjects[sid] = {"subject_id": sid, "subject_name": row["subject_name"], "topics": [], "exams": []}
+        if row["topic_id"]:
+            subjects[sid]["topics"].append({
+                "topic_name": row["topic_name"],
+                "difficulty_level": row["difficulty_level"],
+                "importance": row["importance"],
+                "confidence_level": row["confidence_level"],
+                "hours_required": row["hours_required"],
+            })
+        if row["exam_id"]:
+            exam = {"exam_name": row["exam_name"], "exam_date": row["exam_date"]}
+            if exam not in subjects[sid]["exams"]:
+                subjects[sid]["exams"].append(exam)
+    return list(subjects.values())
+
+
+def synthetic_rows(n_subjects, n_topics, n_exams):
+    today = datetime.date.today()
+    topic_rows, exam_rows, join_rows = [], [], []
+    topic_id = exam_id = 0
+    for sid in range(1, n_subjects + 1):
+        topics = []
+        for i in range(n_topics):
+            topic_id += 1
+            topics.append({
+                "subject_id": sid, "subject_name": f"Subject {sid}",
+                "topic_id": topic_id, "topic_name": f"Topic {sid}.{i}",
+                "difficulty_level": "Medium", "importance": "High",
+                "confidence_level": 3, "hours_required": 2.5,
+            })
+        exams = []
+        for i in range(n_exams):
+            exam_id += 1
+            exams.append({
+                "subject_id": sid, "exam_id": exam_id,
+                "exam_name": f"Exam {i}", "exam_date": today + datetime.timedelta(days=7 * (i + 1)),
+            })
+        topic_rows.extend(topics)
+        exam_rows.extend(exams)
+        for topic in topics:
+            for exam in exams:
+                join_rows.append(dict(topic, **exam))
+    return topic_rows, exam_rows, join_rows
+
+
+def timed(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_in_memory(args):
+    topic_rows, exam_rows, join_rows = synthetic_rows(args.subjects, args.topics, args.exams)
+    old_time, _ = timed(lambda: build_from_join(join_rows), args.repeat)
+    new_time, _ = timed(lambda: build_dashboard_subjects(topic_rows, exam_rows), args.repeat)
+    print(f"rows: join={len(join_rows):,} split={len(topic_rows) + len(exam_rows):,}")
+    print(f"join + dedup   {old_time * 1e3:9.2f}ms")
+    print(f"split + linear {new_time * 1e3:9.2f}ms  ({old_time / new_time:,.1f}x)")
+
+
+def seed_user(cnx, args):
+    cur = cnx.cursor()
+    name = f"bench_{uuid.uuid4().hex[:12]}"
+    cur.execute(
+        "INSERT INTO users (username, email, password) VALUES (%s,%s,%s)",
+        (name, f"{name}@example.com", "bench"),
+    )
+    user_id = cur.lastrowid
+    today = datetime.date.today()
+    for s in range(args.subjects):
+        cur.execute("INSERT INTO subjects (user_id, subject_name) VALUES (%s,%s)", (user_id, f"Subject {s}"))
+        subject_id = cur.lastrowid
+        cur.executemany(
+            "INSERT INTO topics (subject_id, topic_name, difficulty_level, importance, confidence_level, hours_required) "
+            "VALUES (%s,%s,'Medium','High',3,2.5)",
+            [(subject_id, f"Topic {s}.{i}") for i in range(args.topics)],
+        )
+        cur.executemany(
+            "INSERT INTO exams (subject_id, exam_name, exam_date) VALUES (%s,%s,%s)",
+            [(subject_id, f"Exam {i}", today + datetime.timedelta(days=7 * (i + 1))) for i in range(args.exams)],
+        )
+    cnx.commit()
+    cur.close()
+    return user_id
+
+
+def run_db(args):
+    from db import get_connection
+
+    cnx = get_connection()
+    user_id = seed_user(cnx, args)
+    try:
+        cur = cnx.cursor(dictionary=True)
+
+        def old_path():
+            cur.execute(JOIN_QUERY, (user_id,))
+            rows = cur.fetchall()
+            return len(rows), build_from_join(rows)
+
+        def new_path():
+            topic_rows, exam_rows = fetch_dashboard_rows(cur, user_id)
+            return len(topic_rows) + len(exam_rows), build_dashboard_subjects(topic_rows, exam_rows)
+
+        old_time, (old_rows, _) = timed(old_path, args.repeat)
+        new_time, (new_rows, _) = timed(new_path, args.repeat)
+        cur.close()
+        print(f"rows: join={old_rows:,} split={new_rows:,}")
+        print(f"join + dedup   {old_time * 1e3:9.2f}ms")
+        print(f"split + linear {new_time * 1e3:9.2f}ms  ({old_time / new_time:,.1f}x)")
+    finally:
+        cur = cnx.cursor()
+        cur.execute("DELETE FROM users WHERE user_id=%s", (user_id,))  # cascades to the synthetic data
+        cnx.commit()
+        cur.close()
+        cnx.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subjects", type=int, default=20)
+    parser.add_argument("--topics", type=int, default=200, help="topics per subject")
+    parser.add_argument("--exams", type=int, default=8, help="exams per subject")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per path, the best one is reported")
+    parser.add_argument("--db", action="store_true", help="run the queries against a seeded synthetic user")
+    args = parser.parse_args()
+    print(f"synthetic user: {args.subjects} subjects x {args.topics} topics x {args.exams} exams")
+    if args.db:
+        run_db(args)
+    else:
+        run_in_memory(args)
+
+
+if __name__ == "__main__":
+    main()
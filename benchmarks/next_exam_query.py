@@ -0,0 +1,116 @@
+"""
+Next-exam query benchmark.
+
+Seeds one planner user (--subjects subjects with --exams exams each) in the
+database configured for db.py (DB_* / DATABASE_URL), then grows the exams
+table with other users' exams and times, at every size, the former global
+query (all exams, grouped by subject) and planner_loader.NEXT_EXAMS_SQL
+(scoped to the user's subjects). The scoped query should stay flat.
+Everything seeded is deleted at the end.
+
+    python benchmarks/next_exam_query.py --steps 0 10000 100000 500000
+"""
+import argparse
+import datetime
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import get_connection  # noqa: E402
+from planner_loader import NEXT_EXAMS_SQL  # noqa: E402
+
+GLOBAL_SQL = "SELECT subject_id, MIN(exam_date) AS next_exam FROM exams WHERE exam_date >= %s GROUP BY subject_id"
+FILLER_SUBJECTS_PER_USER = 10
+BATCH = 5000
+
+
+def create_user(cur, n_subjects):
+    name = f"bench_{uuid.uuid4().hex[:12]}"
+    cur.execute(
+        "INSERT INTO users (username, email, password) VALUES (%s,%s,%s)",
+        (name, f"{name}@example.com", "bench"),
+    )
+    user_id = cur.lastrowid
+    cur.executemany(
+        "INSERT INTO subjects (user_id, subject_name) VALUES (%s,%s)",
+        [(user_id, f"Subject {i}") for i in range(n_subjects)],
+    )
+    cur.execute("SELECT subject_id FROM subjects WHERE user_id=%s", (user_id,))
+    return user_id, [r[0] for r in cur.fetchall()]
+
+
+def add_exams(cur, subject_ids, count, rng, today):
+    for start in range(0, count, BATCH):
+        cur.executemany(
+            "INSERT INTO exams (subject_id, exam_name, exam_date) VALUES (%s,%s,%s)",
+            [
+                (rng.choice(subject_ids), "Exam", today + datetime.timedelta(days=rng.randint(-60, 120)))
+                for _ in range(min(BATCH, count - start))
+            ],
+        )
+
+
+def time_query(cur, sql, params, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cur.execute(sql, params)
+        cur.fetchall()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, nargs="+", default=[0, 10000, 100000, 500000],
+                        help="exams of other users in the table at each measurement")
+    parser.add_argument("--subjects", type=int, default=8)
+    parser.add_argument("--exams", type=int, default=3, help="exams per subject of the measured user")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    today = datetime.date.today()
+    cnx = get_connection()
+    cur = cnx.cursor()
+    user_ids = []
+    try:
+        user_id, subject_ids = create_user(cur, args.subjects)
+        user_ids.append(user_id)
+        add_exams(cur, subject_ids, args.subjects * args.exams, rng, today)
+        cnx.commit()
+
+        filler_subjects = []
+        seeded = 0
+        print(f"{'other exams':>12} {'global':>10} {'scoped':>10}")
+        for target in sorted(args.steps):
+            while seeded < target:
+                if not filler_subjects or len(filler_subjects) * 50 < seeded:
+                    uid, sids = create_user(cur, FILLER_SUBJECTS_PER_USER)
+                    user_ids.append(uid)
+                    filler_subjects.extend(sids)
+                count = min(BATCH, target - seeded)
+                add_exams(cur, filler_subjects, count, rng, today)
+                seeded += count
+                cnx.commit()
+            cur.execute("ANALYZE TABLE exams")
+            cur.fetchall()
+            global_time = time_query(cur, GLOBAL_SQL, (today,), args.repeat)
+            scoped_time = time_query(cur, NEXT_EXAMS_SQL, (today, user_id), args.repeat)
+            print(f"{seeded:>12,} {global_time * 1e3:>8.2f}ms {scoped_time * 1e3:>8.2f}ms")
+    finally:
+        for uid in user_ids:
+            cur.execute("DELETE FROM users WHERE user_id=%s", (uid,))   # cascades to subjects and exams
+        cnx.commit()
+        cur.close()
+        cnx.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+What-if simulation benchmark.
+
+Evaluates a grid of variants (daily hours x importance weight) for one
+synthetic user with planner_engine.simulate_plans, which scores the topics
+once, against planning each variant from scratch with plan_week (as a reload
+of /plan/weekly per variant does, minus the database). Checks that the
+variant with the current settings reproduces plan_week exactly. Allocation
+dominates both; the larger saving of the endpoint is loading the inputs once.
+
+    python benchmarks/plan_simulation.py --sizes 100 1000 10000
+"""
+import argparse
+import datetime
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planner_engine import PRIORITY_WEIGHTS, plan_week, simulate_plans  # noqa: E402
+from planner_loader import TopicRecord  # noqa: E402
+
+START_DATE = datetime.date(2025, 1, 6)
+DAILY_HOURS = 2.0
+
+
+def synthetic_user(rng, n_topics):
+    n_subjects = max(1, n_topics // 8)
+    topics = []
+    for tid in range(1, n_topics + 1):
+        hours = rng.choice([0.5, 1.0, 2.0, 4.0])
+        topics.append(TopicRecord(
+            tid, rng.randint(1, n_subjects), "Subject", f"Topic {tid}",
+            rng.randint(1, 5), rng.randint(1, 5), rng.randint(1, 5), hours, int(hours * 60),
+        ))
+    next_exam_by_subject = {
+        sid: START_DATE + datetime.timedelta(days=rng.randint(0, 40))
+        for sid in range(1, n_subjects + 1) if rng.random() < 0.8
+    }
+    return topics, next_exam_by_subject
+
+
+def variant_grid():
+    return [
+        {"daily_hours": hours, "priority_weights": {"importance": importance}}
+        for hours in (1.0, 2.0, 3.0, 4.0, 6.0)
+        for importance in (0.1, 0.3, 0.6, 0.9)
+    ]
+
+
+def from_scratch(topics, exams, variants):
+    weights = dict(PRIORITY_WEIGHTS)
+    plans = []
+    try:
+        for v in variants:
+            PRIORITY_WEIGHTS.update(v["priority_weights"])
+            plans.append(plan_week(topics, v["daily_hours"], exams, START_DATE))
+    finally:
+        PRIORITY_WEIGHTS.update(weights)
+    return plans
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    variants = variant_grid()
+    print(f"{len(variants)} variants, one week (median of {args.repeat})")
+    print(f"{'topics':>8} {'from scratch':>14} {'simulate':>12}")
+    for n in args.sizes:
+        topics, exams = synthetic_user(random.Random(args.seed), n)
+        result = simulate_plans(topics, DAILY_HOURS, exams, START_DATE, [{}], include_plans=True)
+        if result[0]["plan"] != plan_week(topics, DAILY_HOURS, exams, START_DATE):
+            print(f"{n} topics: simulate_plans differs from plan_week")
+            sys.exit(1)
+        scratch_times, simulate_times = [], []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            from_scratch(topics, exams, variants)
+            scratch_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            simulate_plans(topics, DAILY_HOURS, exams, START_DATE, variants)
+            simulate_times.append(time.perf_counter() - start)
+        print(f"{n:>8} {statistics.median(scratch_times) * 1e3:>12.1f}ms {statistics.median(simulate_times) * 1e3:>10.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Weekly allocator benchmark.
+
+Times planning a week for synthetic topics with the former day loop of
+generate_weekly_plan (per-day scoring and sort-and-rescan greedy passes, kept
+as the reference in tests/planner_reference.py) and with
+planner_engine.plan_week (week scoring and heap allocator). That both plan
+the same sessions is tested by tests/test_planner_allocator.py.
+
+    python benchmarks/planner_allocator.py --sizes 100 1000 10000
+"""
+import argparse
+import copy
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests"))
+
+from planner_reference import engine_week, reference_week, synthetic_user  # noqa: E402
+
+
+def bench(sizes, daily_minutes, repeat, seed):
+    start_date = datetime.date(2025, 1, 6)
+    print(f"time to plan a week, {daily_minutes} min/day")
+    print(f"{'topics':>8} {'reference':>12} {'engine':>12}")
+    for n in sizes:
+        topics_by_id, exams = synthetic_user(random.Random(seed), n, start_date)
+        row = []
+        for week in (reference_week, engine_week):
+            best = float("inf")
+            for _ in range(repeat):
+                data = copy.deepcopy(topics_by_id)
+                start = time.perf_counter()
+                week(data, exams, daily_minutes, start_date)
+                best = min(best, time.perf_counter() - start)
+            row.append(best)
+        print(f"{n:>8} {row[0] * 1e3:>10.2f}ms {row[1] * 1e3:>10.2f}ms  ({row[0] / row[1]:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--daily-minutes", type=int, default=600)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    bench(args.sizes, args.daily_minutes, args.repeat, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Incremental re-planning benchmark.
+
+Plans a week for synthetic topics, then applies random change events
+(completed sessions, topic edits, moved exams, see tests/planner_events.py)
+and times planner_engine.replan_week for each against a full
+plan_week_state() for the same inputs. That both plan the same week is
+tested by tests/test_planner_replan.py.
+
+    python benchmarks/planner_replan.py --sizes 100 1000 10000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests"))
+
+from planner_events import START_DATE, apply_change, random_event, synthetic_topics  # noqa: E402
+from planner_engine import plan_week_state, replan_week  # noqa: E402
+
+
+def bench(sizes, daily_hours, events, seed):
+    print(f"time per change event, {daily_hours} h/day (median of {events} events)")
+    print(f"{'topics':>8} {'full':>12} {'replan':>12}")
+    for n in sizes:
+        rng = random.Random(seed)
+        topics, exams = synthetic_topics(rng, n)
+        state = plan_week_state(topics, daily_hours, exams, START_DATE)
+        full_times, replan_times = [], []
+        for _ in range(events):
+            new_topics, new_exams = apply_change(state, random_event(rng, state))
+            start = time.perf_counter()
+            plan_week_state(new_topics, daily_hours, new_exams, START_DATE)
+            full_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            state, _ = replan_week(state, new_topics, daily_hours, new_exams)
+            replan_times.append(time.perf_counter() - start)
+        full, replan = statistics.median(full_times), statistics.median(replan_times)
+        print(f"{n:>8} {full * 1e3:>10.2f}ms {replan * 1e3:>10.2f}ms  ({full / replan:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--daily-hours", type=float, default=2.0)
+    parser.add_argument("--events", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    bench(args.sizes, args.daily_hours, args.events, args.seed)
+
+
+if __name__ == "__main__":
+    main()
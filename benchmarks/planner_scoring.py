@@ -0,0 +1,102 @@
+"""
+Topic scoring benchmark.
+
+Scores synthetic topics for a week three ways and checks they agree exactly:
+- loop: compute_priority_score/compute_urgency_multiplier per topic per day, as
+  generate_weekly_plan did before score_topics()
+- scalar: planner_engine.score_topics without NumPy (static part computed once)
+- numpy: planner_engine.score_topics, all days in one vectorized pass (if installed)
+
+    python benchmarks/planner_scoring.py --sizes 100 1000 10000 100000
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import planner_engine  # noqa: E402
+from planner_engine import compute_priority_score, compute_urgency_multiplier  # noqa: E402
+from planner_loader import TopicRecord  # noqa: E402
+
+
+def loop_scores(topics, next_exam_by_subject, start_date, days=7):
+    scores = []
+    for day_offset in range(days):
+        plan_date = start_date + datetime.timedelta(days=day_offset)
+        row = []
+        for t in topics:
+            next_exam = next_exam_by_subject.get(t.subject_id)
+            days_until = (next_exam - plan_date).days if next_exam else None
+            priority_score = compute_priority_score(t.difficulty, t.importance, t.confidence)
+            urgency_multiplier = compute_urgency_multiplier(days_until if days_until is not None else 9999)
+            spaced = 1.2 if t.confidence < 3 else 1.0
+            row.append(priority_score * urgency_multiplier * spaced)
+        scores.append(row)
+    return scores
+
+
+def scalar_scores(topics, next_exam_by_subject, start_date):
+    numpy, planner_engine.np = planner_engine.np, None
+    try:
+        return planner_engine.score_topics(topics, next_exam_by_subject, start_date)[1]
+    finally:
+        planner_engine.np = numpy
+
+
+def numpy_scores(topics, next_exam_by_subject, start_date):
+    return planner_engine.score_topics(topics, next_exam_by_subject, start_date)[1]
+
+
+def synthetic_topics(n, start_date, seed):
+    rng = random.Random(seed)
+    n_subjects = max(1, n // 10)
+    topics = [
+        TopicRecord(i, rng.randint(1, n_subjects), "", "", rng.randint(1, 5), rng.randint(1, 5), rng.randint(1, 5), 1.0, 60)
+        for i in range(n)
+    ]
+    exams = {
+        sid: start_date + datetime.timedelta(days=rng.randint(-5, 45))
+        for sid in range(1, n_subjects + 1) if rng.random() < 0.8
+    }
+    return topics, exams
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    start_date = datetime.date(2025, 1, 6)
+    variants = [("loop", loop_scores), ("scalar", scalar_scores)]
+    if planner_engine.np is not None:
+        variants.append(("numpy", numpy_scores))
+    else:
+        print("NumPy not installed, skipping the vectorized path")
+
+    print(f"{'topics':>8}" + "".join(f"{name:>12}" for name, _ in variants))
+    for n in args.sizes:
+        topics, exams = synthetic_topics(n, start_date, args.seed)
+        expected = None
+        timings = []
+        for name, fn in variants:
+            best = float("inf")
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                scores = fn(topics, exams, start_date)
+                best = min(best, time.perf_counter() - start)
+            if expected is None:
+                expected = scores
+            elif scores != expected:
+                sys.exit(f"{name} scores differ from the loop for {n} topics")
+            timings.append(best)
+        print(f"{n:>8}" + "".join(f"{t * 1e3:>10.2f}ms" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Greedy vs optimal week planner: plan quality and runtime.
+
+Plans synthetic users with planner_engine.plan_week (greedy, day by day) and
+planner_engine.solve_week (whole week at once) and reports, summed over the
+users of each size:
+- coverage: priority-weighted minutes booked before each topic's exam, the
+  objective solve_week maximises (weights: effective priority on day 0)
+- late: minutes booked on or after a topic's exam day (wasted for the exam)
+- idle: day minutes left unbooked
+and the median time to plan one user. solve_week plans are also checked for
+validity (session lengths, day budget, topic minutes, exam windows).
+
+    python benchmarks/planner_solver.py --sizes 20 200 2000 --users 50
+    python benchmarks/planner_solver.py --budget-ms 20      # fail if 200 topics take longer
+"""
+import argparse
+import datetime
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planner_engine import (  # noqa: E402
+    SESSION_MINIMUM_MINUTES,
+    SESSION_PREFERRED_MINUTES,
+    daily_minutes_for,
+    plan_week,
+    score_topics,
+    solve_week,
+)
+from planner_loader import TopicRecord  # noqa: E402
+
+START_DATE = datetime.date(2025, 1, 6)
+DAYS = 7
+
+
+def synthetic_user(rng, n_topics):
+    n_subjects = max(1, n_topics // 8)
+    topics = []
+    for tid in range(1, n_topics + 1):
+        hours = rng.choice([0.5, 1.0, 1.5, 2.0, 3.0, 5.0])
+        topics.append(TopicRecord(
+            tid, rng.randint(1, n_subjects), "Subject", f"Topic {tid}",
+            rng.randint(1, 5), rng.randint(1, 5), rng.randint(1, 5), hours,
+            int(hours * 60) - rng.choice([0, 0, 0, 15, 30, 60]),
+        ))
+    next_exam_by_subject = {
+        sid: START_DATE + datetime.timedelta(days=rng.randint(0, 45))
+        for sid in range(1, n_subjects + 1) if rng.random() < 0.8
+    }
+    daily_hours = rng.choice([1.0, 1.5, 2.0, 3.0, 4.5, 6.0])
+    return topics, next_exam_by_subject, daily_hours
+
+
+def evaluate(plan, topics, next_exam_by_subject, daily_hours):
+    """(coverage, late minutes, idle minutes, problems) of a plan."""
+    active = [t for t in topics if t.remaining_minutes > 0]
+    days_until, scores = score_topics(active, next_exam_by_subject, START_DATE, days=1)
+    weight = {t.topic_id: w for t, w in zip(active, scores[0])}
+    exam_day = {t.topic_id: du for t, du in zip(active, days_until)}
+    remaining = {t.topic_id: t.remaining_minutes for t in active}
+    daily_minutes = daily_minutes_for(daily_hours)
+
+    coverage = late = idle = 0
+    problems = []
+    for day_offset, day in enumerate(plan):
+        used = 0
+        for s in day["sessions"]:
+            tid, minutes = s["topic_id"], s["duration_minutes"]
+            used += minutes
+            remaining[tid] -= minutes
+            du = exam_day[tid]
+            if du is None or day_offset < du or (du <= 0 and day_offset == 0):
+                coverage += weight[tid] * minutes
+            else:
+                late += minutes
+            if not SESSION_MINIMUM_MINUTES <= minutes <= SESSION_PREFERRED_MINUTES:
+                problems.append(f"day {day_offset}: {minutes} min session")
+        if used > daily_minutes:
+            problems.append(f"day {day_offset}: {used} of {daily_minutes} min booked")
+        idle += daily_minutes - used
+    problems += [f"topic {tid} overbooked" for tid, left in remaining.items() if left < 0]
+    return coverage, late, idle, problems
+
+
+def compare(sizes, users, seed):
+    print(f"{'topics':>7} {'planner':>8} {'coverage':>12} {'late min':>10} {'idle min':>10} {'time/user':>11}")
+    for n in sizes:
+        rng = random.Random(seed)
+        cases = [synthetic_user(rng, n) for _ in range(users)]
+        for name, week in (("greedy", plan_week), ("optimal", solve_week)):
+            coverage = late = idle = 0
+            timings = []
+            for topics, exams, daily_hours in cases:
+                start = time.perf_counter()
+                plan = week(topics, daily_hours, exams, START_DATE, DAYS)
+                timings.append(time.perf_counter() - start)
+                c, lt, i, problems = evaluate(plan, topics, exams, daily_hours)
+                if problems and week is solve_week:
+                    print(f"invalid solve_week plan ({n} topics): {problems[:3]}")
+                    return 1
+                coverage, late, idle = coverage + c, late + lt, idle + i
+            print(f"{n:>7} {name:>8} {coverage:>12,.0f} {late:>10,} {idle:>10,} {statistics.median(timings) * 1e3:>9.2f}ms")
+    return 0
+
+
+def check_budget(budget_ms, seed, repeat=20):
+    rng = random.Random(seed)
+    topics, exams, _ = synthetic_user(rng, 200)
+    timings = []
+    for daily_hours in (1.0, 3.0, 6.0) * repeat:
+        start = time.perf_counter()
+        solve_week(topics, daily_hours, exams, START_DATE, DAYS)
+        timings.append(time.perf_counter() - start)
+    worst = max(timings) * 1e3
+    print(f"solve_week, 200 topics x {DAYS} days: median {statistics.median(timings) * 1e3:.2f}ms, "
+          f"max {worst:.2f}ms (budget {budget_ms}ms)")
+    return 0 if worst < budget_ms else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 200, 2000])
+    parser.add_argument("--users", type=int, default=50, help="synthetic users per size")
+    parser.add_argument("--budget-ms", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    sys.exit(compare(args.sizes, args.users, args.seed) or check_budget(args.budget_ms, args.seed))
+
+
+if __name__ == "__main__":
+    main()
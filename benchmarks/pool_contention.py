@@ -0,0 +1,97 @@
+"""
+Pool contention benchmark.
+
+Many threads check connections in and out of two pools ("primary" and
+"replica") pointing at the database configured for db.py (DB_* / DATABASE_URL).
+With --reconfigure-every N the primary pool gets a new configuration every N
+checkouts, which forces a reconnect of each of its connections; the replica
+numbers show whether those reconnects stall checkouts of the other pool.
+
+    python benchmarks/pool_contention.py --threads 64 --iterations 500
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import DB_CONFIG  # noqa: E402  (also puts the vendored connector on sys.path)
+from mysql.connector import pooling  # noqa: E402
+
+
+def worker(pool, iterations, query, latencies, reconfigure_every):
+    for i in range(iterations):
+        start = time.perf_counter()
+        cnx = pool.get_connection()
+        latencies.append(time.perf_counter() - start)
+        if query:
+            cur = cnx.cursor()
+            cur.execute("SELECT 1")
+            cur.fetchall()
+            cur.close()
+        cnx.close()
+        if reconfigure_every and i % reconfigure_every == reconfigure_every - 1:
+            pool.set_config(**DB_CONFIG)
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=32, help="threads per pool")
+    parser.add_argument("--iterations", type=int, default=200, help="checkouts per thread")
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--validation", default="interval", choices=pooling.CNX_POOL_VALIDATION_POLICIES)
+    parser.add_argument("--reconfigure-every", type=int, default=0, help="force primary reconnects every N checkouts")
+    parser.add_argument("--query", action="store_true", help="run SELECT 1 on each checkout")
+    args = parser.parse_args()
+
+    pools = {
+        name: pooling.MySQLConnectionPool(
+            pool_name=f"bench_{name}",
+            pool_size=args.pool_size,
+            pool_block=True,
+            pool_validation=args.validation,
+            **DB_CONFIG
+        )
+        for name in ("primary", "replica")
+    }
+    latencies = {name: [] for name in pools}
+
+    threads = []
+    for name, pool in pools.items():
+        reconfigure = args.reconfigure_every if name == "primary" else 0
+        for _ in range(args.threads):
+            threads.append(threading.Thread(
+                target=worker,
+                args=(pool, args.iterations, args.query, latencies[name], reconfigure),
+            ))
+
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(v) for v in latencies.values())
+    print(f"{len(threads)} threads, {total} checkouts in {elapsed:.2f}s ({total / elapsed:,.0f}/s)")
+    for name, values in latencies.items():
+        print(
+            f"{name:8} checkout p50={statistics.median(values) * 1e3:.3f}ms "
+            f"p99={percentile(values, 99) * 1e3:.3f}ms max={max(values) * 1e3:.3f}ms "
+            f"wait={pools[name].wait_stats} validation={pools[name].validation_stats}"
+        )
+
+    for pool in pools.values():
+        pool._remove_connections()
+
+
+if __name__ == "__main__":
+    main()
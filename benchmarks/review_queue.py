@@ -0,0 +1,98 @@
+"""
+Spaced-repetition review queue benchmark.
+
+For users with n studied topics, times taking one day's due reviews from a
+planner_reviews.ReviewQueue (O(k log n) once built) against scanning and
+sorting every topic's due date, and checks both pick the same topics. Then
+plans a 30-day horizon with planner_engine.plan_week and reports the most
+reviews and review minutes any day got, which stay within MAX_REVIEWS_PER_DAY
+and MAX_REVIEW_SHARE of the day however many topics are due. A plan builds
+its queue from the topics due within its horizon only (review_scheduler()):
+one pass over the topics keeping the MAX_REVIEWS_PER_DAY per day most
+overdue, shared by all its days; "build" times that for a week.
+
+    python benchmarks/review_queue.py --sizes 1000 10000 100000
+"""
+import argparse
+import datetime
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planner_engine import plan_week  # noqa: E402
+from planner_loader import TopicRecord  # noqa: E402
+from planner_reviews import MAX_REVIEWS_PER_DAY, REVIEW_MINUTES, review_scheduler  # noqa: E402
+
+START_DATE = datetime.date(2025, 1, 6)
+
+
+def studied_topics(rng, n_topics):
+    """Finished topics, each studied a few times and due within +-60 days."""
+    return [
+        TopicRecord(
+            tid, rng.randint(1, max(1, n_topics // 8)), "Subject", f"Topic {tid}",
+            rng.randint(1, 5), rng.randint(1, 5), rng.randint(1, 5), 1.0, 0,
+            rng.randint(1, 6), START_DATE + datetime.timedelta(days=rng.randint(-60, 60)),
+        )
+        for tid in range(1, n_topics + 1)
+    ]
+
+
+def scan_due(topics, day, limit):
+    due = sorted((t.next_review_date, i) for i, t in enumerate(topics) if t.next_review_date <= day)
+    return [i for _, i in due[:limit]]
+
+
+def bench(sizes, repeat, seed):
+    print(f"one day's {MAX_REVIEWS_PER_DAY} due reviews (median of {repeat})")
+    print(f"{'topics':>8} {'scan+sort':>12} {'queue':>12} {'build':>12}")
+    for n in sizes:
+        rng = random.Random(seed)
+        topics = studied_topics(rng, n)
+        scan_times, pop_times, build_times = [], [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            expected = scan_due(topics, START_DATE, MAX_REVIEWS_PER_DAY)
+            scan_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            queue = review_scheduler(topics, START_DATE, 7).queue
+            build_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            taken = queue.pop_due(START_DATE, MAX_REVIEWS_PER_DAY)
+            pop_times.append(time.perf_counter() - start)
+            if taken != expected:
+                print(f"{n} topics: queue and scan disagree")
+                return 1
+        print(f"{n:>8} {statistics.median(scan_times) * 1e6:>10.1f}us {statistics.median(pop_times) * 1e6:>10.1f}us "
+              f"{statistics.median(build_times) * 1e3:>10.2f}ms")
+    return 0
+
+
+def review_load(n_topics, seed, daily_hours=2.0, days=30):
+    topics = studied_topics(random.Random(seed), n_topics)
+    start = time.perf_counter()
+    plan = plan_week(topics, daily_hours, {}, START_DATE, days)
+    elapsed = time.perf_counter() - start
+    per_day = [sum(1 for s in day["sessions"] if s.get("review")) for day in plan]
+    print(f"{n_topics} topics, {days} days at {daily_hours} h/day: at most {max(per_day)} reviews "
+          f"({max(per_day) * REVIEW_MINUTES} min) a day, {sum(per_day)} in total, planned in {elapsed * 1e3:.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    if bench(args.sizes, args.repeat, args.seed):
+        sys.exit(1)
+    review_load(max(args.sizes), args.seed)
+
+
+if __name__ == "__main__":
+    main()
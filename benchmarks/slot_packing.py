@@ -0,0 +1,78 @@
+"""
+Slot packing benchmark.
+
+Packs sessions into a dense calendar of --sizes free slots (short gaps between
+busy periods, stretched past one day for the larger sizes) two ways and checks
+they agree:
+- scan: earliest slot that fits by a linear scan over the slots
+- index: planner_slots.SlotIndex, a segment tree over the slots (O(log n))
+
+    python benchmarks/slot_packing.py --sizes 100 1000 10000 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planner_engine import BREAK_MINUTES, SESSION_MINIMUM_MINUTES, SESSION_PREFERRED_MINUTES  # noqa: E402
+from planner_slots import SlotIndex  # noqa: E402
+
+
+def dense_slots(rng, n):
+    slots = []
+    t = 0
+    for _ in range(n):
+        t += rng.randint(5, 60)        # busy
+        length = rng.choice([10, 15, 20, 30, 45, 60, 90])
+        slots.append((t, t + length))
+        t += length
+    return slots
+
+
+def scan_pack(slots, durations):
+    free = [list(s) for s in slots]
+    starts = []
+    for minutes in durations:
+        start = None
+        for slot in free:
+            if slot[1] - slot[0] >= minutes:
+                start = slot[0]
+                slot[0] = min(start + minutes + BREAK_MINUTES, slot[1])
+                break
+        starts.append(start)
+    return starts
+
+
+def index_pack(slots, durations):
+    index = SlotIndex(slots)
+    return [index.place(minutes, BREAK_MINUTES) for minutes in durations]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000])
+    parser.add_argument("--sessions", type=int, default=2000, help="sessions packed per size")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'slots':>8} {'scan/session':>14} {'index/session':>15}")
+    for n in args.sizes:
+        rng = random.Random(args.seed)
+        slots = dense_slots(rng, n)
+        durations = [rng.randint(SESSION_MINIMUM_MINUTES, SESSION_PREFERRED_MINUTES) for _ in range(args.sessions)]
+        timings = []
+        results = []
+        for pack in (scan_pack, index_pack):
+            start = time.perf_counter()
+            results.append(pack(slots, durations))
+            timings.append((time.perf_counter() - start) / len(durations))
+        if results[0] != results[1]:
+            sys.exit(f"SlotIndex placements differ from the scan for {n} slots")
+        print(f"{n:>8} {timings[0] * 1e6:>12.1f}us {timings[1] * 1e6:>13.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# In-process caches for data derived from a user's rows (dashboard, plans).
+# Every user has a data version, users.data_version, which a write to the
+# user's subjects, topics, exams, preferences, availability or study sessions
+# bumps in its own transaction (bump_data_version()). Cached entries remember
+# the version they were built from and are ignored once it moved on, so
+# invalidating never has to scan a cache. The version lives in the database,
+# so a commit invalidates the caches of every worker process at once, and of
+# the app when batch_planner.py writes plans; reading it is one primary key
+# lookup per request. CACHE_MAX_AGE only bounds how long an entry is kept
+# (0 disables expiry).
+DASHBOARD_CACHE_SIZE = int(os.environ.get("DASHBOARD_CACHE_SIZE", 1024))  # users
+PLAN_CACHE_SIZE = int(os.environ.get("PLAN_CACHE_SIZE", 1024))  # (user, start date) pairs
+PLAN_HISTORY_SIZE = int(os.environ.get("PLAN_HISTORY_SIZE", 4096))  # (user, start date, version) plans
+CACHE_MAX_AGE = float(os.environ.get("CACHE_MAX_AGE", 60))  # seconds, 0 disables
+
+
+DATA_VERSION_SQL = "SELECT data_version FROM users WHERE user_id=%s"
+
+
+def data_version(db, user_id):
+    """The user's shared data version (users.data_version), 0 for an unknown user."""
+    cur = db.cursor()
+    try:
+        cur.execute(DATA_VERSION_SQL, (user_id,))
+        row = cur.fetchone()
+    finally:
+        cur.close()
+    return row[0] if row else 0
+
+
+def bump_data_version(cur, user_ids):
+    """Bump the data version of user_ids inside the caller's transaction, before it commits."""
+    user_ids = list(user_ids)
+    if user_ids:
+        cur.execute(
+            f"UPDATE users SET data_version = data_version + 1 "
+            f"WHERE user_id IN ({', '.join(['%s'] * len(user_ids))})",
+            user_ids
+        )
+
+
+class VersionedLRUCache:
+    """
+    Bounded LRU cache whose entries are only valid for the version they were
+    stored with. Read the version before loading the data to cache: a write
+    committed while loading then bumps it and the entry is never served.
+    """
+
+    def __init__(self, maxsize, max_age=None):
+        self.maxsize = maxsize
+        self.max_age = max_age or None
+        self._entries = OrderedDict()  # key -> (version, stored_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, version):
+        """Return the value cached for key at version, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == version and (
+                    self.max_age is None or time.monotonic() - entry[1] < self.max_age
+                ):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[2]
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def lookup(self, key, version):
+        """
+        Like get(), but returns (value, fresh): an entry stored for an older
+        version, or expired, comes back with fresh=False instead of None, for
+        callers that can update it incrementally and put() the result.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            if entry[0] == version and (
+                self.max_age is None or time.monotonic() - entry[1] < self.max_age
+            ):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2], True
+            self.misses += 1
+            return entry[2], False
+
+    def put(self, key, version, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (version, time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+dashboard_cache = VersionedLRUCache(DASHBOARD_CACHE_SIZE, CACHE_MAX_AGE)
+plan_cache = VersionedLRUCache(PLAN_CACHE_SIZE, CACHE_MAX_AGE)
+# Plans served for recent versions, the baselines of /plan/weekly/changes
+plan_history = VersionedLRUCache(PLAN_HISTORY_SIZE, CACHE_MAX_AGE)
@@ -6,8 +6,12 @@ CREATE TABLE IF NOT EXISTS users (
   username VARCHAR(50) NOT NULL UNIQUE,
   email VARCHAR(255) NOT NULL UNIQUE,
   password VARCHAR(255) NOT NULL,
-  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+  -- bumped in the same transaction as every write to the user's data; the
+  -- caches of all worker processes key on it (see cache.py)
+  data_version INT UNSIGNED NOT NULL DEFAULT 0
 );
+-- existing databases: ALTER TABLE users ADD COLUMN data_version INT UNSIGNED NOT NULL DEFAULT 0;
 select * from users;
 USE study_planner;
 
@@ -32,9 +36,22 @@ CREATE TABLE IF NOT EXISTS topics (
     hours_required DECIMAL(4,1) DEFAULT 1.0,
     last_studied DATE DEFAULT NULL,
     times_studied INT DEFAULT 0,
+    -- rollup of completed study_sessions, kept by planner.set_session_status(),
+    -- rebuilt by reconcile_completed_minutes.py
+    completed_minutes INT NOT NULL DEFAULT 0,
+    -- spaced repetition: last_studied plus planner_reviews.review_interval_days(),
+    -- NULL if never studied; kept in the same statements as the rollup
+    next_review_date DATE DEFAULT NULL,
     FOREIGN KEY (subject_id) REFERENCES subjects(subject_id) ON DELETE CASCADE,
-    UNIQUE(subject_id, topic_name)
+    UNIQUE(subject_id, topic_name),
+    -- a user's due reviews are a range read per subject on this index
+    INDEX idx_topics_subject_review (subject_id, next_review_date)
 );
+-- existing databases: ALTER TABLE topics ADD COLUMN completed_minutes INT NOT NULL DEFAULT 0;
+--                     then run reconcile_completed_minutes.py once to backfill it
+-- existing databases: ALTER TABLE topics ADD COLUMN next_review_date DATE DEFAULT NULL,
+--                         ADD INDEX idx_topics_subject_review (subject_id, next_review_date);
+--                     then run reconcile_completed_minutes.py once to backfill it
 
 -- ---------------- Exams ----------------
 CREATE TABLE IF NOT EXISTS exams (
@@ -42,8 +59,11 @@ CREATE TABLE IF NOT EXISTS exams (
     subject_id INT NOT NULL,
     exam_name VARCHAR(255) NOT NULL,
     exam_date DATE NOT NULL,
-    FOREIGN KEY (subject_id) REFERENCES subjects(subject_id) ON DELETE CASCADE
+    FOREIGN KEY (subject_id) REFERENCES subjects(subject_id) ON DELETE CASCADE,
+    -- next exam per subject: the planner's MIN(exam_date) per subject is a range read on this index
+    INDEX idx_exams_subject_date (subject_id, exam_date)
 );
+-- existing databases: ALTER TABLE exams ADD INDEX idx_exams_subject_date (subject_id, exam_date);
 
 -- ---------------- Study Sessions ----------------
 CREATE TABLE IF NOT EXISTS study_sessions (
@@ -60,6 +80,22 @@ CREATE TABLE IF NOT EXISTS study_sessions (
     INDEX(user_id, scheduled_date)
 );
 
+-- ---------------- Availability ----------------
+-- When the user can study: weekly windows (kind 'weekly', weekday 0 = Monday)
+-- and blackouts on given dates (kind 'blackout', the whole day without times).
+-- Without weekly windows every day is open from 08:00, as before.
+CREATE TABLE IF NOT EXISTS availability (
+    availability_id INT AUTO_INCREMENT PRIMARY KEY,
+    user_id INT NOT NULL,
+    kind ENUM('weekly','blackout') NOT NULL,
+    weekday TINYINT DEFAULT NULL CHECK (weekday BETWEEN 0 AND 6),
+    on_date DATE DEFAULT NULL,
+    start_time TIME DEFAULT NULL,
+    end_time TIME DEFAULT NULL,
+    FOREIGN KEY (user_id) REFERENCES users(user_id) ON DELETE CASCADE,
+    INDEX idx_availability_user (user_id, kind, on_date)
+);
+
 -- ---------------- User Preferences ----------------
 CREATE TABLE IF NOT EXISTS user_preferences (
     preference_id INT AUTO_INCREMENT PRIMARY KEY,
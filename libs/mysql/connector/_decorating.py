@@ -73,7 +73,8 @@ def cmd_refresh_verify_options() -> Callable:
 def handle_read_write_timeout() -> Callable:
     """
     Decorator to close the current connection if a read or a write timeout
-    is raised by the method passed via the func parameter.
+    is raised by the method passed via the func parameter. Errors which may
+    have broken the connection are recorded (see `connection_errored`).
     """
 
     def decorator(cnx_method: Callable) -> Callable:
@@ -84,6 +85,7 @@ def handle_read_write_timeout() -> Callable:
             try:
                 return cnx_method(cnx, *args, **kwargs)
             except Exception as err:
+                cnx._note_connection_error(err)  # pylint: disable=protected-access
                 if isinstance(err, TimeoutError):
                     cnx.close()
                 raise err
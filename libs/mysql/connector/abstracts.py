@@ -90,6 +90,7 @@ from .errors import (
     Error,
     InterfaceError,
     NotSupportedError,
+    OperationalError,
     ProgrammingError,
 )
 from .opentelemetry.constants import (
@@ -167,6 +168,19 @@ MYSQL_PY_TYPES = (
     timedelta,
 )
 
+# Statements which leave the session state (variables, temporary tables, locks,
+# prepared statements, ...) untouched. Anything else marks the session dirty.
+SESSION_NEUTRAL_STATEMENT_RE = re.compile(
+    rb"\s*(?:SELECT|INSERT|UPDATE|DELETE|REPLACE|WITH|SHOW|DESCRIBE|DESC|EXPLAIN"
+    rb"|COMMIT|ROLLBACK|BEGIN|START\s+TRANSACTION)\b|\s*\(",
+    re.IGNORECASE,
+)
+# Expressions inside otherwise neutral statements which change the session state
+SESSION_STATE_EXPRESSION_RE = re.compile(
+    rb"INTO\s+@|@[\w$.]+\s*:=|GET_LOCK\s*\(",
+    re.IGNORECASE,
+)
+
 
 class CMySQLPrepStmt(GenericWrapper):
     """Structure to represent a result from `CMySQLConnection.cmd_stmt_prepare`.
@@ -238,6 +252,8 @@ class MySQLConnectionAbstract(ABC):
         self._have_next_result: bool = False
         self._raw: bool = False
         self._in_transaction: bool = False
+        self._session_dirty: bool = False
+        self._connection_errored: bool = False
         self._allow_local_infile: bool = DEFAULT_CONFIGURATION["allow_local_infile"]
         self._allow_local_infile_in_path: Optional[str] = DEFAULT_CONFIGURATION[
             "allow_local_infile_in_path"
@@ -1015,6 +1031,62 @@ class MySQLConnectionAbstract(ABC):
             ```
         """
 
+    @property
+    def session_dirty(self) -> bool:
+        """Returns bool to indicate whether the session state may have changed.
+
+        The value is `True` once a statement was sent which can leave state behind
+        in the session (user or session variables, temporary tables, named or table
+        locks, prepared statements, a different default database, ...). It is
+        reset to `False` when the connection is (re)established, the user is
+        changed or the session is reset.
+
+        The tracking is done on the client by looking at the statements sent, and
+        errs on the side of reporting a dirty session. Open transactions are
+        reported by `in_transaction`.
+        """
+        return self._session_dirty
+
+    @property
+    def connection_errored(self) -> bool:
+        """Returns bool to indicate whether the connection may be broken.
+
+        The value is `True` once a command failed with an `InterfaceError` or
+        `OperationalError` (lost connection, socket error, timeout, ...), which
+        can leave the connection unusable without the caller noticing, e.g.
+        when the error is handled. It is reset to `False` when the connection
+        is (re)established. Connection pools use it to validate such a
+        connection before handing it out again.
+        """
+        return self._connection_errored
+
+    def _note_connection_error(self, err: BaseException) -> None:
+        """Records an error which may have broken the connection.
+
+        Args:
+            err: Exception raised by a command.
+        """
+        if isinstance(err, (InterfaceError, OperationalError)):
+            self._connection_errored = True
+
+    def _track_session_state(self, statement: Union[bytes, bytearray]) -> None:
+        """Marks the session dirty if the statement can change the session state.
+
+        Args:
+            statement: Statement(s) about to be sent to the server.
+        """
+        if self._session_dirty:
+            return
+        for part in statement.split(b";") if b";" in statement else (statement,):
+            if not part.strip():
+                continue
+            if not SESSION_NEUTRAL_STATEMENT_RE.match(part) or (
+                (b"@" in part or b"_LOCK" in part.upper())
+                and SESSION_STATE_EXPRESSION_RE.search(part)
+            ):
+                self._session_dirty = True
+                return
+
     @deprecated(DEPRECATED_METHOD_WARNING.format(property_name="client_flags"))
     def set_client_flags(self, flags: Union[int, Sequence[int]]) -> int:
         """Sets the client flags.
@@ -1561,6 +1633,8 @@ class MySQLConnectionAbstract(ABC):
             self.sql_mode = self._sql_mode
         if self._init_command:
             self._execute_query(self._init_command)
+        self._session_dirty = False
+        self._connection_errored = False
 
     @abstractmethod
     def close(self) -> None:
@@ -35,9 +35,20 @@ import os
 import random
 import re
 import sys
+import time
 
 from types import TracebackType
-from typing import TYPE_CHECKING, Any, Dict, NoReturn, Optional, Tuple, Type, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    List,
+    NoReturn,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 from uuid import UUID, uuid4
 
 from mysql.connector.constants import CNX_POOL_ARGS
@@ -57,7 +68,15 @@ from ..errors import (
     PoolError,
     ProgrammingError,
 )
-from ..pooling import DEFAULT_CONFIGURATION, generate_pool_name, read_option_files
+from ..pooling import (
+    CNX_POOL_AGE_BUCKETS,
+    CNX_POOL_LATENCY_BUCKETS,
+    CNX_POOL_REAPER_MAX_INTERVAL,
+    DEFAULT_CONFIGURATION,
+    PoolHistogram,
+    generate_pool_name,
+    read_option_files,
+)
 from .connection import MySQLConnection
 
 if TYPE_CHECKING:
@@ -375,7 +394,10 @@ class PooledMySQLConnection:
         cnx = self._cnx
         try:
             if self._cnx_pool.can_reset_session and await cnx.is_connected():
+                start = time.perf_counter()
                 await cnx.reset_session()
+                # pylint: disable=protected-access
+                self._cnx_pool._reset_time.observe(time.perf_counter() - start)
         finally:
             await self._cnx_pool.add_connection(cnx)
             self._cnx = None
@@ -406,6 +428,10 @@ class MySQLConnectionPool:
         pool_size: int = 5,
         pool_name: Optional[str] = None,
         pool_reset_session: bool = True,
+        pool_min_size: int = 0,
+        pool_max_idle_time: Optional[float] = None,
+        pool_max_lifetime: Optional[float] = None,
+        pool_lazy: bool = False,
         **kwargs: Any,
     ) -> None:
         """Constructor.
@@ -413,6 +439,16 @@ class MySQLConnectionPool:
         Initialize a MySQL connection pool with a maximum number of
         connections set to `pool_size`.
 
+        `initialize_pool()` opens the connections concurrently. With
+        `pool_lazy`, only `pool_min_size` connections are opened up front and
+        the others when they are first needed.
+
+        The pool shrinks when connections stay idle longer than
+        `pool_max_idle_time`, but never below `pool_min_size` connections, and
+        grows back on demand up to `pool_size`. Connections older than
+        `pool_max_lifetime` are closed and replaced. Both are enforced by a
+        background task started by `initialize_pool()` when either is set.
+
         NOTE: The coroutine `await cnxpool.initialize_pool(**dbconfig)` must be called
         after initializing this class to open up the pool of required number of database
         connections and making the instance of MySQLConnectionPool ready-to-use.
@@ -426,6 +462,14 @@ class MySQLConnectionPool:
             pool_size:  The pool size. If this argument is not given, the default is 5.
             pool_reset_session: Whether to reset session variables when the connection
                                 is returned to the pool.
+            pool_min_size: Number of connections kept open when evicting idle
+                           connections. Default is 0.
+            pool_max_idle_time: Seconds after which an unused connection is
+                                closed. None (default) disables idle eviction.
+            pool_max_lifetime: Seconds after which a connection is closed and
+                               replaced. None (default) means no limit.
+            pool_lazy: Whether to open only `pool_min_size` connections when
+                       initializing the pool. Default is False.
 
         Examples:
             ```
@@ -453,11 +497,30 @@ class MySQLConnectionPool:
         self._set_pool_size(pool_size)
         if pool_name:
             self._set_pool_name(pool_name)
+        if pool_min_size < 0 or pool_min_size > self._pool_size:
+            raise AttributeError(
+                f"Pool minimum size should be between 0 and {self._pool_size}"
+            )
+        self._min_size: int = pool_min_size
+        self._max_idle_time: Optional[float] = pool_max_idle_time
+        self._max_lifetime: Optional[float] = pool_max_lifetime
+        self._lazy: bool = pool_lazy
         self._cnx_config: Dict[str, Any] = kwargs
-        self._cnx_queue: asyncio.Queue[MySQLConnectionAbstract] = asyncio.Queue(
-            self._pool_size
+        # LIFO, so surplus connections stay unused long enough to be evicted
+        self._cnx_queue: asyncio.LifoQueue[MySQLConnectionAbstract] = (
+            asyncio.LifoQueue(self._pool_size)
         )
+        # Creation and last release time of every connection owned by the pool
+        self._cnx_created: Dict[MySQLConnectionAbstract, float] = {}
+        self._cnx_last_used: Dict[MySQLConnectionAbstract, float] = {}
+        self._cnx_opening: int = 0
+        self._checkout_time: PoolHistogram = PoolHistogram(CNX_POOL_LATENCY_BUCKETS)
+        self._reset_time: PoolHistogram = PoolHistogram(CNX_POOL_LATENCY_BUCKETS)
+        self._exhausted: int = 0
+        self._reconnects: int = 0
+        self._reconnect_failures: int = 0
         self._config_version: UUID = uuid4()
+        self._reaper_task: Optional[asyncio.Task] = None
 
     async def initialize_pool(self) -> None:
         """Opens the connection pool and fill with MySQL database connections.
@@ -476,10 +539,13 @@ class MySQLConnectionPool:
                 self._set_pool_name(generate_pool_name(**self._cnx_config))
         if self._cnx_config:
             await self.set_config(**self._cnx_config)
-            cnt = 0
-            while cnt < self._pool_size:
-                await self.add_connection()
-                cnt += 1
+            await self._warm_up(self._min_size if self._lazy else self._pool_size)
+
+        limits = [t for t in (self._max_idle_time, self._max_lifetime) if t]
+        if limits and self._reaper_task is None:
+            self._reaper_task = asyncio.create_task(
+                self._run_reaper(min(min(limits) / 2, CNX_POOL_REAPER_MAX_INTERVAL))
+            )
 
     @property
     def pool_name(self) -> str:
@@ -496,6 +562,60 @@ class MySQLConnectionPool:
         """Returns whether to reset session."""
         return self._reset_session
 
+    @property
+    def min_size(self) -> int:
+        """Returns the number of connections kept open when evicting."""
+        return self._min_size
+
+    @property
+    def open_connections(self) -> int:
+        """Returns number of open connections, in use or idle."""
+        return len(self._cnx_created)
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns a snapshot of the pool statistics.
+
+        Taking a snapshot only copies counters, so it can be polled
+        frequently, for example by a metrics endpoint.
+
+        The returned dictionary contains:
+
+        - `pool_name`, `pool_size` and `min_size`: the pool configuration.
+        - `open`, `in_use`, `idle` and `opening`: the current number of
+          connections in each state.
+        - `checkouts` and `checkout_time`: the number of checkouts and a
+          histogram of their duration, validation included.
+        - `exhausted`: how many checkouts found no idle connection and no room
+          to open a new one.
+        - `reconnects` and `reconnect_failures`: reconnects done on checkout.
+        - `reset_time`: a histogram of the session reset duration.
+        - `connection_age`: a histogram of the age of open connections.
+
+        Histograms are dictionaries as returned by `PoolHistogram.snapshot()`,
+        durations and ages are in seconds.
+        """
+        now = time.monotonic()
+        idle = self._cnx_queue.qsize()
+        connection_age = PoolHistogram(CNX_POOL_AGE_BUCKETS)
+        for created in self._cnx_created.values():
+            connection_age.observe(now - created)
+        return {
+            "pool_name": self._pool_name,
+            "pool_size": self._pool_size,
+            "min_size": self._min_size,
+            "open": len(self._cnx_created),
+            "in_use": len(self._cnx_created) - idle,
+            "idle": idle,
+            "opening": self._cnx_opening,
+            "checkouts": self._checkout_time.count,
+            "checkout_time": self._checkout_time.snapshot(),
+            "exhausted": self._exhausted,
+            "reconnects": self._reconnects,
+            "reconnect_failures": self._reconnect_failures,
+            "reset_time": self._reset_time.snapshot(),
+            "connection_age": connection_age.snapshot(),
+        }
+
     async def set_config(self, **kwargs: Any) -> None:
         """Set the connection configuration for `MySQLConnectionAbstract` subclass instances.
         This method sets the configuration used for creating `MySQLConnectionAbstract`
@@ -560,6 +680,7 @@ class MySQLConnectionPool:
                 "Connection instance not subclass of MySQLConnectionAbstract"
             )
 
+        self._cnx_last_used[cnx] = time.monotonic()
         try:
             self._cnx_queue.put_nowait(cnx)
         except asyncio.QueueFull as err:
@@ -589,30 +710,141 @@ class MySQLConnectionPool:
         if self._cnx_queue.full():
             raise PoolError("Failed adding connection; queue is full")
 
+        if cnx is None or cnx not in self._cnx_created:
+            if len(self._cnx_created) + self._cnx_opening >= self._pool_size:
+                raise PoolError("Failed adding connection; pool is full")
+
         if not cnx:
-            cnx = await connect(**self._cnx_config)
-            try:
-                if (
-                    self._reset_session
-                    and self._cnx_config["compress"]
-                    and cnx.get_server_version() < (5, 7, 3)
-                ):
-                    raise NotSupportedError(
-                        "Pool reset session is not supported with "
-                        "compression for MySQL server version 5.7.2 "
-                        "or earlier"
-                    )
-            except KeyError:
-                pass
+            self._cnx_opening += 1
+            cnx = await self._grow()
+        elif not isinstance(cnx, MYSQL_CNX_CLASS):
+            raise PoolError(
+                "Connection instance not subclass of MySQLConnectionAbstract"
+            )
 
-            cnx.pool_config_version = self._config_version
-        else:
-            if not isinstance(cnx, MYSQL_CNX_CLASS):
-                raise PoolError(
-                    "Connection instance not subclass of MySQLConnectionAbstract"
+        self._cnx_created.setdefault(cnx, time.monotonic())
+        self._queue_connection(cnx)
+
+    async def _open_connection(self) -> MySQLConnectionAbstract:
+        """Open a new connection using the pool configuration.
+
+        The connection is not registered with the pool.
+        """
+        cnx = await connect(**self._cnx_config)
+        try:
+            if (
+                self._reset_session
+                and self._cnx_config["compress"]
+                and cnx.get_server_version() < (5, 7, 3)
+            ):
+                raise NotSupportedError(
+                    "Pool reset session is not supported with "
+                    "compression for MySQL server version 5.7.2 "
+                    "or earlier"
                 )
+        except KeyError:
+            pass
 
-        self._queue_connection(cnx)
+        cnx.pool_config_version = self._config_version
+        return cnx
+
+    async def _warm_up(self, count: int) -> None:
+        """Open up to `count` connections concurrently and queue them.
+
+        Raises the first error met after queueing the connections which could
+        be opened.
+        """
+        count = min(
+            count, self._pool_size - len(self._cnx_created) - self._cnx_opening
+        )
+        if count <= 0:
+            return
+        self._cnx_opening += count
+
+        results = await asyncio.gather(
+            *(self._grow() for _ in range(count)), return_exceptions=True
+        )
+        errors = []
+        for result in results:
+            if isinstance(result, BaseException):
+                errors.append(result)
+            else:
+                self._queue_connection(result)
+        if errors:
+            raise errors[0]
+
+    async def _grow(self) -> MySQLConnectionAbstract:
+        """Open a connection for a slot reserved through `_cnx_opening`."""
+        try:
+            cnx = await self._open_connection()
+        finally:
+            self._cnx_opening -= 1
+        self._cnx_created[cnx] = time.monotonic()
+        return cnx
+
+    def _forget_connection(self, cnx: MySQLConnectionAbstract) -> None:
+        """Stop tracking a connection."""
+        self._cnx_created.pop(cnx, None)
+        self._cnx_last_used.pop(cnx, None)
+
+    @staticmethod
+    async def _close_quietly(cnx: MySQLConnectionAbstract) -> None:
+        """Disconnect, ignoring errors from connections already broken."""
+        try:
+            await cnx.disconnect()
+        except Error:
+            pass
+
+    def _is_expired(self, cnx: MySQLConnectionAbstract, now: float) -> bool:
+        """Whether the connection outlived `pool_max_lifetime`."""
+        return bool(self._max_lifetime) and (
+            now - self._cnx_created.get(cnx, now) >= self._max_lifetime
+        )
+
+    async def _run_reaper(self, interval: float) -> None:
+        """Background task evicting idle and expired connections."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._reap_connections()
+            except Error:
+                pass  # Replenishing failed, will be retried on the next run
+
+    async def _reap_connections(self) -> None:
+        """Close idle and expired connections and replenish to `pool_min_size`.
+
+        Connections to close are taken out of the queue before any I/O is
+        awaited, so concurrent checkouts never get hold of them.
+        """
+        now = time.monotonic()
+        evicted: List[MySQLConnectionAbstract] = []
+        idle = []
+        while not self._cnx_queue.empty():
+            idle.append(self._cnx_queue.get_nowait())
+        # Oldest first, so they are the first to go and are queued back
+        # below the most recently used ones
+        remaining = len(self._cnx_created)
+        for cnx in reversed(idle):
+            idle_time = now - self._cnx_last_used.get(cnx, now)
+            if self._is_expired(cnx, now) or (
+                self._max_idle_time
+                and idle_time >= self._max_idle_time
+                and remaining > self._min_size
+            ):
+                self._forget_connection(cnx)
+                evicted.append(cnx)
+                remaining -= 1
+            else:
+                self._cnx_queue.put_nowait(cnx)
+
+        for cnx in evicted:
+            await self._close_quietly(cnx)
+
+        while self._cnx_config and (
+            len(self._cnx_created) + self._cnx_opening < self._min_size
+        ):
+            self._cnx_opening += 1
+            self._queue_connection(await self._grow())
 
     async def get_connection(self) -> PooledMySQLConnection:
         """Gets a connection from the pool.
@@ -626,23 +858,38 @@ class MySQLConnectionPool:
             PoolError: On errors.
         """
 
+        start = time.perf_counter()
         try:
             cnx = self._cnx_queue.get_nowait()
         except asyncio.QueueEmpty as err:
-            raise PoolError("Failed getting connection; pool exhausted") from err
+            if len(self._cnx_created) + self._cnx_opening >= self._pool_size:
+                self._exhausted += 1
+                raise PoolError("Failed getting connection; pool exhausted") from err
+            self._cnx_opening += 1
+            cnx = await self._grow()
+
+        if self._is_expired(cnx, time.monotonic()):
+            # Recycle the connection, keeping its slot for the new one
+            self._forget_connection(cnx)
+            self._cnx_opening += 1
+            await self._close_quietly(cnx)
+            cnx = await self._grow()
 
         if (
             not await cnx.is_connected()
             or self._config_version != cnx.pool_config_version
         ):
+            self._reconnects += 1
             try:
                 cnx._set_connection_options(**self._cnx_config)
                 await cnx.reconnect()
             except InterfaceError:
+                self._reconnect_failures += 1
                 self._queue_connection(cnx)
                 raise
             cnx.pool_config_version = self._config_version
 
+        self._checkout_time.observe(time.perf_counter() - start)
         return PooledMySQLConnection(self, cnx)
 
     async def _remove_connections(self) -> int:
@@ -662,6 +909,7 @@ class MySQLConnectionPool:
         while cnxq.qsize():
             try:
                 cnx = cnxq.get_nowait()
+                self._forget_connection(cnx)
                 await cnx.disconnect()
                 cnt += 1
             except asyncio.QueueEmpty:
@@ -685,4 +933,7 @@ class MySQLConnectionPool:
             PoolError: On errors while fetching connections from the pool or while disconnecting
             an open connection.
         """
+        if self._reaper_task is not None:
+            self._reaper_task.cancel()
+            self._reaper_task = None
         return await self._remove_connections()
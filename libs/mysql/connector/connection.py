@@ -874,6 +874,7 @@ class MySQLConnection(MySQLConnectionAbstract):
 
         Returns a dict()
         """
+        self._session_dirty = True  # a different default database stays with the session
         return self._handle_ok(
             self._send_cmd(ServerCmd.INIT_DB, database.encode("utf-8"))
         )
@@ -896,6 +897,7 @@ class MySQLConnection(MySQLConnectionAbstract):
         # Set/Reset internal state related to query execution
         self._query = query
         self._local_infile_filenames = None
+        self._track_session_state(query)
 
         # Prepare query attrs
         charset = self.charset if self.charset != "utf8mb4" else "utf8"
@@ -1030,6 +1032,7 @@ class MySQLConnection(MySQLConnectionAbstract):
             if isinstance(statements, str):
                 statements = statements.encode("utf8")
             statements = bytearray(statements)
+        self._track_session_state(statements)
 
         if self._client_flags & ClientFlag.CLIENT_QUERY_ATTRIBUTES:
             # int<lenenc>    parameter_count    Number of parameters
@@ -1580,6 +1583,7 @@ class MySQLConnection(MySQLConnectionAbstract):
         """
         read_timeout = kwargs.get("read_timeout", None)
         write_timeout = kwargs.get("write_timeout", None)
+        self._session_dirty = True  # the statement lives on until it is closed
 
         packet = self._send_cmd(
             ServerCmd.STMT_PREPARE,
@@ -554,11 +554,13 @@ class CMySQLConnection(MySQLConnectionAbstract):
                 prep_stmt.free_result()
             else:
                 self.free_result()
-            if hasattr(err, "errno"):
-                raise get_mysql_exception(
-                    err.errno, msg=err.msg, sqlstate=err.sqlstate
-                ) from err
-            raise InterfaceError(str(err)) from err
+            exc = (
+                get_mysql_exception(err.errno, msg=err.msg, sqlstate=err.sqlstate)
+                if hasattr(err, "errno")
+                else InterfaceError(str(err))
+            )
+            self._note_connection_error(exc)
+            raise exc from err
 
         return rows, _eof
 
@@ -612,6 +614,7 @@ class CMySQLConnection(MySQLConnectionAbstract):
 
     def cmd_init_db(self, database: str) -> None:
         """Change the current database"""
+        self._session_dirty = True  # a different default database stays with the session
         try:
             self._cmysql.select_db(database)
         except MySQLInterfaceError as err:
@@ -678,6 +681,7 @@ class CMySQLConnection(MySQLConnectionAbstract):
         if not self._cmysql:
             raise OperationalError("MySQL Connection not available")
 
+        self._session_dirty = True  # the statement lives on until it is closed
         try:
             stmt = self._cmysql.stmt_prepare(statement)
             stmt.converter_str_fallback = self._converter_str_fallback
@@ -768,6 +772,7 @@ class CMySQLConnection(MySQLConnectionAbstract):
             # Set/Reset internal state related to query execution
             self._query = query
             self._local_infile_filenames = None
+            self._track_session_state(query)
 
             self._cmysql.query(
                 query,
@@ -777,15 +782,18 @@ class CMySQLConnection(MySQLConnectionAbstract):
                 query_attrs=self.query_attrs,
             )
         except MySQLInterfaceError as err:
-            if hasattr(err, "errno"):
-                raise get_mysql_exception(
-                    err.errno, msg=err.msg, sqlstate=err.sqlstate
-                ) from err
-            raise InterfaceError(str(err)) from err
+            exc = (
+                get_mysql_exception(err.errno, msg=err.msg, sqlstate=err.sqlstate)
+                if hasattr(err, "errno")
+                else InterfaceError(str(err))
+            )
+            self._note_connection_error(exc)
+            raise exc from err
         except AttributeError as err:
             addr = (
                 self._unix_socket if self._unix_socket else f"{self._host}:{self._port}"
             )
+            self._connection_errored = True
             raise OperationalError(
                 errno=2055, values=(addr, "Connection not available.")
             ) from err
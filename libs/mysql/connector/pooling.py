@@ -29,13 +29,30 @@
 """Implementing pooling of connections to MySQL servers."""
 from __future__ import annotations
 
+import bisect
+import os
 import queue
 import random
 import re
 import threading
+import time
+import weakref
 
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from types import TracebackType
-from typing import TYPE_CHECKING, Any, Dict, NoReturn, Optional, Tuple, Type, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Deque,
+    Dict,
+    List,
+    NoReturn,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 from uuid import uuid4
 
 try:
@@ -57,6 +74,7 @@ from .errors import (
     Error,
     InterfaceError,
     NotSupportedError,
+    OperationalError,
     PoolError,
     ProgrammingError,
 )
@@ -65,9 +83,16 @@ from .optionfiles import read_option_files
 if TYPE_CHECKING:
     from .abstracts import MySQLConnectionAbstract
 
+# Guards the registry of named pools; each pool has its own lock
 CONNECTION_POOL_LOCK = threading.RLock()
 CNX_POOL_MAXSIZE = 32
 CNX_POOL_MAXNAMESIZE = 64
+CNX_POOL_REAPER_MAX_INTERVAL = 30.0
+CNX_POOL_VALIDATION_POLICIES = ("always", "interval", "lazy", "background")
+CNX_POOL_RESET_STRATEGIES = ("always", "dirty")
+# Upper bounds, in seconds, of the buckets of the pool statistics histograms
+CNX_POOL_LATENCY_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+CNX_POOL_AGE_BUCKETS = (1.0, 10.0, 60.0, 300.0, 900.0, 1800.0, 3600.0)
 CNX_POOL_NAMEREGEX = re.compile(r"[^a-zA-Z0-9._:\-*$#]")
 ERROR_NO_CEXT = "MySQL Connector/Python C Extension not available"
 MYSQL_CNX_CLASS: Union[type, Tuple[type, ...]] = (
@@ -75,6 +100,43 @@ MYSQL_CNX_CLASS: Union[type, Tuple[type, ...]] = (
 )
 
 _CONNECTION_POOLS: Dict[str, MySQLConnectionPool] = {}
+_CONNECTION_POOL_CREATION_LOCKS: Dict[str, threading.Lock] = {}
+# Every pool of the process, reset in the child after a fork()
+_CONNECTION_POOL_INSTANCES: weakref.WeakSet[MySQLConnectionPool] = weakref.WeakSet()
+# Connections inherited through fork() which can not be released without
+# talking to the server; kept referenced so they are never finalized
+_FORK_INHERITED_CONNECTIONS: List[MySQLConnectionAbstract] = []
+
+
+def _release_inherited_connection(cnx: MySQLConnectionAbstract) -> None:
+    """Forget a connection opened by the parent process.
+
+    Only the copy of the socket owned by this process is closed. Sending QUIT,
+    or shutting the socket down, would end the session the parent still uses.
+    """
+    if isinstance(cnx, MySQLConnection):
+        if cnx._socket:  # pylint: disable=protected-access
+            cnx._socket.close_connection()  # pylint: disable=protected-access
+    else:
+        _FORK_INHERITED_CONNECTIONS.append(cnx)
+
+
+def _reinit_pools_after_fork() -> None:
+    """Reset the pools in a child process right after fork().
+
+    Locks possibly held by threads which do not exist in the child are
+    replaced and inherited connections are dropped. Each pool opens its own
+    connections again when first used.
+    """
+    global CONNECTION_POOL_LOCK  # pylint: disable=global-statement
+    CONNECTION_POOL_LOCK = threading.RLock()
+    _CONNECTION_POOL_CREATION_LOCKS.clear()
+    for pool in list(_CONNECTION_POOL_INSTANCES):
+        pool._reinit_after_fork()  # pylint: disable=protected-access
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reinit_pools_after_fork)
 
 
 def _get_pooled_connection(**kwargs: Any) -> PooledMySQLConnection:
@@ -87,15 +149,27 @@ def _get_pooled_connection(**kwargs: Any) -> PooledMySQLConnection:
     if kwargs.get("use_pure") is False and CMySQLConnection is None:
         raise ImportError(ERROR_NO_CEXT)
 
-    # Setup the pool, ensuring only 1 thread can update at a time
+    # Setup the pool, ensuring only 1 thread creates it. Opening the
+    # connections of a new pool only blocks callers of that same pool.
     with CONNECTION_POOL_LOCK:
-        if pool_name not in _CONNECTION_POOLS:
-            _CONNECTION_POOLS[pool_name] = MySQLConnectionPool(**kwargs)
-        elif isinstance(_CONNECTION_POOLS[pool_name], MySQLConnectionPool):
-            # pool_size must be the same
-            check_size = _CONNECTION_POOLS[pool_name].pool_size
-            if "pool_size" in kwargs and kwargs["pool_size"] != check_size:
-                raise PoolError("Size can not be changed for active pools.")
+        pool = _CONNECTION_POOLS.get(pool_name)
+        if pool is None:
+            creation_lock = _CONNECTION_POOL_CREATION_LOCKS.setdefault(
+                pool_name, threading.Lock()
+            )
+    if pool is None:
+        with creation_lock:
+            with CONNECTION_POOL_LOCK:
+                pool = _CONNECTION_POOLS.get(pool_name)
+            if pool is None:
+                pool = MySQLConnectionPool(**kwargs)
+                with CONNECTION_POOL_LOCK:
+                    _CONNECTION_POOLS[pool_name] = pool
+    elif isinstance(pool, MySQLConnectionPool):
+        # pool_size must be the same
+        check_size = pool.pool_size
+        if "pool_size" in kwargs and kwargs["pool_size"] != check_size:
+            raise PoolError("Size can not be changed for active pools.")
 
     # Return pooled connection
     try:
@@ -379,6 +453,9 @@ class PooledMySQLConnection:
             raise AttributeError("cnx should be a MySQLConnection")
         self._cnx_pool: MySQLConnectionPool = pool
         self._cnx: MySQLConnectionAbstract = cnx
+        self._healthy: bool = True
+        # pylint: disable=protected-access
+        self._generation: int = pool._generation
 
     def __enter__(self) -> PooledMySQLConnection:
         return self
@@ -389,6 +466,9 @@ class PooledMySQLConnection:
         exc_value: BaseException,
         traceback: TracebackType,
     ) -> None:
+        if isinstance(exc_value, (InterfaceError, OperationalError)):
+            # The connection might be broken, have it validated on next checkout
+            self._healthy = False
         self.close()
 
     def __getattr__(self, attr: Any) -> Any:
@@ -404,11 +484,29 @@ class PooledMySQLConnection:
         and reopened with the new configuration before being returned from the pool
         again in response to a connection request.
         """
+        cnx = self._cnx
+        # pylint: disable=protected-access
+        self._cnx_pool._check_fork()
+        if self._generation != self._cnx_pool._generation:
+            # Checked out before a fork(), the connection belongs to the parent
+            _release_inherited_connection(cnx)
+            self._cnx = None
+            return
+
+        if cnx.connection_errored:
+            # A command failed with a connection error, even if the caller
+            # handled it; the pool validates the connection from here on
+            self._healthy = False
+            cnx._connection_errored = False
         try:
-            cnx = self._cnx
             if self._cnx_pool.reset_session:
-                cnx.reset_session()
+                self._cnx_pool._reset_connection(cnx)
+        except Error:
+            self._healthy = False
+            raise
         finally:
+            # pylint: disable=protected-access
+            self._cnx_pool._mark_validated(cnx, self._healthy)
             self._cnx_pool.add_connection(cnx)
             self._cnx = None
 
@@ -431,6 +529,76 @@ class PooledMySQLConnection:
         return self._cnx_pool.pool_name
 
 
+def _run_pool_reaper(
+    pool_ref: weakref.ref[MySQLConnectionPool], interval: float, stop: threading.Event
+) -> None:
+    """Background loop evicting idle and expired connections of a pool.
+
+    Only a weak reference to the pool is kept, so the thread ends once the
+    pool is garbage collected or `stop` is set.
+    """
+    while not stop.wait(interval):
+        pool = pool_ref()
+        if pool is None:
+            return
+        try:
+            pool._reap_connections()  # pylint: disable=protected-access
+        except Error:
+            pass  # Replenishing failed, will be retried on the next run
+        del pool
+
+
+class PoolHistogram:
+    """Fixed-bucket histogram used by the pool statistics.
+
+    `counts[i]` is the number of observations lower or equal to `buckets[i]`
+    and greater than the previous bucket; the last count holds observations
+    above the last bucket. Observing a value is O(log buckets) and a snapshot
+    only copies a short list, so both are cheap enough for hot paths.
+    """
+
+    __slots__ = ("buckets", "counts", "count", "total")
+
+    def __init__(self, buckets: Tuple[float, ...]) -> None:
+        self.buckets: Tuple[float, ...] = buckets
+        self.counts: List[int] = [0] * (len(buckets) + 1)
+        self.count: int = 0
+        self.total: float = 0.0
+
+    def observe(self, value: float) -> None:
+        """Add an observation."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns a copy of the histogram as a dictionary."""
+        return {
+            "buckets": self.buckets,
+            "counts": list(self.counts),
+            "count": self.count,
+            "sum": self.total,
+        }
+
+
+class _PoolWaiter:
+    """A caller blocked in `MySQLConnectionPool.get_connection()`.
+
+    Waiters are served in FIFO order: a connection given back to the pool is
+    handed directly to the oldest waiter instead of being queued, so callers
+    arriving later can not overtake the ones already waiting. When a
+    connection is dropped instead, its slot is handed over (`grow`) and the
+    waiter opens a new connection itself.
+    """
+
+    __slots__ = ("event", "cnx", "grow")
+
+    def __init__(self) -> None:
+        self.event: threading.Event = threading.Event()
+        self.cnx: Optional[MySQLConnectionAbstract] = None
+        self.grow: bool = False
+
+
 class MySQLConnectionPool:
     """Class defining a pool of MySQL connections"""
 
@@ -439,6 +607,15 @@ class MySQLConnectionPool:
         pool_size: int = 5,
         pool_name: Optional[str] = None,
         pool_reset_session: bool = True,
+        pool_block: bool = False,
+        pool_timeout: Optional[float] = None,
+        pool_min_size: int = 0,
+        pool_max_idle_time: Optional[float] = None,
+        pool_max_lifetime: Optional[float] = None,
+        pool_validation: str = "always",
+        pool_validation_interval: float = 1.0,
+        pool_lazy: bool = False,
+        pool_reset_strategy: str = "always",
         **kwargs: Any,
     ) -> None:
         """Constructor.
@@ -448,6 +625,41 @@ class MySQLConnectionPool:
         arguments, kwargs, are configuration arguments for MySQLConnection
         instances.
 
+        The connections are opened concurrently. With `pool_lazy`, only
+        `pool_min_size` connections are opened up front and the others when
+        they are first needed.
+
+        The pool shrinks when connections stay idle longer than
+        `pool_max_idle_time`, but never below `pool_min_size` connections, and
+        grows back on demand up to `pool_size`. Connections older than
+        `pool_max_lifetime` are closed and replaced. Both are enforced by a
+        background thread which is only started when either option is set.
+
+        `pool_validation` decides when a connection is pinged before being
+        handed out:
+
+        - `always`: on every checkout.
+        - `interval`: only when it was last known to work more than
+          `pool_validation_interval` seconds ago.
+        - `lazy`: only when its last use ended with a connection error: a
+          command failing with `InterfaceError` or `OperationalError` (see
+          `connection_errored`), a failed reset, or such an error leaving a
+          `with` block.
+        - `background`: never on checkout, idle connections are pinged every
+          `pool_validation_interval` seconds by the background thread instead.
+
+        With every policy, a connection whose last use failed is validated
+        before it is handed out again.
+
+        `pool_reset_strategy` decides how the session is reset when a
+        connection is returned and `pool_reset_session` is set:
+
+        - `always`: `reset_session()` on every return.
+        - `dirty`: only sessions which may have changed state (see
+          `session_dirty`) are reset, with a single `COM_RESET_CONNECTION`.
+          An open transaction in an otherwise clean session is rolled back,
+          and a clean session is returned as is.
+
         Args:
             pool_name: The pool name. If this argument is not given, Connector/Python
                        automatically generates the name, composed from whichever of
@@ -456,6 +668,26 @@ class MySQLConnectionPool:
             pool_size:  The pool size. If this argument is not given, the default is 5.
             pool_reset_session: Whether to reset session variables when the connection
                                 is returned to the pool.
+            pool_block: Whether `get_connection()` waits for a connection to be
+                        returned when the pool is exhausted instead of raising
+                        `PoolError` right away. Default is False.
+            pool_timeout: Maximum number of seconds `get_connection()` waits when
+                          blocking. None (default) means waiting indefinitely.
+            pool_min_size: Number of connections kept open when evicting idle
+                           connections. Default is 0.
+            pool_max_idle_time: Seconds after which an unused connection is
+                                closed. None (default) disables idle eviction.
+            pool_max_lifetime: Seconds after which a connection is closed and
+                               replaced. None (default) means no limit.
+            pool_validation: When to ping connections before handing them out,
+                             one of `always` (default), `interval`, `lazy` or
+                             `background`.
+            pool_validation_interval: Seconds a connection is trusted without
+                                      pinging it. Default is 1.0.
+            pool_lazy: Whether to open only `pool_min_size` connections when
+                       creating the pool. Default is False.
+            pool_reset_strategy: How to reset the session of returned
+                                 connections, `always` (default) or `dirty`.
             **kwargs: Optional additional connection arguments, as described in [1].
 
         Examples:
@@ -475,20 +707,109 @@ class MySQLConnectionPool:
         self._pool_size: Optional[int] = None
         self._pool_name: Optional[str] = None
         self._reset_session = pool_reset_session
+        self._block = pool_block
+        self._timeout = pool_timeout
         self._set_pool_size(pool_size)
         self._set_pool_name(pool_name or generate_pool_name(**kwargs))
+        if pool_min_size < 0 or pool_min_size > self._pool_size:
+            raise AttributeError(
+                f"Pool minimum size should be between 0 and {self._pool_size}"
+            )
+        self._min_size = pool_min_size
+        self._max_idle_time = pool_max_idle_time
+        self._max_lifetime = pool_max_lifetime
+        if pool_validation not in CNX_POOL_VALIDATION_POLICIES:
+            raise AttributeError(
+                "Pool validation should be one of "
+                f"{', '.join(CNX_POOL_VALIDATION_POLICIES)}"
+            )
+        self._validation = pool_validation
+        self._validation_interval = pool_validation_interval
+        if pool_reset_strategy not in CNX_POOL_RESET_STRATEGIES:
+            raise AttributeError(
+                "Pool reset strategy should be one of "
+                f"{', '.join(CNX_POOL_RESET_STRATEGIES)}"
+            )
+        self._reset_strategy = pool_reset_strategy
         self._cnx_config: Dict[str, Any] = {}
-        self._cnx_queue: queue.Queue[MySQLConnectionAbstract] = queue.Queue(
-            self._pool_size
-        )
         self._config_version = uuid4()
+        self._pid = os.getpid()
+        self._generation = 0
+        self._resume_after_fork = False
+        self._init_state()
+        _CONNECTION_POOL_INSTANCES.add(self)
 
         if kwargs:
             self.set_config(**kwargs)
-            cnt = 0
-            while cnt < self._pool_size:
-                self.add_connection()
-                cnt += 1
+            self._warm_up(self._min_size if pool_lazy else self._pool_size)
+
+        self._start_reaper()
+
+    def _init_state(self) -> None:
+        """Initialize the lock, connection bookkeeping and statistics."""
+        self._lock = threading.RLock()
+        # LIFO, so surplus connections stay unused long enough to be evicted
+        self._cnx_queue: queue.LifoQueue[MySQLConnectionAbstract] = queue.LifoQueue(
+            self._pool_size
+        )
+        # Creation and last release time of every connection owned by the pool
+        self._cnx_created: Dict[MySQLConnectionAbstract, float] = {}
+        self._cnx_last_used: Dict[MySQLConnectionAbstract, float] = {}
+        # Last time a connection was known to work; missing means suspect
+        self._cnx_validated: Dict[MySQLConnectionAbstract, float] = {}
+        self._cnx_opening = 0
+        # Idle connections taken out of the queue by the reaper to be pinged
+        self._cnx_pinging = 0
+        self._pings = 0
+        self._pings_avoided = 0
+        self._validation_failures = 0
+        self._waiters: Deque[_PoolWaiter] = deque()
+        self._wait_time = PoolHistogram(CNX_POOL_LATENCY_BUCKETS)
+        self._wait_timeouts = 0
+        self._wait_time_max = 0.0
+        self._checkout_time = PoolHistogram(CNX_POOL_LATENCY_BUCKETS)
+        self._reset_time = PoolHistogram(CNX_POOL_LATENCY_BUCKETS)
+        self._rollback_time = PoolHistogram(CNX_POOL_LATENCY_BUCKETS)
+        self._resets_skipped = 0
+        self._exhausted = 0
+        self._reconnects = 0
+        self._reconnect_failures = 0
+        self._reaper_stop = threading.Event()
+
+    def _reinit_after_fork(self) -> None:
+        """Drop the state inherited from the parent process.
+
+        Runs in the child process right after fork(), so it neither starts
+        threads nor does network I/O; `_check_fork()` restarts the pool when
+        it is first used.
+        """
+        inherited = list(self._cnx_created)
+        self._pid = os.getpid()
+        self._generation += 1
+        # The reaper thread did not survive the fork; make sure a copy of its
+        # stop event can not be mistaken for a running one
+        self._reaper_stop.set()
+        self._init_state()
+        self._resume_after_fork = True
+        for cnx in inherited:
+            _release_inherited_connection(cnx)
+
+    def _check_fork(self) -> None:
+        """Rebuild the pool when it is used for the first time after fork().
+
+        The PID comparison covers platforms without `os.register_at_fork()`.
+        """
+        if self._pid != os.getpid():
+            self._reinit_after_fork()
+        if not self._resume_after_fork:
+            return
+        with self._lock:
+            if not self._resume_after_fork:
+                return
+            self._resume_after_fork = False
+        self._start_reaper()
+        if self._cnx_config:
+            self._warm_up(self._min_size)
 
     @property
     def pool_name(self) -> str:
@@ -505,6 +826,116 @@ class MySQLConnectionPool:
         """Returns whether to reset session."""
         return self._reset_session
 
+    @property
+    def min_size(self) -> int:
+        """Returns the number of connections kept open when evicting."""
+        return self._min_size
+
+    @property
+    def open_connections(self) -> int:
+        """Returns number of open connections, in use or idle."""
+        return len(self._cnx_created)
+
+    @property
+    def validation_stats(self) -> Dict[str, int]:
+        """Returns counters on connection validation.
+
+        The returned dictionary contains the number of pings sent (`pings`),
+        the number of checkouts which skipped the ping (`pings_avoided`) and
+        the number of validations which found a broken connection
+        (`failures`).
+        """
+        with self._lock:
+            return {
+                "pings": self._pings,
+                "pings_avoided": self._pings_avoided,
+                "failures": self._validation_failures,
+            }
+
+    @property
+    def wait_stats(self) -> Dict[str, Any]:
+        """Returns counters on callers that had to wait for a connection.
+
+        The returned dictionary contains the number of waits (`waits`), how
+        many of them timed out (`timeouts`), the accumulated and the longest
+        wait in seconds (`wait_time_total`, `wait_time_max`) and the number
+        of callers currently waiting (`waiting`).
+        """
+        with self._lock:
+            return {
+                "waits": self._wait_time.count,
+                "timeouts": self._wait_timeouts,
+                "wait_time_total": self._wait_time.total,
+                "wait_time_max": self._wait_time_max,
+                "waiting": len(self._waiters),
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns a snapshot of the pool statistics.
+
+        Taking a snapshot only copies counters under the pool lock, so it can
+        be polled frequently, for example by a metrics endpoint.
+
+        The returned dictionary contains:
+
+        - `pool_name`, `pool_size` and `min_size`: the pool configuration.
+        - `open`, `in_use`, `idle`, `validating`, `opening` and `waiting`: the
+          current number of connections in each state and of callers waiting
+          for one. `validating` counts idle connections being pinged by the
+          background validation.
+        - `checkouts` and `checkout_time`: the number of checkouts and a
+          histogram of their duration, waiting and validation included.
+        - `wait_time` and `wait_timeouts`: a histogram of the time callers
+          waited for a connection to be returned, and how many gave up.
+        - `exhausted`: how many checkouts found no idle connection and no room
+          to open a new one.
+        - `reconnects` and `reconnect_failures`: reconnects done on checkout.
+        - `pings`, `pings_avoided` and `validation_failures`: see
+          `validation_stats`.
+        - `reset_time`: a histogram of the session reset duration.
+        - `rollback_time`: a histogram of the duration of the rollbacks done
+          instead of a reset by the `dirty` reset strategy.
+        - `resets_skipped`: returns of a clean session which needed no reset.
+        - `reset_time_saved`: estimate of the time saved by skipping resets or
+          only rolling back, based on the mean reset duration.
+        - `connection_age`: a histogram of the age of open connections.
+
+        Histograms are dictionaries as returned by `PoolHistogram.snapshot()`,
+        durations and ages are in seconds.
+        """
+        now = time.monotonic()
+        with self._lock:
+            idle = self._cnx_queue.qsize()
+            connection_age = PoolHistogram(CNX_POOL_AGE_BUCKETS)
+            for created in self._cnx_created.values():
+                connection_age.observe(now - created)
+            return {
+                "pool_name": self._pool_name,
+                "pool_size": self._pool_size,
+                "min_size": self._min_size,
+                "open": len(self._cnx_created),
+                "in_use": len(self._cnx_created) - idle - self._cnx_pinging,
+                "idle": idle,
+                "validating": self._cnx_pinging,
+                "opening": self._cnx_opening,
+                "waiting": len(self._waiters),
+                "checkouts": self._checkout_time.count,
+                "checkout_time": self._checkout_time.snapshot(),
+                "wait_time": self._wait_time.snapshot(),
+                "wait_timeouts": self._wait_timeouts,
+                "exhausted": self._exhausted,
+                "reconnects": self._reconnects,
+                "reconnect_failures": self._reconnect_failures,
+                "pings": self._pings,
+                "pings_avoided": self._pings_avoided,
+                "validation_failures": self._validation_failures,
+                "reset_time": self._reset_time.snapshot(),
+                "rollback_time": self._rollback_time.snapshot(),
+                "resets_skipped": self._resets_skipped,
+                "reset_time_saved": self._reset_time_saved(),
+                "connection_age": connection_age.snapshot(),
+            }
+
     def set_config(self, **kwargs: Any) -> None:
         """Set the connection configuration for `MySQLConnectionAbstract` subclass instances.
 
@@ -526,7 +957,7 @@ class MySQLConnectionPool:
         if not kwargs:
             return
 
-        with CONNECTION_POOL_LOCK:
+        with self._lock:
             try:
                 test_cnx = connect()
                 test_cnx.config(**kwargs)
@@ -571,6 +1002,9 @@ class MySQLConnectionPool:
         acquire a lock as the methods using _queue_connection() will have it
         set.
 
+        When callers are waiting for a connection, it is handed to the one
+        waiting the longest instead.
+
         Raises `PoolError` on errors.
         """
         if not isinstance(cnx, MYSQL_CNX_CLASS):
@@ -578,6 +1012,13 @@ class MySQLConnectionPool:
                 "Connection instance not subclass of MySQLConnectionAbstract"
             )
 
+        if self._waiters:
+            waiter = self._waiters.popleft()
+            waiter.cnx = cnx
+            waiter.event.set()
+            return
+
+        self._cnx_last_used[cnx] = time.monotonic()
         try:
             self._cnx_queue.put(cnx, block=False)
         except queue.Full as err:
@@ -588,7 +1029,7 @@ class MySQLConnectionPool:
 
         This method instantiates a `MySQLConnection` using the configuration
         passed when initializing the `MySQLConnectionPool` instance or using
-        the `set_config()` method.
+        the `set_config()` method. The pool lock is not held while connecting.
         If cnx is a `MySQLConnection` instance, it will be added to the
         queue.
 
@@ -602,39 +1043,324 @@ class MySQLConnectionPool:
                        connection can be added (maximum reached) or when the connection
                        can not be instantiated.
         """
-        with CONNECTION_POOL_LOCK:
+        with self._lock:
             if not self._cnx_config:
                 raise PoolError("Connection configuration not available")
 
             if self._cnx_queue.full():
                 raise PoolError("Failed adding connection; queue is full")
 
-            if not cnx:
-                cnx = connect(**self._cnx_config)  # type: ignore[assignment]
-                try:
-                    if (
-                        self._reset_session
-                        and self._cnx_config["compress"]
-                        and cnx.server_version < (5, 7, 3)
-                    ):
-                        raise NotSupportedError(
-                            "Pool reset session is not supported with "
-                            "compression for MySQL server version 5.7.2 "
-                            "or earlier"
-                        )
-                except KeyError:
-                    pass
-
-                cnx.pool_config_version = self._config_version
-            else:
-                if not isinstance(cnx, MYSQL_CNX_CLASS):
-                    raise PoolError(
-                        "Connection instance not subclass of MySQLConnectionAbstract"
-                    )
+            if cnx is None or cnx not in self._cnx_created:
+                if len(self._cnx_created) + self._cnx_opening >= self._pool_size:
+                    raise PoolError("Failed adding connection; pool is full")
+
+            if cnx and not isinstance(cnx, MYSQL_CNX_CLASS):
+                raise PoolError(
+                    "Connection instance not subclass of MySQLConnectionAbstract"
+                )
+
+            if cnx:
+                self._cnx_created.setdefault(cnx, time.monotonic())
+                self._queue_connection(cnx)
+                return
 
+            self._cnx_opening += 1
+
+        cnx = self._grow()
+        with self._lock:
             self._queue_connection(cnx)
 
-    def get_connection(self) -> PooledMySQLConnection:
+    def _open_connection(self) -> MySQLConnectionAbstract:
+        """Open a new connection using the pool configuration.
+
+        The connection is not registered with the pool.
+        """
+        cnx = connect(**self._cnx_config)
+        try:
+            if (
+                self._reset_session
+                and self._cnx_config["compress"]
+                and cnx.server_version < (5, 7, 3)
+            ):
+                raise NotSupportedError(
+                    "Pool reset session is not supported with "
+                    "compression for MySQL server version 5.7.2 "
+                    "or earlier"
+                )
+        except KeyError:
+            pass
+
+        cnx.pool_config_version = self._config_version
+        return cnx  # type: ignore[return-value]
+
+    def _warm_up(self, count: int) -> None:
+        """Open up to `count` connections concurrently and queue them.
+
+        Raises the first error met after queueing the connections which could
+        be opened.
+        """
+        with self._lock:
+            count = min(
+                count, self._pool_size - len(self._cnx_created) - self._cnx_opening
+            )
+            if count <= 0:
+                return
+            self._cnx_opening += count
+
+        with ThreadPoolExecutor(
+            max_workers=count, thread_name_prefix=f"{self._pool_name}-warmup"
+        ) as executor:
+            futures = [executor.submit(self._grow) for _ in range(count)]
+
+        errors = []
+        with self._lock:
+            for future in futures:
+                err = future.exception()
+                if err is None:
+                    self._queue_connection(future.result())
+                else:
+                    errors.append(err)
+        if errors:
+            raise errors[0]
+
+    def _grow(self) -> MySQLConnectionAbstract:
+        """Open a connection for a slot reserved through `_cnx_opening`.
+
+        The connection is opened without holding the lock. When it can not be
+        opened, the slot goes to the oldest waiter, which tries again.
+        """
+        try:
+            cnx = self._open_connection()
+        except BaseException:
+            with self._lock:
+                self._cnx_opening -= 1
+                self._hand_over_slot()
+            raise
+        with self._lock:
+            self._cnx_opening -= 1
+            self._cnx_created[cnx] = self._cnx_validated[cnx] = time.monotonic()
+        return cnx
+
+    def _forget_connection(self, cnx: MySQLConnectionAbstract) -> None:
+        """Stop tracking a connection; the caller holds the lock."""
+        self._cnx_created.pop(cnx, None)
+        self._cnx_last_used.pop(cnx, None)
+        self._cnx_validated.pop(cnx, None)
+
+    def _hand_over_slot(self) -> None:
+        """Give the slot of a dropped or failed connection to the oldest waiter.
+
+        The waiter opens a connection for the slot reserved through
+        `_cnx_opening`. The caller holds the lock.
+        """
+        if self._waiters:
+            waiter = self._waiters.popleft()
+            self._cnx_opening += 1
+            waiter.grow = True
+            waiter.event.set()
+
+    def _reset_connection(self, cnx: MySQLConnectionAbstract) -> None:
+        """Reset the session of a connection returned to the pool.
+
+        Follows `pool_reset_strategy`; raises `Error` when the reset fails.
+        """
+        start = time.perf_counter()
+        if self._reset_strategy == "always":
+            cnx.reset_session()
+            histogram = self._reset_time
+        elif cnx.session_dirty or cnx.unread_result:
+            # Only falls back to the ping and COM_CHANGE_USER of
+            # reset_session() for servers older than 5.7.3
+            if not cnx.cmd_reset_connection():
+                cnx.reset_session()
+            histogram = self._reset_time
+        elif cnx.in_transaction:
+            cnx.rollback()
+            histogram = self._rollback_time
+        else:
+            with self._lock:
+                self._resets_skipped += 1
+            return
+        duration = time.perf_counter() - start
+        with self._lock:
+            histogram.observe(duration)
+
+    def _reset_time_saved(self) -> float:
+        """Estimate the reset time saved by the `dirty` strategy.
+
+        The caller holds the lock.
+        """
+        if not self._reset_time.count:
+            return 0.0
+        mean_reset = self._reset_time.total / self._reset_time.count
+        saved = self._resets_skipped * mean_reset
+        if self._rollback_time.count:
+            saved += max(
+                0.0,
+                self._rollback_time.count * mean_reset - self._rollback_time.total,
+            )
+        return saved
+
+    def _mark_validated(self, cnx: MySQLConnectionAbstract, healthy: bool) -> None:
+        """Record whether a connection is known to work.
+
+        A connection which is not healthy gets validated on its next checkout
+        whatever the validation policy.
+        """
+        with self._lock:
+            if healthy:
+                self._cnx_validated[cnx] = time.monotonic()
+            else:
+                self._cnx_validated.pop(cnx, None)
+
+    def _needs_validation(self, cnx: MySQLConnectionAbstract, now: float) -> bool:
+        """Whether a connection must be pinged before being handed out."""
+        if self._validation == "always" or cnx not in self._cnx_validated:
+            return True
+        if self._validation == "interval":
+            return now - self._cnx_validated[cnx] >= self._validation_interval
+        return False
+
+    @staticmethod
+    def _close_quietly(cnx: MySQLConnectionAbstract) -> None:
+        """Disconnect, ignoring errors from connections already broken."""
+        try:
+            cnx.disconnect()
+        except Error:
+            pass
+
+    def _is_expired(self, cnx: MySQLConnectionAbstract, now: float) -> bool:
+        """Whether the connection outlived `pool_max_lifetime`."""
+        return bool(self._max_lifetime) and (
+            now - self._cnx_created.get(cnx, now) >= self._max_lifetime
+        )
+
+    def _start_reaper(self) -> None:
+        """Start the thread evicting idle and expired connections, if needed."""
+        limits = [t for t in (self._max_idle_time, self._max_lifetime) if t]
+        if self._validation == "background":
+            limits.append(self._validation_interval * 2)
+        if not limits:
+            return
+        interval = min(min(limits) / 2, CNX_POOL_REAPER_MAX_INTERVAL)
+        threading.Thread(
+            target=_run_pool_reaper,
+            args=(weakref.ref(self), interval, self._reaper_stop),
+            name=f"{self._pool_name}-reaper",
+            daemon=True,
+        ).start()
+
+    def _reap_connections(self) -> None:
+        """Close idle and expired connections and replenish to `pool_min_size`.
+
+        With the `background` validation policy, idle connections not
+        validated within `pool_validation_interval` are pinged as well.
+
+        Connections are picked under the lock, but closed, pinged and opened
+        after releasing it so that checkouts are not stalled by network I/O.
+        Checkouts finding the pool full meanwhile wait for the connections
+        being pinged rather than failing; the slot of a connection found
+        broken goes to a waiting caller.
+        """
+        now = time.monotonic()
+        evicted: List[MySQLConnectionAbstract] = []
+        unverified: List[MySQLConnectionAbstract] = []
+        with self._lock:
+            idle = []
+            while True:
+                try:
+                    idle.append(self._cnx_queue.get(block=False))
+                except queue.Empty:
+                    break
+            # Oldest first, so they are the first to go and are queued back
+            # below the most recently used ones
+            remaining = len(self._cnx_created)
+            for cnx in reversed(idle):
+                idle_time = now - self._cnx_last_used.get(cnx, now)
+                if self._is_expired(cnx, now) or (
+                    self._max_idle_time
+                    and idle_time >= self._max_idle_time
+                    and remaining > self._min_size
+                ):
+                    self._forget_connection(cnx)
+                    evicted.append(cnx)
+                    remaining -= 1
+                elif self._validation == "background" and (
+                    now - self._cnx_validated.get(cnx, 0.0)
+                    >= self._validation_interval
+                ):
+                    unverified.append(cnx)
+                else:
+                    self._cnx_queue.put(cnx, block=False)
+            self._cnx_pinging = len(unverified)
+
+        for cnx in evicted:
+            self._close_quietly(cnx)
+
+        for cnx in unverified:
+            alive = cnx.is_connected()
+            with self._lock:
+                self._cnx_pinging -= 1
+                self._pings += 1
+                if alive:
+                    self._cnx_validated[cnx] = time.monotonic()
+                    self._queue_connection(cnx)
+                    continue
+                self._validation_failures += 1
+                self._forget_connection(cnx)
+                self._hand_over_slot()
+            self._close_quietly(cnx)
+
+        self._replenish()
+
+    def _replenish(self) -> None:
+        """Open connections until the pool holds `pool_min_size` of them."""
+        if not self._cnx_config:
+            return
+        while True:
+            with self._lock:
+                if len(self._cnx_created) + self._cnx_opening >= self._min_size:
+                    return
+                self._cnx_opening += 1
+            cnx = self._grow()
+            with self._lock:
+                self._queue_connection(cnx)
+
+    def _record_wait(self, waited: float) -> None:
+        """Account a finished wait; the caller holds the lock."""
+        self._wait_time.observe(waited)
+        if waited > self._wait_time_max:
+            self._wait_time_max = waited
+
+    def _wait_for_connection(
+        self, waiter: _PoolWaiter, timeout: Optional[float]
+    ) -> Optional[MySQLConnectionAbstract]:
+        """Block until a connection is handed to `waiter` or `timeout` expires.
+
+        Returns None when a slot was handed over instead, for the caller to
+        open a connection in it.
+
+        Raises `PoolError` when the timeout expires.
+        """
+        start = time.perf_counter()
+        waiter.event.wait(timeout)
+        waited = time.perf_counter() - start
+
+        with self._lock:
+            self._record_wait(waited)
+            # A connection could have been handed over right after the timeout
+            if waiter.cnx is None and not waiter.grow:
+                self._waiters.remove(waiter)
+                self._wait_timeouts += 1
+                raise PoolError(
+                    "Failed getting connection; pool exhausted "
+                    f"(timed out after {timeout} seconds)"
+                )
+            return waiter.cnx
+
+    def get_connection(
+        self, block: Optional[bool] = None, timeout: Optional[float] = None
+    ) -> PooledMySQLConnection:
         """Gets a connection from the pool.
 
         This method returns an PooledMySQLConnection instance which
@@ -643,57 +1369,151 @@ class MySQLConnectionPool:
 
         When the MySQL connection is not connect, a reconnect is attempted.
 
+        When the pool is exhausted and blocking is enabled, the caller waits
+        until a connection is returned to the pool. Waiting callers are
+        served in the order they arrived. Idle connections being pinged by
+        the background validation are not in use: when they are all the pool
+        has left, the caller waits for them even if not blocking.
+
+        Args:
+            block: Whether to wait for a connection when the pool is exhausted.
+                   If not given, the `pool_block` value of the pool is used.
+            timeout: Maximum number of seconds to wait when blocking. If not
+                     given, the `pool_timeout` value of the pool is used.
+
         Returns:
             A `PooledMySQLConnection` instance.
 
         Raises:
             PoolError: On errors.
         """
-        with CONNECTION_POOL_LOCK:
+        self._check_fork()
+        if block is None:
+            block = self._block
+        if timeout is None:
+            timeout = self._timeout
+
+        start = time.perf_counter()
+        waiter = None
+        grow = False
+        with self._lock:
             try:
                 cnx = self._cnx_queue.get(block=False)
             except queue.Empty as err:
-                raise PoolError("Failed getting connection; pool exhausted") from err
-
-            if (
-                not cnx.is_connected()
-                or self._config_version != cnx.pool_config_version
-            ):
-                cnx.config(**self._cnx_config)
-                try:
-                    cnx.reconnect()
-                except InterfaceError:
-                    # Failed to reconnect, give connection back to pool
+                if len(self._cnx_created) + self._cnx_opening < self._pool_size:
+                    self._cnx_opening += 1
+                    grow = True
+                else:
+                    # Connections being pinged come back shortly, or free
+                    # their slot, and every waiter is served before them
+                    pinging = self._cnx_pinging > len(self._waiters)
+                    if not pinging:
+                        self._exhausted += 1
+                        if not block:
+                            raise PoolError(
+                                "Failed getting connection; pool exhausted"
+                            ) from err
+                    waiter = _PoolWaiter()
+                    self._waiters.append(waiter)
+
+        if waiter is not None:
+            cnx = self._wait_for_connection(waiter, timeout)
+            grow = cnx is None
+        if grow:
+            cnx = self._grow()
+
+        if self._is_expired(cnx, time.monotonic()):
+            # Recycle the connection, keeping its slot for the new one
+            with self._lock:
+                self._forget_connection(cnx)
+                self._cnx_opening += 1
+            self._close_quietly(cnx)
+            cnx = self._grow()
+
+        # The connection is ours now: ping and reconnect without the lock,
+        # so a slow server does not stall checkouts of other connections
+        with self._lock:
+            config_version = self._config_version
+            config = self._cnx_config
+            reconnect = config_version != cnx.pool_config_version
+            validate = not reconnect and self._needs_validation(
+                cnx, time.monotonic()
+            )
+            if not reconnect and not validate:
+                self._pings_avoided += 1
+
+        if validate:
+            reconnect = not cnx.is_connected()
+            with self._lock:
+                self._pings += 1
+                if reconnect:
+                    self._validation_failures += 1
+                else:
+                    self._cnx_validated[cnx] = time.monotonic()
+
+        if reconnect:
+            try:
+                cnx.config(**config)
+                cnx.reconnect()
+            except InterfaceError:
+                # Failed to reconnect, give connection back to pool
+                with self._lock:
+                    self._reconnects += 1
+                    self._reconnect_failures += 1
+                    self._cnx_validated.pop(cnx, None)
                     self._queue_connection(cnx)
-                    raise
-                cnx.pool_config_version = self._config_version
+                raise
+            cnx.pool_config_version = config_version
+            with self._lock:
+                self._reconnects += 1
+                self._cnx_validated[cnx] = time.monotonic()
+
+        with self._lock:
+            self._checkout_time.observe(time.perf_counter() - start)
+        return PooledMySQLConnection(self, cnx)
+
+    def close(self) -> int:
+        """Close the pool.
 
-            return PooledMySQLConnection(self, cnx)
+        Stops the background thread evicting and validating connections and
+        closes the idle connections. Connections in use are not closed.
+
+        Returns the number of connections closed.
+        """
+        return self._remove_connections()
 
     def _remove_connections(self) -> int:
         """Close all connections
 
-        This method closes all connections. It returns the number
-        of connections it closed.
+        This method closes all connections and stops the background thread
+        evicting and validating them. It returns the number of connections
+        it closed.
 
         Used mostly for tests.
 
         Returns int.
         """
-        with CONNECTION_POOL_LOCK:
-            cnt = 0
+        self._reaper_stop.set()
+        with self._lock:
+            idle = []
             cnxq = self._cnx_queue
             while cnxq.qsize():
                 try:
                     cnx = cnxq.get(block=False)
-                    cnx.disconnect()
-                    cnt += 1
                 except queue.Empty:
-                    return cnt
-                except PoolError:
-                    raise
-                except Error:
-                    # Any other error when closing means connection is closed
-                    pass
-
-            return cnt
+                    break
+                self._forget_connection(cnx)
+                idle.append(cnx)
+
+        cnt = 0
+        for cnx in idle:
+            try:
+                cnx.disconnect()
+                cnt += 1
+            except PoolError:
+                raise
+            except Error:
+                # Any other error when closing means connection is closed
+                pass
+
+        return cnt
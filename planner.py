@@ -1,49 +1,163 @@
 # planner.py
+# Entry points used by the app: load the user's data (planner_loader), plan it
+# (planner_engine) and optionally persist the sessions.
+import os
+from functools import partial
 from db import get_connection
+from cache import bump_data_version, data_version, plan_cache, plan_history
 from datetime import date, datetime, timedelta, time
-import math
-
-# We import get_connection from your db module when used by app
-# This module exposes the main function generate_daily_plan(user_id, persist=False, plan_date=None)
-# persist=True will insert rows into study_sessions table for the generated plan.
-
-# Configurable constants
-PRIORITY_WEIGHTS = {
-    "difficulty": 0.3,
-    "importance": 0.3,
-    "confidence_inv": 0.4  # using (6 - confidence)
-}
-URGENCY_LOOKBACK_DAYS = 30
-MAX_URGENCY_MULTIPLIER = 2.0  # when exam is today or passed
-SESSION_PREFERRED_MINUTES = 50
-SESSION_MINIMUM_MINUTES = 25
-BREAK_MINUTES = 10   # not counted against user's daily_study_hours (assumption)
-DEFAULT_DAILY_HOURS = 2.0
+
+from planner_engine import (  # noqa: F401  (re-exported for existing callers)
+    BREAK_MINUTES,
+    DEFAULT_DAILY_HOURS,
+    MAX_URGENCY_MULTIPLIER,
+    PRIORITY_WEIGHTS,
+    SESSION_MINIMUM_MINUTES,
+    SESSION_PREFERRED_MINUTES,
+    URGENCY_LOOKBACK_DAYS,
+    WEEK_SOLVERS,
+    WeekPlan,
+    allocate_day,
+    compute_priority_score,
+    compute_urgency_multiplier,
+    horizon_days,
+    minutes_from_hours,
+    iter_plan_days,
+    plan_day,
+    plan_diff,
+    plan_week,
+    plan_week_state,
+    replan_week,
+    score_topics,
+    simulate_plans,
+    solve_week,
+    validate_variants,
+)
+from planner_loader import load_due_reviews, load_exam_dates, load_plan_inputs
+from planner_reviews import MAX_REVIEWS_PER_DAY, NEXT_REVIEW_SQL
+
+# persist=True replaces the pending study_sessions of the planned dates with the generated plan.
+# Sessions packed into availability windows keep their start_time; others are
+# scheduled back to back from DEFAULT_START_TIME (planner_slots.DEFAULT_WINDOW).
 DEFAULT_START_TIME = time(hour=8, minute=0)  # sequentially schedule from 08:00 if persisting
 
+# Week planner of the app and batch_planner.py: "greedy" (plan_week, re-planned
+# incrementally after changes) or "optimal" (solve_week, whole week at once).
+# Users with availability windows are always planned by plan_week, which packs slots.
+PLANNER_SOLVER = os.environ.get("PLANNER_SOLVER", "greedy")
+if PLANNER_SOLVER not in WEEK_SOLVERS:
+    raise ValueError(f"PLANNER_SOLVER must be one of {', '.join(WEEK_SOLVERS)}, not {PLANNER_SOLVER!r}")
+MAX_PLAN_DAYS = int(os.environ.get("MAX_PLAN_DAYS", 366))  # longest horizon iter_plan() plans
+MAX_SIMULATION_VARIANTS = 50  # variants one simulate_weekly_plan() call evaluates
+
+
+INSERT_SESSION_SQL = (
+    "INSERT INTO study_sessions (user_id, topic_id, scheduled_date, scheduled_time, duration_minutes, status) "
+    "VALUES (%s,%s,%s,%s,%s,%s)"
+)
 
-def compute_priority_score(difficulty, importance, confidence):
-    """Compute intrinsic priority score for a topic."""
-    return (
-        difficulty * PRIORITY_WEIGHTS["difficulty"]
-        + importance * PRIORITY_WEIGHTS["importance"]
-        + (6 - confidence) * PRIORITY_WEIGHTS["confidence_inv"]
+
+def session_rows(user_id, plan_date, sessions):
+    """
+    INSERT_SESSION_SQL parameters for one day's sessions: at their start_time
+    when packed into availability windows, otherwise back to back from
+    DEFAULT_START_TIME with breaks.
+    """
+    rows = []
+    schedule_time = datetime.combine(plan_date, DEFAULT_START_TIME)
+    for s in sessions:
+        if s.get("start_time"):
+            schedule_time = datetime.combine(plan_date, time.fromisoformat(s["start_time"]))
+        rows.append((user_id, s["topic_id"], plan_date, schedule_time.time().strftime("%H:%M:%S"), s["duration_minutes"], "pending"))
+        # increment schedule_time by duration + break
+        schedule_time += timedelta(minutes=(s["duration_minutes"] + BREAK_MINUTES))
+    return rows
+
+
+def replace_pending_sessions(cur, user_ids, start_date, end_date, rows):
+    """
+    Replace the pending sessions of user_ids scheduled in [start_date, end_date)
+    with rows (see session_rows()): one DELETE and one multi-row INSERT
+    (executemany batches INSERT_SESSION_SQL), so writing the same plan twice
+    leaves the same rows. Completed and skipped sessions are kept. Runs in the
+    caller's transaction; commit (or roll back) after it.
+    """
+    placeholders = ",".join(["%s"] * len(user_ids))
+    cur.execute(
+        f"DELETE FROM study_sessions WHERE user_id IN ({placeholders}) AND status='pending' "
+        "AND scheduled_date >= %s AND scheduled_date < %s",
+        tuple(user_ids) + (start_date, end_date)
     )
+    if rows:
+        cur.executemany(INSERT_SESSION_SQL, rows)
+
 
+SESSION_STATUSES = ("pending", "completed", "skipped")
 
-def compute_urgency_multiplier(days_until_exam):
-    """Compute urgency multiplier from days until exam (int)."""
-    if days_until_exam <= 0:
-        return MAX_URGENCY_MULTIPLIER
-    if days_until_exam >= URGENCY_LOOKBACK_DAYS:
-        return 1.0
-    # linear ramp from 1.0 -> MAX_URGENCY_MULTIPLIER as days -> 0
-    frac = (URGENCY_LOOKBACK_DAYS - days_until_exam) / URGENCY_LOOKBACK_DAYS
-    return 1.0 + frac * (MAX_URGENCY_MULTIPLIER - 1.0)
+
+def set_session_status(cur, user_id, session_id, status):
+    """
+    Change the status of one of user_id's study sessions and keep the topic's
+    completed_minutes / times_studied / last_studied rollup and next_review_date
+    in step, inside the caller's transaction (cur: plain cursor). The planner reads the rollup
+    instead of summing study_sessions; reconcile_completed_minutes.py rebuilds it.
+    Returns False if the session does not exist or belongs to another user.
+    """
+    cur.execute(
+        "SELECT topic_id, duration_minutes, status FROM study_sessions WHERE session_id=%s AND user_id=%s FOR UPDATE",
+        (session_id, user_id)
+    )
+    row = cur.fetchone()
+    if row is None:
+        return False
+    topic_id, duration_minutes, old_status = row
+    if old_status == status:
+        return True
+
+    if status == "completed":
+        cur.execute("UPDATE study_sessions SET status=%s, completion_date=NOW() WHERE session_id=%s", (status, session_id))
+        # Single-table UPDATE assigns left to right: next_review_date sees the new values
+        cur.execute(f"""
+            UPDATE topics
+            SET completed_minutes = completed_minutes + %s,
+                times_studied = COALESCE(times_studied, 0) + 1,
+                last_studied = CURDATE(),
+                next_review_date = {NEXT_REVIEW_SQL}
+            WHERE topic_id=%s
+        """, (duration_minutes, topic_id))
+    else:
+        cur.execute("UPDATE study_sessions SET status=%s, completion_date=NULL WHERE session_id=%s", (status, session_id))
+        if old_status == "completed":
+            # last_studied is left as is; the reconcile job recomputes it
+            cur.execute(f"""
+                UPDATE topics
+                SET completed_minutes = GREATEST(completed_minutes - %s, 0),
+                    times_studied = GREATEST(COALESCE(times_studied, 0) - 1, 0),
+                    next_review_date = {NEXT_REVIEW_SQL}
+                WHERE topic_id=%s
+            """, (duration_minutes, topic_id))
+    return True
+
+
+def save_plan(db, user_id, start_date, end_date, rows):
+    """replace_pending_sessions() for one user in its own transaction."""
+    cur = db.cursor()
+    try:
+        replace_pending_sessions(cur, (user_id,), start_date, end_date, rows)
+        bump_data_version(cur, (user_id,))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cur.close()
 
 
-def minutes_from_hours(h):
-    return int(round(h * 60))
+def week_planner(inputs):
+    """The PLANNER_SOLVER week planner for PlanInputs, plan_week with its slots if it has availability."""
+    if inputs.availability is not None:
+        return partial(plan_week, availability=inputs.availability)
+    return WEEK_SOLVERS[PLANNER_SOLVER]
 
 
 def generate_daily_plan(get_connection, user_id, plan_date=None, persist=False):
@@ -51,388 +165,212 @@ def generate_daily_plan(get_connection, user_id, plan_date=None, persist=False):
     Generate (and optionally save) a daily plan for user_id for plan_date (date obj).
     - get_connection: function to return a DB connection (use your db.get_connection)
     - plan_date: datetime.date object. If None, uses today().
-    - persist: if True, inserts rows into study_sessions (status 'pending').
+    - persist: if True, replaces the pending study_sessions of plan_date with the plan.
     Returns: dict with metadata and list of session dicts in order.
     """
     if plan_date is None:
         plan_date = date.today()
 
-    # Connect DB
     db = get_connection()
     cur = db.cursor(dictionary=True)
+    inputs = load_plan_inputs(cur, user_id, plan_date, subtract_completed=False)
+    daily_hours = inputs.daily_hours if inputs.daily_hours is not None else DEFAULT_DAILY_HOURS
 
-    # 1) Get user preference (daily hours). Fallback default.
-    cur.execute("SELECT daily_study_hours FROM user_preferences WHERE user_id=%s", (user_id,))
-    pref = cur.fetchone()
-    daily_hours = float(pref["daily_study_hours"]) if pref and pref.get("daily_study_hours") is not None else DEFAULT_DAILY_HOURS
-    available_minutes = minutes_from_hours(daily_hours)
-    # Guard minimum
-    if available_minutes < SESSION_MINIMUM_MINUTES:
-        # Minimum one session worth (25 minutes)
-        available_minutes = SESSION_MINIMUM_MINUTES
-
-    # 2) Get next upcoming exam per subject (subject -> next_exam_date)
-    cur.execute("SELECT subject_id, MIN(exam_date) AS next_exam FROM exams WHERE exam_date >= %s GROUP BY subject_id", (plan_date,))
-    exam_rows = cur.fetchall()
-    next_exam_by_subject = {r["subject_id"]: r["next_exam"] for r in exam_rows}
-
-    # 3) Get topics for user (join subjects to ensure user-owned)
-    cur.execute("""
-        SELECT t.topic_id, t.subject_id, t.topic_name, t.difficulty_level, t.importance, t.confidence_level, t.hours_required, s.subject_name
-        FROM topics t
-        JOIN subjects s ON t.subject_id = s.subject_id
-        WHERE s.user_id = %s
-    """, (user_id,))
-    topic_rows = cur.fetchall()
-
-    # If no topics: return empty plan
-    if not topic_rows:
-        cur.close()
-        db.close()
-        return {"date": plan_date.isoformat(), "daily_hours": daily_hours, "sessions": [], "note": "No topics available."}
-
-    # 4) Build topic objects with computed effective priority
-    topics = []
-    for r in topic_rows:
-        subj_id = r["subject_id"]
-        next_exam = next_exam_by_subject.get(subj_id)
-        if next_exam:
-            days_until = (next_exam - plan_date).days
-        else:
-            days_until = 9999  # no exam -> very low urgency
-
-        priority_score = compute_priority_score(r["difficulty_level"], r["importance"], r["confidence_level"])
-        urgency_multiplier = compute_urgency_multiplier(days_until)
-        spaced_multiplier = 1.2 if r["confidence_level"] < 3 else 1.0  # weakened topics get boost
-        effective_priority = priority_score * urgency_multiplier * spaced_multiplier
-
-        remaining_minutes = minutes_from_hours(float(r["hours_required"]))
-
-        topics.append({
-            "topic_id": r["topic_id"],
-            "subject_id": subj_id,
-            "subject_name": r["subject_name"],
-            "topic_name": r["topic_name"],
-            "difficulty": r["difficulty_level"],
-            "importance": r["importance"],
-            "confidence": r["confidence_level"],
-            "hours_required": float(r["hours_required"]),
-            "remaining_minutes": remaining_minutes,
-            "priority_score": priority_score,
-            "urgency_multiplier": urgency_multiplier,
-            "spaced_multiplier": spaced_multiplier,
-            "effective_priority": effective_priority,
-            "days_until_exam": days_until
-        })
-
-    # 5) Sort topics by effective priority descending
-    topics.sort(key=lambda x: x["effective_priority"], reverse=True)
-
-    sessions = []
-    # We'll first try to allocate as many full preferred sessions (50 min) as possible greedily.
-    # Loop over topics and assign blocks of SESSION_PREFERRED_MINUTES while possible.
-    minutes_left = available_minutes
-
-    # Primary pass: assign 50-min blocks
-    for t in topics:
-        while minutes_left >= SESSION_PREFERRED_MINUTES and t["remaining_minutes"] >= SESSION_PREFERRED_MINUTES:
-            # allocate one block
-            sessions.append({
-                "topic_id": chosen["topic_id"],
-                "subject_id": chosen["subject_id"],
-                "subject_name": chosen["subject_name"],
-                "topic_name": chosen["topic_name"],
-                "duration_minutes": int(alloc),   # make absolutely sure it's int
-                "days_until_exam": chosen["days_until_exam"]
-            })
-
-            t["remaining_minutes"] -= SESSION_PREFERRED_MINUTES
-            minutes_left -= SESSION_PREFERRED_MINUTES
-        # continue to next topic
-
-    # Secondary pass: try to allocate remaining time in chunks >= SESSION_MINIMUM_MINUTES
-    # Re-sort topics again by remaining effective priority (some topics now still most urgent)
-    topics.sort(key=lambda x: x["effective_priority"], reverse=True)
-    # While we have enough minutes for at least minimum and any topic has remaining minutes:
-    while minutes_left >= SESSION_MINIMUM_MINUTES:
-        # find next topic with remaining_minutes >= SESSION_MINIMUM_MINUTES
-        chosen = None
-        for t in topics:
-            if t["remaining_minutes"] >= SESSION_MINIMUM_MINUTES:
-                chosen = t
-                break
-        if not chosen:
-            break
-
-        # allocate either remaining_minutes (capped by SESSION_PREFERRED or minutes_left)
-        alloc = min(chosen["remaining_minutes"], SESSION_PREFERRED_MINUTES, minutes_left)
-        # If alloc would be < SESSION_MINIMUM_MINUTES, break
-        if alloc < SESSION_MINIMUM_MINUTES:
-            break
-        sessions.append({
-            "topic_id": chosen["topic_id"],
-            "subject_id": chosen["subject_id"],
-            "subject_name": chosen["subject_name"],
-            "topic_name": chosen["topic_name"],
-            "duration_minutes": alloc,
-            "notes": None,
-            "days_until_exam": chosen["days_until_exam"]
-        })
-        chosen["remaining_minutes"] -= alloc
-        minutes_left -= alloc
-
-    # If no sessions allocated (rare), return empty note
-    if not sessions:
-        cur.close()
-        db.close()
-        return {"date": plan_date.isoformat(), "daily_hours": daily_hours, "sessions": [], "note": "Not enough time to schedule even a minimum session."}
+    plan = plan_day(inputs.topics, daily_hours, inputs.next_exam_by_subject, plan_date, inputs.availability)
 
-    # Assign start times sequentially if persisting; otherwise default times
-    # We will use DEFAULT_START_TIME (08:00) and increment by session + BREAK_MINUTES when saving.
     if persist:
-        # Persist to study_sessions (status pending) and assign times starting from DEFAULT_START_TIME
-        schedule_time = datetime.combine(plan_date, DEFAULT_START_TIME)
-        cur_insert = db.cursor()
-        for s in sessions:
-            scheduled_time_str = schedule_time.time().strftime("%H:%M:%S")
-            cur_insert.execute(
-                "INSERT INTO study_sessions (user_id, topic_id, scheduled_date, scheduled_time, duration_minutes, status) VALUES (%s,%s,%s,%s,%s,%s)",
-                (user_id, s["topic_id"], plan_date, scheduled_time_str, s["duration_minutes"], 'pending')
-            )
-            # increment schedule_time by duration + break
-            schedule_time += timedelta(minutes=(s["duration_minutes"] + BREAK_MINUTES))
-        db.commit()
-        cur_insert.close()
+        rows = session_rows(user_id, plan_date, plan["sessions"])
+        save_plan(db, user_id, plan_date, plan_date + timedelta(days=1), rows)
 
     cur.close()
     db.close()
+    return plan
 
-    # Return plan (sessions in order). Include leftover minutes and some metadata.
-    return {
-        "date": plan_date.isoformat(),
-        "daily_hours": daily_hours,
-        "available_minutes_initial": minutes_from_hours(daily_hours),
-        "available_minutes_left": minutes_left,
-        "sessions": sessions
-    }
 
-def generate_weekly_plan(user_id, start_date=None, persist=False):
+def generate_weekly_plan(user_id, start_date=None, persist=False, days=7):
     """
-    Generate a week's plan for the user (7 days starting start_date or today).
+    Generate a week's plan for the user (`days` days, 7 by default, starting start_date or today).
     Respects completed minutes in study_sessions and tracks remaining minutes across the week.
-    Returns a list of 7 day dicts. Each day dict contains a date (datetime.date object),
+    Returns a list of day dicts. Each day dict contains a date (datetime.date object),
     daily_hours, available_minutes_left, and sessions list.
+    With persist, the planned days' pending study_sessions are replaced with the plan.
     """
     if start_date is None:
         start_date = date.today()
 
     db = get_connection()
     cur = db.cursor(dictionary=True)
+    inputs = load_plan_inputs(cur, user_id, start_date)
+    daily_hours = inputs.daily_hours or DEFAULT_DAILY_HOURS
 
-    # 1) Get user preference
-    cur.execute("SELECT daily_study_hours FROM user_preferences WHERE user_id=%s", (user_id,))
-    pref = cur.fetchone()
-    daily_hours = float(pref["daily_study_hours"]) if pref and pref.get("daily_study_hours") else DEFAULT_DAILY_HOURS
-    daily_minutes = minutes_from_hours(daily_hours)
-    if daily_minutes < SESSION_MINIMUM_MINUTES:
-        daily_minutes = SESSION_MINIMUM_MINUTES
+    weekly_plan = week_planner(inputs)(inputs.topics, daily_hours, inputs.next_exam_by_subject, start_date, days)
 
-    # 2) Get next exams (for urgency calculations)
-    cur.execute(
-        "SELECT subject_id, MIN(exam_date) AS next_exam FROM exams WHERE exam_date >= %s GROUP BY subject_id",
-        (start_date,)
-    )
-    exam_rows = cur.fetchall()
-    next_exam_by_subject = {r["subject_id"]: r["next_exam"] for r in exam_rows}
-
-    # 3) Load topics for this user
-    cur.execute("""
-        SELECT t.topic_id, t.subject_id, t.topic_name, t.difficulty_level, t.importance, t.confidence_level, t.hours_required, s.subject_name
-        FROM topics t
-        JOIN subjects s ON t.subject_id = s.subject_id
-        WHERE s.user_id=%s
-    """, (user_id,))
-    topic_rows = cur.fetchall()
-
-    if not topic_rows:
-        cur.close()
-        db.close()
-        # Return 7 empty day dicts (dates are date objects)
-        return [{
-            "date": (start_date + timedelta(days=i)),
-            "daily_hours": daily_hours,
-            "available_minutes_left": daily_minutes,
-            "sessions": [],
-            "note": "No topics"
-        } for i in range(7)]
-
-    # 4) Get completed minutes per topic (so we subtract already-done work)
-    topic_ids = [t["topic_id"] for t in topic_rows]
-    completed_minutes_by_topic = {}
-    if topic_ids:
-        placeholders = ",".join(["%s"] * len(topic_ids))
-        sql = f"""
-            SELECT topic_id, COALESCE(SUM(duration_minutes),0) AS completed_minutes
-            FROM study_sessions
-            WHERE topic_id IN ({placeholders}) AND user_id=%s AND status='completed'
-            GROUP BY topic_id
-        """
-        params = tuple(topic_ids) + (user_id,)
-        cur.execute(sql, params)
-        for r in cur.fetchall():
-            completed_minutes_by_topic[r["topic_id"]] = int(r["completed_minutes"] or 0)
-
-    # 5) Build topics_by_id mapping with normalized keys and remaining_minutes
-    topics_by_id = {}
-    for t in topic_rows:
-        tid = t["topic_id"]
-        total_minutes = minutes_from_hours(float(t["hours_required"]))
-        completed = completed_minutes_by_topic.get(tid, 0)
-        remaining = total_minutes - completed
-        if remaining <= 0:
-            # already completed — skip adding it
-            continue
-
-        topics_by_id[tid] = {
-            "topic_id": tid,
-            "subject_id": t["subject_id"],
-            "subject_name": t["subject_name"],
-            "topic_name": t["topic_name"],
-            "difficulty": t.get("difficulty_level", 1),
-            "importance": t.get("importance", 1),
-            "confidence": t.get("confidence_level", 3),
-            "hours_required": float(t["hours_required"]),
-            "remaining_minutes": remaining
-        }
-
-    # If all topics are completed
-    if not topics_by_id:
-        cur.close()
-        db.close()
-        return [{
-            "date": (start_date + timedelta(days=i)),
-            "daily_hours": daily_hours,
-            "available_minutes_left": daily_minutes,
-            "sessions": [],
-            "note": "All topics already completed."
-        } for i in range(7)]
-
-    # Prepare cursor for inserts if persisting
-    cur_insert = None
     if persist:
-        cur_insert = db.cursor()
-
-    weekly_plan = []
-
-    # 6) Build plan day-by-day, updating topics_by_id remaining_minutes as we allocate
-    for day_offset in range(7):
-        plan_date = start_date + timedelta(days=day_offset)
-        minutes_left = daily_minutes
-
-        # Build today's candidate list from topics_by_id (only items with remaining_minutes > 0)
-        todays = []
-        for t in topics_by_id.values():
-            if t["remaining_minutes"] <= 0:
-                continue
-            next_exam = next_exam_by_subject.get(t["subject_id"])
-            days_until = (next_exam - plan_date).days if next_exam else None
-            priority_score = compute_priority_score(t["difficulty"], t["importance"], t["confidence"])
-            urgency_multiplier = compute_urgency_multiplier(days_until if days_until is not None else 9999)
-            spaced = 1.2 if t["confidence"] < 3 else 1.0
-            effective_priority = priority_score * urgency_multiplier * spaced
-
-            todays.append({
-                "topic_id": t["topic_id"],
-                "subject_id": t["subject_id"],
-                "subject_name": t["subject_name"],
-                "topic_name": t["topic_name"],
-                "remaining_minutes": t["remaining_minutes"],
-                "effective_priority": effective_priority,
-                "days_until_exam": days_until
-            })
-
-        # Sort today's candidates by effective priority
-        todays.sort(key=lambda x: x["effective_priority"], reverse=True)
-
-        sessions = []
-
-        # Primary allocation: 50-min blocks
-        for cand in todays:
-            while minutes_left >= SESSION_PREFERRED_MINUTES and cand["remaining_minutes"] >= SESSION_PREFERRED_MINUTES:
-                alloc = SESSION_PREFERRED_MINUTES
-                sessions.append({
-                    "topic_id": cand["topic_id"],
-                    "subject_id": cand["subject_id"],
-                    "subject_name": cand["subject_name"],
-                    "topic_name": cand["topic_name"],
-                    "duration_minutes": alloc,
-                    "days_until_exam": cand["days_until_exam"]
-                })
-                # decrement both candidate and master record
-                cand["remaining_minutes"] -= alloc
-                topics_by_id[cand["topic_id"]]["remaining_minutes"] = cand["remaining_minutes"]
-                minutes_left -= alloc
-
-        # Secondary allocation: fill remaining minutes >= minimum
-        # Rebuild todays list (some remaining_minutes may have changed)
-        todays = [t for t in todays if t["remaining_minutes"] >= SESSION_MINIMUM_MINUTES]
-        todays.sort(key=lambda x: x["effective_priority"], reverse=True)
-
-        while minutes_left >= SESSION_MINIMUM_MINUTES and todays:
-            # pick first candidate with remaining_minutes >= minimum
-            chosen = None
-            for c in todays:
-                if c["remaining_minutes"] >= SESSION_MINIMUM_MINUTES:
-                    chosen = c
-                    break
-            if not chosen:
-                break
-            alloc = min(chosen["remaining_minutes"], SESSION_PREFERRED_MINUTES, minutes_left)
-            if alloc < SESSION_MINIMUM_MINUTES:
-                break
-            sessions.append({
-                "topic_id": chosen["topic_id"],
-                "subject_id": chosen["subject_id"],
-                "subject_name": chosen["subject_name"],
-                "topic_name": chosen["topic_name"],
-                "duration_minutes": int(alloc),
-                "days_until_exam": chosen["days_until_exam"]
-            })
-            chosen["remaining_minutes"] -= alloc
-            topics_by_id[chosen["topic_id"]]["remaining_minutes"] = chosen["remaining_minutes"]
-            minutes_left -= alloc
-
-            # refresh todays list for the loop
-            todays = [t for t in todays if topics_by_id[t["topic_id"]]["remaining_minutes"] >= SESSION_MINIMUM_MINUTES]
-            todays.sort(key=lambda x: x["effective_priority"], reverse=True)
-
-        # Persist today's sessions if requested
-        if persist and sessions:
-            schedule_time = datetime.combine(plan_date, DEFAULT_START_TIME)
-            for s in sessions:
-                cur_insert.execute(
-                    "INSERT INTO study_sessions (user_id, topic_id, scheduled_date, scheduled_time, duration_minutes, status) VALUES (%s,%s,%s,%s,%s,%s)",
-                    (user_id, s["topic_id"], plan_date, schedule_time.time().strftime("%H:%M:%S"), s["duration_minutes"], "pending")
-                )
-                schedule_time += timedelta(minutes=(s["duration_minutes"] + BREAK_MINUTES))
-
-        day_entry = {
-            "date": plan_date,                  # keep as date object for jinja strftime
-            "daily_hours": daily_hours,
-            "available_minutes_initial": daily_minutes,
-            "available_minutes_left": minutes_left,
-            "sessions": sessions
-        }
-        if not sessions:
-            day_entry["note"] = "No sessions scheduled today (all topics exhausted or not enough time)."
-
-        weekly_plan.append(day_entry)
-
-    # commit inserts if we persisted
-    if persist and cur_insert:
-        db.commit()
-        cur_insert.close()
+        rows = [row for day in weekly_plan for row in session_rows(user_id, day["date"], day["sessions"])]
+        save_plan(db, user_id, start_date, start_date + timedelta(days=len(weekly_plan)), rows)
 
     cur.close()
     db.close()
     return weekly_plan
+
+
+def iter_plan(user_id, start_date=None, days=None):
+    """
+    The user's plan from start_date as an iterator of day dicts, planned as
+    they are consumed (planner_engine.iter_plan_days): `days` days or, by
+    default, up to the last exam, at most MAX_PLAN_DAYS. Urgency follows each
+    subject's next exam on every day. The inputs are loaded before returning
+    and the iterator does not use the database. Outside a request the
+    connection is back in the pool by then; inside one it is the request's
+    connection, which a caller consuming the iterator slowly (a streamed
+    response) should release first with db.close_request_connection().
+    The optimal solver plans the whole horizon at once.
+    """
+    if start_date is None:
+        start_date = date.today()
+
+    db = get_connection()
+    cur = db.cursor(dictionary=True)
+    try:
+        inputs = load_plan_inputs(cur, user_id, start_date)
+        exam_dates_by_subject = load_exam_dates(cur, user_id, start_date)
+    finally:
+        cur.close()
+        db.close()
+    daily_hours = inputs.daily_hours or DEFAULT_DAILY_HOURS
+
+    if days is None:
+        days = horizon_days(start_date, inputs.next_exam_by_subject, exam_dates_by_subject)
+    days = max(1, min(days, MAX_PLAN_DAYS))
+    if PLANNER_SOLVER != "greedy" and inputs.availability is None:
+        return iter(WEEK_SOLVERS[PLANNER_SOLVER](inputs.topics, daily_hours, inputs.next_exam_by_subject, start_date, days))
+    return iter_plan_days(inputs.topics, daily_hours, inputs.next_exam_by_subject, start_date, days, exam_dates_by_subject,
+                          inputs.availability)
+
+
+def replan_weekly(user_id, start_date=None):
+    """
+    The user's week plan from start_date and the data version it was planned
+    for: (plan, version). The plan is cached per (user_id, start_date) with
+    the state planner_engine.replan_week() needs, so after a change (see
+    cache.py) only the affected days are re-planned, and kept in plan_history
+    under its version as a baseline for weekly_plan_since().
+    The returned plan is shared between callers: don't modify it.
+    """
+    if start_date is None:
+        start_date = date.today()
+
+    key = (user_id, start_date)
+    db = get_connection()
+    try:
+        version = data_version(db, user_id)   # read before loading, see VersionedLRUCache
+        state, fresh = plan_cache.lookup(key, version)
+        if fresh:
+            return state.plan, version
+        cur = db.cursor(dictionary=True)
+        try:
+            inputs = load_plan_inputs(cur, user_id, start_date)
+        finally:
+            cur.close()
+    finally:
+        db.close()
+    daily_hours = inputs.daily_hours or DEFAULT_DAILY_HOURS
+
+    if PLANNER_SOLVER != "greedy" or inputs.availability is not None:
+        # Only the greedy planner without slots can be updated incrementally
+        state = WeekPlan(inputs.topics, daily_hours, inputs.next_exam_by_subject, start_date)
+        state.plan = week_planner(inputs)(inputs.topics, daily_hours, inputs.next_exam_by_subject, start_date)
+    elif state is None:
+        state = plan_week_state(inputs.topics, daily_hours, inputs.next_exam_by_subject, start_date)
+    else:
+        state, _ = replan_week(state, inputs.topics, daily_hours, inputs.next_exam_by_subject)
+    plan_cache.put(key, version, state)
+    plan_history.put(key + (version,), version, state.plan)
+    return state.plan, version
+
+
+def get_weekly_plan(user_id, start_date=None):
+    """Cached generate_weekly_plan(user_id, start_date) without persisting, see replan_weekly()."""
+    return replan_weekly(user_id, start_date)[0]
+
+
+def plan_token(start_date, version):
+    """Opaque token of a week plan handed to clients: its start date and data version."""
+    return f"{start_date.isoformat()}.{version}"
+
+
+def parse_plan_token(token):
+    """(start_date, version) of a plan_token(), None if it is not one."""
+    try:
+        start, version = token.split(".")
+        return date.fromisoformat(start), int(version)
+    except (AttributeError, ValueError):
+        return None
+
+
+def weekly_plan_since(user_id, since, start_date=None):
+    """
+    The user's week plan and what changed since the plan a client shows, given
+    by its plan_token() since: (plan, token, diff) with diff as in
+    planner_engine.plan_diff(), [] if nothing changed and None if that plan is
+    not known here (another worker planned it, it was evicted or expired, it
+    started on another day, or since is None), in which case the client takes
+    the whole plan. Reading a plan never consumes a diff: any number of
+    clients can ask, and /plan/weekly is unaffected.
+    """
+    if start_date is None:
+        start_date = date.today()
+    plan, version = replan_weekly(user_id, start_date)
+    token = plan_token(start_date, version)
+    baseline = parse_plan_token(since)
+    if baseline is None or baseline[0] != start_date:
+        return plan, token, None
+    if baseline[1] == version:
+        return plan, token, []
+    previous = plan_history.get((user_id, start_date, baseline[1]), baseline[1])
+    return plan, token, None if previous is None else plan_diff(previous, plan)
+
+
+def simulate_weekly_plan(user_id, variants, start_date=None, days=7):
+    """
+    planner_engine.simulate_plans() for the user's week: coverage metrics of
+    each variant (other daily hours, priority weights or session lengths).
+    The inputs are taken from the week plan cached by replan_weekly() while
+    it is current, otherwise loaded once for all variants; nothing is
+    cached or persisted. Raises ValueError for invalid or too many variants.
+    """
+    if len(variants) > MAX_SIMULATION_VARIANTS:
+        raise ValueError(f"At most {MAX_SIMULATION_VARIANTS} variants per simulation")
+    validate_variants(variants)
+    if start_date is None:
+        start_date = date.today()
+
+    db = get_connection()
+    try:
+        state, fresh = plan_cache.lookup((user_id, start_date), data_version(db, user_id))
+        if fresh:
+            topics, daily_hours, next_exam_by_subject = state.topics, state.daily_hours, state.next_exam_by_subject
+        else:
+            cur = db.cursor(dictionary=True)
+            try:
+                inputs = load_plan_inputs(cur, user_id, start_date)
+            finally:
+                cur.close()
+            topics, next_exam_by_subject = inputs.topics, inputs.next_exam_by_subject
+            daily_hours = inputs.daily_hours or DEFAULT_DAILY_HOURS
+    finally:
+        db.close()
+    return simulate_plans(topics, daily_hours, next_exam_by_subject, start_date, variants, days)
+
+
+def due_reviews(user_id, on_date=None, limit=MAX_REVIEWS_PER_DAY):
+    """The user's topics due for review on on_date (default today), most overdue first."""
+    if on_date is None:
+        on_date = date.today()
+    db = get_connection()
+    cur = db.cursor(dictionary=True)
+    try:
+        return load_due_reviews(cur, user_id, on_date, limit)
+    finally:
+        cur.close()
+        db.close()
@@ -0,0 +1,943 @@
+# planner_engine.py
+# Side-effect free planning engine: no database access, no clock. It takes the
+# topic records and preferences built by planner_loader and returns plans, so it
+# can run offline, in worker processes, or on cached inputs.
+from bisect import bisect_left
+from datetime import timedelta
+from itertools import accumulate
+import heapq
+import math
+
+from planner_reviews import REVIEW_MINUTES, review_scheduler
+from planner_slots import MINUTES_PER_DAY, SlotIndex, pack_sessions, usable_minutes
+
+try:
+    import numpy as np
+except ImportError:  # score_topics() falls back to the scalar functions
+    np = None
+
+# Configurable constants
+PRIORITY_WEIGHTS = {
+    "difficulty": 0.3,
+    "importance": 0.3,
+    "confidence_inv": 0.4  # using (6 - confidence)
+}
+URGENCY_LOOKBACK_DAYS = 30
+MAX_URGENCY_MULTIPLIER = 2.0  # when exam is today or passed
+SESSION_PREFERRED_MINUTES = 50
+SESSION_MINIMUM_MINUTES = 25
+BREAK_MINUTES = 10   # not counted against user's daily_study_hours (assumption)
+DEFAULT_DAILY_HOURS = 2.0
+NO_EXAM_DAYS = 9999  # days_until_exam used for urgency when a subject has no exam
+DEFAULT_HORIZON_DAYS = 7  # plan length when planning "up to the last exam" without exams
+SCORE_CHUNK_DAYS = 7  # days scored together by iter_plan_days()
+PACKING_ATTEMPTS = 3  # allocations per day when sessions don't fit the free slots
+
+
+def compute_priority_score(difficulty, importance, confidence, weights=None):
+    """Compute intrinsic priority score for a topic (weights default to PRIORITY_WEIGHTS)."""
+    if weights is None:
+        weights = PRIORITY_WEIGHTS
+    return (
+        difficulty * weights["difficulty"]
+        + importance * weights["importance"]
+        + (6 - confidence) * weights["confidence_inv"]
+    )
+
+
+def compute_urgency_multiplier(days_until_exam):
+    """Compute urgency multiplier from days until exam (int)."""
+    if days_until_exam <= 0:
+        return MAX_URGENCY_MULTIPLIER
+    if days_until_exam >= URGENCY_LOOKBACK_DAYS:
+        return 1.0
+    # linear ramp from 1.0 -> MAX_URGENCY_MULTIPLIER as days -> 0
+    frac = (URGENCY_LOOKBACK_DAYS - days_until_exam) / URGENCY_LOOKBACK_DAYS
+    return 1.0 + frac * (MAX_URGENCY_MULTIPLIER - 1.0)
+
+
+def minutes_from_hours(h):
+    return int(round(h * 60))
+
+
+def daily_minutes_for(daily_hours):
+    """Minutes available per day, at least one minimum session."""
+    return max(minutes_from_hours(daily_hours), SESSION_MINIMUM_MINUTES)
+
+
+class ScoreBasis:
+    """
+    The part of score_topics() that doesn't depend on the priority weights,
+    for `days` days from start_date: days_until[i] (days from start_date to
+    the next exam of topics[i], None without exam), the urgency multiplier of
+    every topic on every day and the low-confidence boost. Only
+    days_until_exam changes from one day to the next, so the rest is computed
+    once per topic; scores() then costs one multiplication per topic and day
+    for any weights. With NumPy all days are computed in one vectorized pass;
+    without it the scalar functions above are used, with the same results.
+    """
+
+    __slots__ = ("topics", "days_until", "urgency", "spaced")
+
+    def __init__(self, topics, next_exam_by_subject, start_date, days=7):
+        self.topics = topics
+        self.days_until = days_until = []
+        for t in topics:
+            next_exam = next_exam_by_subject.get(t.subject_id)
+            days_until.append((next_exam - start_date).days if next_exam else None)
+
+        if np is None or not topics:
+            self.spaced = [1.2 if t.confidence < 3 else 1.0 for t in topics]  # weakened topics get boost
+            self.urgency = [
+                [compute_urgency_multiplier(du - day_offset if du is not None else NO_EXAM_DAYS) for du in days_until]
+                for day_offset in range(days)
+            ]
+            return
+
+        n = len(topics)
+        confidence = np.fromiter((t.confidence for t in topics), dtype=np.float64, count=n)
+        exam_days = np.fromiter((NO_EXAM_DAYS if du is None else du for du in days_until), dtype=np.int64, count=n)
+        self.spaced = np.where(confidence < 3, 1.2, 1.0)
+        d = exam_days[np.newaxis, :] - np.arange(days, dtype=np.int64)[:, np.newaxis]
+        frac = (URGENCY_LOOKBACK_DAYS - d) / URGENCY_LOOKBACK_DAYS
+        self.urgency = np.where(
+            d <= 0,
+            MAX_URGENCY_MULTIPLIER,
+            np.where(d >= URGENCY_LOOKBACK_DAYS, 1.0, 1.0 + frac * (MAX_URGENCY_MULTIPLIER - 1.0)),
+        )
+
+    def scores(self, weights=None):
+        """scores[day][i]: effective priority of topics[i] on start_date + day under weights (default PRIORITY_WEIGHTS)."""
+        if weights is None:
+            weights = PRIORITY_WEIGHTS
+        topics = self.topics
+        if isinstance(self.urgency, list):
+            priority = [compute_priority_score(t.difficulty, t.importance, t.confidence, weights) for t in topics]
+            return [
+                [priority_score * urgency_multiplier * spaced
+                 for priority_score, urgency_multiplier, spaced in zip(priority, row, self.spaced)]
+                for row in self.urgency
+            ]
+
+        n = len(topics)
+        difficulty = np.fromiter((t.difficulty for t in topics), dtype=np.float64, count=n)
+        importance = np.fromiter((t.importance for t in topics), dtype=np.float64, count=n)
+        confidence = np.fromiter((t.confidence for t in topics), dtype=np.float64, count=n)
+        # Same operations in the same order as the scalar functions, so the floats
+        # (and the ordering of ties) are identical
+        priority_score = (
+            difficulty * weights["difficulty"]
+            + importance * weights["importance"]
+            + (6 - confidence) * weights["confidence_inv"]
+        )
+        return (priority_score * self.urgency * self.spaced).tolist()
+
+
+def score_topics(topics, next_exam_by_subject, start_date, days=7, weights=None):
+    """
+    Effective priority of every topic on each of `days` days from start_date.
+    - topics: records with subject_id, difficulty, importance, confidence
+    - weights: priority weights like PRIORITY_WEIGHTS (the default)
+    Returns (days_until, scores): days_until[i] is the number of days from
+    start_date to the next exam of topics[i] (None without exam) and
+    scores[day][i] its effective priority on start_date + day. See ScoreBasis.
+    """
+    basis = ScoreBasis(topics, next_exam_by_subject, start_date, days)
+    return basis.days_until, basis.scores(weights)
+
+
+def session_entry(topic, duration_minutes, days_until, day_offset=0):
+    """Session dict of a plan (days_until counted from the plan start)."""
+    return {
+        "topic_id": topic.topic_id,
+        "subject_id": topic.subject_id,
+        "subject_name": topic.subject_name,
+        "topic_name": topic.topic_name,
+        "duration_minutes": int(duration_minutes),
+        "days_until_exam": days_until - day_offset if days_until is not None else None
+    }
+
+
+def allocate_day(topics, scores, remaining, minutes_left, days_until, day_offset=0,
+                 preferred_minutes=SESSION_PREFERRED_MINUTES, minimum_minutes=SESSION_MINIMUM_MINUTES):
+    """
+    Greedy allocation of one day's minutes over topics, highest score first,
+    ties in list order:
+    - primary pass: preferred_minutes blocks per topic in turn
+    - secondary pass: blocks of minimum_minutes..preferred_minutes,
+      again from the top, until the day is full.
+    scores, remaining and days_until are indexed like topics; remaining is
+    decremented in place and days_until (from the plan start) is reported per
+    session relative to day_offset.
+    Topics come off a heap only as far as the day reaches, so a day costs
+    O(n + k log n) for n topics and k of them used, instead of re-sorting.
+    Returns (sessions, minutes_left).
+    """
+    heap = [(-scores[i], i) for i in range(len(topics)) if remaining[i] > 0]
+    heapq.heapify(heap)
+    popped = []
+    sessions = []
+
+    def book(i, alloc):
+        sessions.append(session_entry(topics[i], alloc, days_until[i], day_offset))
+        remaining[i] -= alloc
+
+    # Primary allocation: preferred-length blocks
+    while minutes_left >= preferred_minutes and heap:
+        i = heapq.heappop(heap)[1]
+        popped.append(i)
+        while minutes_left >= preferred_minutes and remaining[i] >= preferred_minutes:
+            book(i, preferred_minutes)
+            minutes_left -= preferred_minutes
+
+    # Secondary allocation: fill remaining minutes >= minimum, the topics
+    # already popped first since they rank above everything left in the heap
+    def in_priority_order():
+        yield from popped
+        while heap:
+            yield heapq.heappop(heap)[1]
+
+    for i in in_priority_order():
+        if minutes_left < minimum_minutes:
+            break
+        while minutes_left >= minimum_minutes and remaining[i] >= minimum_minutes:
+            alloc = min(remaining[i], preferred_minutes, minutes_left)
+            book(i, alloc)
+            minutes_left -= alloc
+
+    return sessions, minutes_left
+
+
+def slot_minutes(free_slots, daily_minutes):
+    """A day's minutes capped at what its free slots can hold."""
+    return min(daily_minutes, usable_minutes(free_slots, SESSION_PREFERRED_MINUTES, BREAK_MINUTES, SESSION_MINIMUM_MINUTES))
+
+
+def allocate_day_in_slots(topics, scores, remaining, daily_minutes, days_until, free_slots, day_offset=0,
+                          fixed_sessions=(), reviews=None):
+    """
+    allocate_day() into a day's free slots (see planner_slots): the day's
+    minutes are capped at what the slots can hold (slot_minutes()), the
+    sessions are packed into them with BREAK_MINUTES after each, and if some
+    don't fit, the day is allocated again with that much less time. After
+    PACKING_ATTEMPTS the sessions that still don't fit are dropped and their
+    minutes given back.
+    fixed_sessions (the day's reviews) are packed first and their minutes
+    taken from the day; those that don't fit are left out and, with reviews
+    (the planner_reviews.ReviewScheduler that handed them out), put back to
+    be reviewed on a later day.
+    Returns (sessions with a start_time, minutes_left, the day's minutes).
+    """
+    day_minutes = slot_minutes(free_slots, daily_minutes)
+    _, unplaced = pack_sessions(fixed_sessions, SlotIndex(free_slots), BREAK_MINUTES)
+    if unplaced:
+        if reviews is not None:
+            reviews.put_back(s["topic_id"] for s in unplaced)
+        # Packing is first fit in order, so the others keep their slots
+        left_out = {id(s) for s in unplaced}
+        fixed_sessions = [s for s in fixed_sessions if id(s) not in left_out]
+    minutes = day_minutes - sum(s["duration_minutes"] for s in fixed_sessions)
+    index_of = None
+    for attempt in range(PACKING_ATTEMPTS):
+        sessions, minutes_left = allocate_day(topics, scores, remaining, minutes, days_until, day_offset)
+        slot_index = SlotIndex(free_slots)
+        fixed, _ = pack_sessions(fixed_sessions, slot_index, BREAK_MINUTES)
+        placed, unplaced = pack_sessions(sessions, slot_index, BREAK_MINUTES)
+        if fixed:
+            placed = sorted(fixed + placed, key=lambda s: s["start_time"])
+        if not unplaced:
+            return placed, minutes_left, day_minutes
+        if index_of is None:
+            index_of = {t.topic_id: i for i, t in enumerate(topics)}
+        last = attempt == PACKING_ATTEMPTS - 1
+        for s in (unplaced if last else sessions):
+            remaining[index_of[s["topic_id"]]] += s["duration_minutes"]
+        if last:
+            return placed, day_minutes - sum(s["duration_minutes"] for s in placed), day_minutes
+        minutes -= sum(s["duration_minutes"] for s in unplaced)
+
+
+def review_sessions(reviews, topics, next_exam_by_subject, day, day_minutes):
+    """
+    Session dicts (with "review": True) of the reviews a
+    planner_reviews.ReviewScheduler hands out for day, [] without one.
+    Reviews come before the day's study and don't use up remaining minutes.
+    """
+    if reviews is None:
+        return []
+    sessions = []
+    for i in reviews.take(day, day_minutes):
+        t = topics[i]
+        exam = next_exam_by_subject.get(t.subject_id)
+        session = session_entry(t, REVIEW_MINUTES, (exam - day).days if exam is not None else None)
+        session["review"] = True
+        sessions.append(session)
+    return sessions
+
+
+def plan_day(topics, daily_hours, next_exam_by_subject, plan_date, availability=None):
+    """
+    Plan a single day. Topics are scheduled from their remaining_minutes,
+    after the reviews due that day (see review_sessions()).
+    With availability (planner_slots.Availability) the sessions are packed
+    into the day's free slots and carry a start_time.
+    Returns a dict with metadata and the list of session dicts in order.
+    """
+    if not topics:
+        return {"date": plan_date.isoformat(), "daily_hours": daily_hours, "sessions": [], "note": "No topics available."}
+
+    days_until, scores = score_topics(topics, next_exam_by_subject, plan_date, days=1)
+    days_until = [NO_EXAM_DAYS if du is None else du for du in days_until]  # no exam -> very low urgency
+    remaining = [t.remaining_minutes for t in topics]
+    daily_minutes = daily_minutes_for(daily_hours)
+    reviews = review_scheduler(topics, plan_date, 1)
+    if availability is None:
+        reviewed = review_sessions(reviews, topics, next_exam_by_subject, plan_date, daily_minutes)
+        sessions, minutes_left = allocate_day(topics, scores[0], remaining, daily_minutes - REVIEW_MINUTES * len(reviewed), days_until)
+        sessions = reviewed + sessions
+    else:
+        free_slots = availability.free_slots(plan_date)
+        reviewed = review_sessions(reviews, topics, next_exam_by_subject, plan_date, slot_minutes(free_slots, daily_minutes))
+        sessions, minutes_left, _ = allocate_day_in_slots(
+            topics, scores[0], remaining, daily_minutes, days_until, free_slots, fixed_sessions=reviewed,
+            reviews=reviews)
+
+    if not sessions:
+        return {"date": plan_date.isoformat(), "daily_hours": daily_hours, "sessions": [], "note": "Not enough time to schedule even a minimum session."}
+
+    return {
+        "date": plan_date.isoformat(),
+        "daily_hours": daily_hours,
+        "available_minutes_initial": minutes_from_hours(daily_hours),
+        "available_minutes_left": minutes_left,
+        "sessions": sessions
+    }
+
+
+def _idle_days(start_date, days, daily_hours, daily_minutes, note):
+    for i in range(days):
+        yield {
+            "date": (start_date + timedelta(days=i)),
+            "daily_hours": daily_hours,
+            "available_minutes_left": daily_minutes,
+            "sessions": [],
+            "note": note
+        }
+
+
+def _idle_week(start_date, days, daily_hours, daily_minutes, note):
+    return list(_idle_days(start_date, days, daily_hours, daily_minutes, note))
+
+
+def _day_entry(plan_date, daily_hours, daily_minutes, sessions, minutes_left):
+    day_entry = {
+        "date": plan_date,   # keep as date object for jinja strftime
+        "daily_hours": daily_hours,
+        "available_minutes_initial": daily_minutes,
+        "available_minutes_left": minutes_left,
+        "sessions": sessions
+    }
+    if not sessions:
+        day_entry["note"] = "No sessions scheduled today (all topics exhausted or not enough time)."
+    return day_entry
+
+
+def plan_week(topics, daily_hours, next_exam_by_subject, start_date, days=7, availability=None):
+    """
+    Plan `days` days from start_date. Topics are records as built by
+    planner_loader (remaining_minutes already net of completed work); they
+    are not modified.
+    Returns a list of day dicts: date (datetime.date), daily_hours,
+    available_minutes_initial, available_minutes_left, sessions and an
+    optional note. With availability, see iter_plan_days().
+    """
+    return list(iter_plan_days(topics, daily_hours, next_exam_by_subject, start_date, days, availability=availability))
+
+
+def horizon_days(start_date, next_exam_by_subject, exam_dates_by_subject=None):
+    """Days from start_date up to and including the last exam, DEFAULT_HORIZON_DAYS without exams."""
+    if exam_dates_by_subject is not None:
+        last = max((dates[-1] for dates in exam_dates_by_subject.values() if dates), default=None)
+    else:
+        last = max(next_exam_by_subject.values(), default=None)
+    if last is None or last < start_date:
+        return DEFAULT_HORIZON_DAYS
+    return (last - start_date).days + 1
+
+
+def iter_plan_days(topics, daily_hours, next_exam_by_subject, start_date, days=None, exam_dates_by_subject=None,
+                   availability=None):
+    """
+    Yield the day dicts of plan_week() one by one, planning each day only when
+    it is asked for and carrying the topics' remaining minutes forward, for
+    `days` days or, with days=None, up to the last exam (horizon_days()).
+    Days are scored SCORE_CHUNK_DAYS at a time; once no topic has a minimum
+    session left the remaining days are yielded without planning.
+    exam_dates_by_subject: optional {subject_id: ascending exam dates}; urgency
+    then follows each subject's next exam on every day, instead of the first
+    one (next_exam_by_subject) for the whole horizon.
+    availability: optional planner_slots.Availability; every day is then
+    allocated into its free slots (allocate_day_in_slots()) and its sessions
+    carry a start_time.
+    Each day starts with the reviews due that day (review_sessions()); a
+    review is requeued at its next interval as if done, so a long horizon
+    also plans the later reviews.
+    """
+    if days is None:
+        days = horizon_days(start_date, next_exam_by_subject, exam_dates_by_subject)
+    daily_minutes = daily_minutes_for(daily_hours)
+
+    if not topics:
+        yield from _idle_days(start_date, days, daily_hours, daily_minutes, "No topics")
+        return
+
+    active = [t for t in topics if t.remaining_minutes > 0]
+    reviews = review_scheduler(topics, start_date, days)
+    if not active and reviews is None:
+        yield from _idle_days(start_date, days, daily_hours, daily_minutes, "All topics already completed.")
+        return
+
+    remaining = [t.remaining_minutes for t in active]
+    day_offset = 0
+    while day_offset < days:
+        chunk_start = start_date + timedelta(days=day_offset)
+        chunk = min(SCORE_CHUNK_DAYS, days - day_offset)
+        exams = next_exam_by_subject
+        if exam_dates_by_subject is not None:
+            exams = {}
+            for sid, dates in exam_dates_by_subject.items():
+                k = bisect_left(dates, chunk_start)
+                if k < len(dates):
+                    exams[sid] = dates[k]
+            if exams:
+                # Stop the chunk on the first exam day so the next one is scored against the following exam
+                chunk = min(chunk, (min(exams.values()) - chunk_start).days + 1)
+
+        studying = any(r >= SESSION_MINIMUM_MINUTES for r in remaining)
+        if not studying and reviews is None:
+            for offset in range(chunk):
+                yield _day_entry(chunk_start + timedelta(days=offset), daily_hours, daily_minutes, [], daily_minutes)
+        else:
+            if studying:
+                # Score the chunk's days at once (only days_until_exam changes per day)
+                days_until, day_scores = score_topics(active, exams, chunk_start, chunk)
+            else:
+                # Only reviews left: allocate_day() finds nothing to book
+                days_until, day_scores = [None] * len(active), [[0.0] * len(active)] * chunk
+            for offset in range(chunk):
+                day = chunk_start + timedelta(days=offset)
+                if availability is None:
+                    reviewed = review_sessions(reviews, topics, exams, day, daily_minutes)
+                    sessions, minutes_left = allocate_day(
+                        active, day_scores[offset], remaining, daily_minutes - REVIEW_MINUTES * len(reviewed), days_until, offset)
+                    sessions = reviewed + sessions
+                    day_minutes = daily_minutes
+                else:
+                    free_slots = availability.free_slots(day)
+                    reviewed = review_sessions(reviews, topics, exams, day, slot_minutes(free_slots, daily_minutes))
+                    sessions, minutes_left, day_minutes = allocate_day_in_slots(
+                        active, day_scores[offset], remaining, daily_minutes, days_until, free_slots, offset, reviewed,
+                        reviews)
+                yield _day_entry(day, daily_hours, day_minutes, sessions, minutes_left)
+        day_offset += chunk
+
+
+def solve_week(topics, daily_hours, next_exam_by_subject, start_date, days=7):
+    """
+    Alternative to plan_week() that allocates the whole horizon at once,
+    maximising priority-weighted coverage before each exam: the sum over
+    topics of their effective priority on start_date times the minutes booked
+    before their exam (a topic whose exam is today or passed can use day 0
+    only, a topic without exam any day).
+
+    Minutes are allocated in units of SESSION_MINIMUM_MINUTES, so every
+    topic's share of a day splits into sessions of SESSION_MINIMUM_MINUTES to
+    SESSION_PREFERRED_MINUTES. Booking units is a transportation problem in
+    which every topic reaches a prefix of the days (up to the day before its
+    exam); on such a network, taking topics by decreasing priority and giving
+    each as many units as the prefix capacities allow (Hall's condition) is an
+    exact max-weight flow, in O(n log n + n * days). The units are then placed
+    earliest exam first, which keeps every later topic feasible wherever a
+    topic goes inside its window, on the emptiest day of the window in
+    preferred-length pairs, so topics are spread over the days before their
+    exam instead of front-loaded. Day minutes below one unit are finally
+    topped up with topics already booked that day.
+    The reviews due each day (review_sessions()) are set first and only the
+    rest of the day is allocated.
+    Returns day dicts like plan_week(); sessions of a day are the reviews,
+    then the rest ordered by priority.
+    """
+    daily_minutes = daily_minutes_for(daily_hours)
+    if not topics:
+        return _idle_week(start_date, days, daily_hours, daily_minutes, "No topics")
+    active = [t for t in topics if t.remaining_minutes > 0]
+    reviews = review_scheduler(topics, start_date, days)
+    if not active and reviews is None:
+        return _idle_week(start_date, days, daily_hours, daily_minutes, "All topics already completed.")
+
+    reviewed = [
+        review_sessions(reviews, topics, next_exam_by_subject, start_date + timedelta(days=d), daily_minutes)
+        for d in range(days)
+    ]
+    capacity = [daily_minutes - REVIEW_MINUTES * len(day_reviews) for day_reviews in reviewed]
+    days_until, scores = score_topics(active, next_exam_by_subject, start_date, days=1)
+    weight = scores[0]
+    n = len(active)
+    unit = SESSION_MINIMUM_MINUTES
+    pair = SESSION_PREFERRED_MINUTES // unit
+    deadline = [days - 1 if du is None else min(days - 1, max(du - 1, 0)) for du in days_until]
+    by_priority = sorted(range(n), key=lambda i: -weight[i])
+
+    # 1) Units per topic: prefix_free[D] = free units on days 0..D once the
+    #    topics due by day D are served
+    prefix_free = list(accumulate(minutes // unit for minutes in capacity))
+    units = [0] * n
+    for i in by_priority:
+        take = min(active[i].remaining_minutes // unit, min(prefix_free[deadline[i]:]))
+        if take > 0:
+            units[i] = take
+            for d in range(deadline[i], days):
+                prefix_free[d] -= take
+
+    # 2) Place them, earliest deadline first, on the emptiest days of the window
+    free = [minutes // unit for minutes in capacity]
+    booked = [{} for _ in range(days)]   # day -> {topic index: minutes}
+    for i in sorted((i for i in range(n) if units[i]), key=lambda i: (deadline[i], -weight[i])):
+        window = range(deadline[i] + 1)
+        left = units[i]
+        while left:
+            block = min(pair, left)
+            d = max(window, key=lambda d: (free[d] >= block, free[d]))
+            block = min(block, free[d])
+            free[d] -= block
+            left -= block
+            booked[d][i] = booked[d].get(i, 0) + block * unit
+
+    # 3) Top up the minutes below one unit
+    spare = [active[i].remaining_minutes - units[i] * unit for i in range(n)]
+    plan = []
+    for day_offset in range(days):
+        day = booked[day_offset]
+        minutes_left = capacity[day_offset] - sum(day.values())
+        order = [i for i in by_priority if i in day]
+        for i in order:
+            extra = min(minutes_left, spare[i])
+            if extra > 0:
+                day[i] += extra
+                spare[i] -= extra
+                minutes_left -= extra
+
+        sessions = reviewed[day_offset]
+        for i in order:
+            minutes = day[i]
+            while minutes > SESSION_PREFERRED_MINUTES:
+                piece = SESSION_PREFERRED_MINUTES if minutes - SESSION_PREFERRED_MINUTES >= SESSION_MINIMUM_MINUTES else minutes - SESSION_MINIMUM_MINUTES
+                sessions.append(session_entry(active[i], piece, days_until[i], day_offset))
+                minutes -= piece
+            sessions.append(session_entry(active[i], minutes, days_until[i], day_offset))
+        plan.append(_day_entry(start_date + timedelta(days=day_offset), daily_hours, daily_minutes, sessions, minutes_left))
+    return plan
+
+
+# Weekly planners by name, see planner.PLANNER_SOLVER
+WEEK_SOLVERS = {"greedy": plan_week, "optimal": solve_week}
+
+
+class WeekPlan:
+    """
+    A plan_week() result plus the intermediate state replan_week() reuses:
+    the inputs, every topic's days to exam and scores, the remaining
+    minutes of every topic at the start of each day (remaining_by_day[d],
+    with one extra entry for the end of the plan) and each day's review
+    sessions. Treat it as read-only.
+    """
+
+    __slots__ = ("topics", "daily_hours", "next_exam_by_subject", "start_date",
+                 "days_until", "scores", "remaining_by_day", "reviews", "plan")
+
+    def __init__(self, topics, daily_hours, next_exam_by_subject, start_date):
+        self.topics = topics
+        self.daily_hours = daily_hours
+        self.next_exam_by_subject = next_exam_by_subject
+        self.start_date = start_date
+        self.days_until = None
+        self.scores = None          # None when the week is idle (no topic left to plan)
+        self.remaining_by_day = None
+        self.reviews = None
+        self.plan = None
+
+
+def _week_reviews(topics, next_exam_by_subject, start_date, days, daily_minutes):
+    reviews = review_scheduler(topics, start_date, days)
+    return [
+        review_sessions(reviews, topics, next_exam_by_subject, start_date + timedelta(days=d), daily_minutes)
+        for d in range(days)
+    ]
+
+
+def plan_week_state(topics, daily_hours, next_exam_by_subject, start_date, days=7):
+    """plan_week() returning a WeekPlan; state.plan is what plan_week() returns."""
+    state = WeekPlan(list(topics), daily_hours, dict(next_exam_by_subject), start_date)
+    if not any(t.remaining_minutes > 0 for t in topics):
+        state.plan = plan_week(topics, daily_hours, next_exam_by_subject, start_date, days)
+        return state
+
+    # All topics are kept (finished ones never enter a day's heap), so indices
+    # stay stable when a topic runs out or comes back
+    daily_minutes = daily_minutes_for(daily_hours)
+    state.days_until, state.scores = score_topics(topics, next_exam_by_subject, start_date, days)
+    state.reviews = _week_reviews(topics, next_exam_by_subject, start_date, days, daily_minutes)
+    remaining = [t.remaining_minutes for t in topics]
+    state.remaining_by_day = [remaining[:]]
+    state.plan = []
+    for day_offset in range(days):
+        reviewed = state.reviews[day_offset]
+        sessions, minutes_left = allocate_day(topics, state.scores[day_offset], remaining,
+                                              daily_minutes - REVIEW_MINUTES * len(reviewed), state.days_until, day_offset)
+        state.plan.append(_day_entry(start_date + timedelta(days=day_offset), daily_hours, daily_minutes,
+                                     reviewed + sessions, minutes_left))
+        state.remaining_by_day.append(remaining[:])
+    return state
+
+
+def _record_fields(t):
+    return tuple(getattr(t, name) for name in t.__slots__)
+
+
+def replan_week(previous, topics, daily_hours, next_exam_by_subject):
+    """
+    Update a WeekPlan after a change of its inputs (freshly loaded rows) and
+    return (state, diff), where state.plan equals
+    what plan_week() returns for the new inputs and diff is
+    plan_diff(previous.plan, state.plan).
+
+    Only the changed topics are rescored. A day is only re-allocated if its
+    outcome can differ: a topic's remaining minutes at the start of the day
+    differ from the previous plan's in a way the day can see (minutes beyond
+    one day's worth don't matter), or a changed topic's score differs, unless
+    the topic could not be booked that day or was not booked and only lost
+    priority. A day whose reviews change is re-allocated too (the reviews
+    are rescheduled from the queue, which is cheap). Days after the last
+    re-allocated one whose inputs match again are reused as they are.
+    Adding or removing topics, changing daily_hours or running out of topics
+    re-plans the whole week.
+    """
+    days = len(previous.plan)
+    start_date = previous.start_date
+    if (previous.scores is None or daily_hours != previous.daily_hours
+            or len(topics) != len(previous.topics)
+            or any(old.topic_id != new.topic_id for old, new in zip(previous.topics, topics))
+            or not any(t.remaining_minutes > 0 for t in topics)):
+        state = plan_week_state(topics, daily_hours, next_exam_by_subject, start_date, days)
+        return state, plan_diff(previous.plan, state.plan)
+
+    moved = {
+        sid for sid in previous.next_exam_by_subject.keys() | next_exam_by_subject.keys()
+        if previous.next_exam_by_subject.get(sid) != next_exam_by_subject.get(sid)
+    }
+    changed = [
+        i for i, (old, new) in enumerate(zip(previous.topics, topics))
+        if old.subject_id in moved or new.subject_id in moved
+        or (old is not new and _record_fields(old) != _record_fields(new))
+    ]
+
+    state = WeekPlan(list(topics), daily_hours, dict(next_exam_by_subject), start_date)
+    if not changed:
+        state.days_until, state.scores = previous.days_until, previous.scores
+        state.remaining_by_day, state.reviews, state.plan = previous.remaining_by_day, previous.reviews, previous.plan
+        return state, []
+
+    # Rescore the changed topics only
+    changed_days_until, changed_scores = score_topics([topics[i] for i in changed], next_exam_by_subject, start_date, days)
+    days_until = previous.days_until[:]
+    scores = [row[:] for row in previous.scores]
+    for j, i in enumerate(changed):
+        days_until[i] = changed_days_until[j]
+        for day_offset in range(days):
+            scores[day_offset][i] = changed_scores[day_offset][j]
+    state.days_until, state.scores = days_until, scores
+
+    daily_minutes = daily_minutes_for(daily_hours)
+    saturated = daily_minutes + SESSION_PREFERRED_MINUTES
+    state.reviews = reviews = _week_reviews(topics, next_exam_by_subject, start_date, days, daily_minutes)
+
+    def visible(minutes):
+        # What a day can tell apart: below a minimum session nothing is booked,
+        # from a day's worth plus one block up every check passes the same way
+        return 0 if minutes < SESSION_MINIMUM_MINUTES else min(minutes, saturated)
+
+    changed_by_id = {topics[i].topic_id: i for i in changed}
+    index = None
+    # Topics whose remaining minutes differ from previous.remaining_by_day[day]
+    dirty = {i: topics[i].remaining_minutes for i in changed
+             if topics[i].remaining_minutes != previous.remaining_by_day[0][i]}
+    remaining_by_day = []
+    plan = []
+
+    for day_offset in range(days):
+        old_day = previous.plan[day_offset]
+        old_remaining = previous.remaining_by_day[day_offset]
+        if dirty:
+            remaining = old_remaining[:]
+            for i, minutes in dirty.items():
+                remaining[i] = minutes
+        else:
+            remaining = old_remaining
+        remaining_by_day.append(remaining)
+
+        studied = [s for s in old_day["sessions"] if not s.get("review")]
+        booked = {s["topic_id"] for s in studied}
+        reuse = reviews[day_offset] == previous.reviews[day_offset]
+        reuse = reuse and all(visible(minutes) == visible(old_remaining[i]) for i, minutes in dirty.items())
+        if reuse:
+            for i in changed:
+                old_score, new_score = previous.scores[day_offset][i], scores[day_offset][i]
+                if new_score == old_score or visible(remaining[i]) == 0:
+                    continue
+                if new_score < old_score and topics[i].topic_id not in booked:
+                    continue
+                reuse = False
+                break
+
+        if reuse:
+            if booked & changed_by_id.keys():
+                # Same bookings; refresh topic fields and days_until_exam
+                sessions = reviews[day_offset] + [
+                    session_entry(topics[changed_by_id[s["topic_id"]]], s["duration_minutes"],
+                                  days_until[changed_by_id[s["topic_id"]]], day_offset)
+                    if s["topic_id"] in changed_by_id else s
+                    for s in studied
+                ]
+                plan.append(dict(old_day, sessions=sessions))
+            else:
+                plan.append(old_day)
+            for i in dirty:
+                dirty[i] -= sum(s["duration_minutes"] for s in studied if s["topic_id"] == topics[i].topic_id)
+            continue
+
+        remaining = remaining[:]
+        sessions, minutes_left = allocate_day(topics, scores[day_offset], remaining,
+                                              daily_minutes - REVIEW_MINUTES * len(reviews[day_offset]), days_until, day_offset)
+        plan.append(_day_entry(start_date + timedelta(days=day_offset), daily_hours, daily_minutes,
+                               reviews[day_offset] + sessions, minutes_left))
+        if index is None:
+            index = {t.topic_id: i for i, t in enumerate(topics)}
+        touched = set(dirty)
+        touched.update(index[topic_id] for topic_id in booked)
+        touched.update(index[s["topic_id"]] for s in sessions)
+        next_remaining = previous.remaining_by_day[day_offset + 1]
+        dirty = {i: remaining[i] for i in touched if remaining[i] != next_remaining[i]}
+
+    final = previous.remaining_by_day[days]
+    if dirty:
+        final = final[:]
+        for i, minutes in dirty.items():
+            final[i] = minutes
+    remaining_by_day.append(final)
+    state.remaining_by_day, state.plan = remaining_by_day, plan
+    return state, plan_diff(previous.plan, plan)
+
+
+def plan_diff(old_plan, new_plan):
+    """
+    Session changes between two plans of the same dates, for the days that
+    changed: [{"date", "available_minutes_left", "added", "removed", "resized",
+    "updated"}, ...]. A day's sessions are matched by topic and occurrence
+    (the 2nd session of a topic that day matches its 2nd session before).
+    added/removed hold session dicts, resized ({"old", "new"} pairs) those
+    whose duration changed and updated those where only other fields changed,
+    e.g. days_until_exam after an exam moved. reordered tells whether the
+    sessions kept in the day changed places.
+    """
+    diff = []
+    for old_day, new_day in zip(old_plan, new_plan):
+        if old_day is new_day or old_day["sessions"] == new_day["sessions"]:
+            continue
+
+        def by_occurrence(sessions):
+            keyed = {}
+            seen = {}
+            for s in sessions:
+                n = seen[s["topic_id"]] = seen.get(s["topic_id"], 0) + 1
+                keyed[(s["topic_id"], n)] = s
+            return keyed
+
+        old_sessions = by_occurrence(old_day["sessions"])
+        new_sessions = by_occurrence(new_day["sessions"])
+        day = {"date": new_day["date"], "available_minutes_left": new_day["available_minutes_left"],
+               "added": [], "removed": [], "resized": [], "updated": []}
+        for key, new in new_sessions.items():
+            old = old_sessions.get(key)
+            if old is None:
+                day["added"].append(new)
+            elif old["duration_minutes"] != new["duration_minutes"]:
+                day["resized"].append({"old": old, "new": new})
+            elif old != new:
+                day["updated"].append({"old": old, "new": new})
+        day["removed"] = [old for key, old in old_sessions.items() if key not in new_sessions]
+        kept_old = [key for key in old_sessions if key in new_sessions]
+        kept_new = [key for key in new_sessions if key in old_sessions]
+        day["reordered"] = kept_old != kept_new
+        diff.append(day)
+    return diff
+
+
+def plan_weeks(inputs, start_date, days=7, solver="greedy"):
+    """
+    plan_week() (or another of WEEK_SOLVERS) for several users, e.g. a chunk
+    handed to a worker process. Users with availability windows are planned
+    with plan_week(), the only planner that packs slots.
+    inputs: PlanInputs (see planner_loader). Returns [(user_id, plan), ...].
+    """
+    week = WEEK_SOLVERS[solver]
+    return [
+        (i.user_id,
+         week(i.topics, i.daily_hours or DEFAULT_DAILY_HOURS, i.next_exam_by_subject, start_date, days)
+         if i.availability is None else
+         plan_week(i.topics, i.daily_hours or DEFAULT_DAILY_HOURS, i.next_exam_by_subject, start_date, days, i.availability))
+        for i in inputs
+    ]
+
+
+# Keys of a simulate_plans() variant
+VARIANT_KEYS = ("daily_hours", "priority_weights", "preferred_minutes", "minimum_minutes")
+
+
+def plan_metrics(plan, topics, days_until, weights):
+    """
+    Coverage metrics of a plan of topics (days_until as in score_topics(),
+    weights[i] the priority that weighs topics[i]'s minutes):
+    - booked_minutes / review_minutes / idle_minutes: study, review and unused day minutes
+    - late_minutes: study booked on or after the topic's exam day (wasted for the exam;
+      a topic whose exam is today or passed counts on day 0 only)
+    - coverage: share of the topics' remaining minutes booked before their exam
+    - weighted_coverage: the same minutes weighed by priority (what solve_week() maximises)
+    - topics_started / topics_finished: topics with a study session / with no
+      minimum session left at the end, out of topics_open (those with one left
+      at the start)
+    """
+    index = {t.topic_id: i for i, t in enumerate(topics)}
+    remaining = [t.remaining_minutes for t in topics]
+    open_minutes = sum(m for m in remaining if m > 0)
+    metrics = {"booked_minutes": 0, "review_minutes": 0, "idle_minutes": 0, "late_minutes": 0,
+               "weighted_coverage": 0.0, "sessions": 0}
+    before_exam = 0
+    started = set()
+    for day_offset, day in enumerate(plan):
+        metrics["idle_minutes"] += day["available_minutes_left"]
+        for s in day["sessions"]:
+            minutes = s["duration_minutes"]
+            if s.get("review"):
+                metrics["review_minutes"] += minutes
+                continue
+            i = index[s["topic_id"]]
+            metrics["booked_minutes"] += minutes
+            metrics["sessions"] += 1
+            remaining[i] -= minutes
+            started.add(i)
+            du = days_until[i]
+            if du is None or day_offset < du or (du <= 0 and day_offset == 0):
+                before_exam += minutes
+                metrics["weighted_coverage"] += weights[i] * minutes
+            else:
+                metrics["late_minutes"] += minutes
+    metrics["coverage"] = before_exam / open_minutes if open_minutes else 1.0
+    metrics["topics_open"] = sum(1 for t in topics if t.remaining_minutes >= SESSION_MINIMUM_MINUTES)
+    metrics["topics_started"] = len(started)
+    metrics["topics_finished"] = sum(
+        1 for t, left in zip(topics, remaining)
+        if t.remaining_minutes >= SESSION_MINIMUM_MINUTES and left < SESSION_MINIMUM_MINUTES
+    )
+    return metrics
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def _variant_settings(variant, daily_hours):
+    """(weights, preferred, minimum, daily_hours) of a simulate_plans() variant; ValueError if invalid."""
+    unknown = set(variant) - set(VARIANT_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown variant keys: {', '.join(sorted(unknown))}")
+    overrides = variant.get("priority_weights", {})
+    if not isinstance(overrides, dict) or not overrides.keys() <= PRIORITY_WEIGHTS.keys():
+        raise ValueError(f"priority_weights must use {', '.join(PRIORITY_WEIGHTS)}")
+    if not all(_is_number(w) and w >= 0 for w in overrides.values()):
+        raise ValueError("priority_weights must be non-negative numbers")
+    weights = dict(PRIORITY_WEIGHTS, **overrides)
+
+    preferred = variant.get("preferred_minutes", SESSION_PREFERRED_MINUTES)
+    minimum = variant.get("minimum_minutes", SESSION_MINIMUM_MINUTES)
+    if not all(isinstance(m, int) and not isinstance(m, bool) for m in (preferred, minimum)):
+        raise ValueError("Session lengths must be whole minutes")
+    if not SESSION_MINIMUM_MINUTES <= minimum <= preferred <= MINUTES_PER_DAY:
+        raise ValueError(f"Session lengths need {SESSION_MINIMUM_MINUTES} <= minimum_minutes <= "
+                         f"preferred_minutes <= {MINUTES_PER_DAY}")
+
+    hours = variant.get("daily_hours", daily_hours)
+    if not _is_number(hours) or not 0 < hours <= 24:
+        raise ValueError("daily_hours must be more than 0 and at most 24")
+    return weights, preferred, minimum, hours
+
+
+def validate_variants(variants):
+    """Raise ValueError for the first invalid simulate_plans() variant, before any inputs are loaded."""
+    for variant in variants:
+        _variant_settings(variant, DEFAULT_DAILY_HOURS)
+
+
+def simulate_plans(topics, daily_hours, next_exam_by_subject, start_date, variants, days=7, include_plans=False):
+    """
+    What-if planning: plan_week() for one snapshot of a user's inputs under
+    each of several variants and measure every plan with plan_metrics().
+    A variant is a dict with any of VARIANT_KEYS, the rest as planned now:
+    - daily_hours: more than 0, at most 24
+    - priority_weights: {name: weight} overriding PRIORITY_WEIGHTS
+    - preferred_minutes / minimum_minutes: session lengths (see allocate_day()),
+      whole minutes from SESSION_MINIMUM_MINUTES up to a day
+
+    The topics are scored once (ScoreBasis); each distinct set of weights
+    only re-weighs those scores and each distinct day length schedules the
+    reviews once, so a variant costs about one allocation pass. Slot packing
+    (availability windows) and the optimal solver are not simulated.
+    Minutes are weighed by the current PRIORITY_WEIGHTS priorities on the
+    first day, so weighted_coverage compares across weight variants.
+    Returns [{"variant": ..., "metrics": ..., "plan": only with include_plans}, ...]
+    in variants order; raises ValueError for an invalid variant.
+    """
+    basis = ScoreBasis(topics, next_exam_by_subject, start_date, days)
+    scores_by_weights = {}    # sorted weight items -> scores
+    reviews_by_minutes = {}   # day minutes -> review sessions per day
+
+    def scores_for(weights):
+        key = tuple(sorted(weights.items()))
+        if key not in scores_by_weights:
+            scores_by_weights[key] = basis.scores(weights)
+        return scores_by_weights[key]
+
+    baseline = scores_for(PRIORITY_WEIGHTS)[0] if variants and days else []
+    results = []
+    for variant in variants:
+        weights, preferred, minimum, hours = _variant_settings(variant, daily_hours)
+        scores = scores_for(weights)
+        daily_minutes = max(minutes_from_hours(hours), minimum)
+        reviews = reviews_by_minutes.get(daily_minutes)
+        if reviews is None:
+            reviews = reviews_by_minutes[daily_minutes] = _week_reviews(
+                topics, next_exam_by_subject, start_date, days, daily_minutes)
+
+        remaining = [t.remaining_minutes for t in topics]
+        plan = []
+        for day_offset in range(days):
+            sessions, minutes_left = allocate_day(
+                topics, scores[day_offset], remaining, daily_minutes - REVIEW_MINUTES * len(reviews[day_offset]),
+                basis.days_until, day_offset, preferred, minimum)
+            plan.append(_day_entry(start_date + timedelta(days=day_offset), hours, daily_minutes,
+                                   reviews[day_offset] + sessions, minutes_left))
+
+        result = {"variant": variant, "metrics": plan_metrics(plan, topics, basis.days_until, baseline)}
+        if include_plans:
+            result["plan"] = plan
+        results.append(result)
+    return results
@@ -0,0 +1,276 @@
+# planner_loader.py
+# Runs the planner's queries and turns the rows into compact records for
+# planner_engine. Nothing here allocates sessions.
+from planner_engine import minutes_from_hours
+from planner_reviews import REVIEW_MINUTES
+from planner_slots import DEFAULT_WINDOW, MINUTES_PER_DAY, Availability, merge_intervals
+
+
+class TopicRecord:
+    """One topic as the planning engine sees it."""
+
+    __slots__ = (
+        "topic_id",
+        "subject_id",
+        "subject_name",
+        "topic_name",
+        "difficulty",
+        "importance",
+        "confidence",
+        "hours_required",
+        "remaining_minutes",
+        "times_studied",
+        "next_review_date",
+    )
+
+    def __init__(self, topic_id, subject_id, subject_name, topic_name, difficulty,
+                 importance, confidence, hours_required, remaining_minutes,
+                 times_studied=0, next_review_date=None):
+        self.topic_id = topic_id
+        self.subject_id = subject_id
+        self.subject_name = subject_name
+        self.topic_name = topic_name
+        self.difficulty = difficulty
+        self.importance = importance
+        self.confidence = confidence
+        self.hours_required = hours_required
+        self.remaining_minutes = remaining_minutes
+        self.times_studied = times_studied
+        self.next_review_date = next_review_date      # see planner_reviews, None if never studied
+
+
+class PlanInputs:
+    """Everything the engine needs to plan for one user."""
+
+    __slots__ = ("user_id", "daily_hours", "next_exam_by_subject", "topics", "availability")
+
+    def __init__(self, user_id, daily_hours, next_exam_by_subject, topics, availability=None):
+        self.user_id = user_id
+        self.daily_hours = daily_hours                      # None when the user has no preference
+        self.next_exam_by_subject = next_exam_by_subject    # subject_id -> date
+        self.topics = topics                                # list of TopicRecord
+        self.availability = availability                    # planner_slots.Availability, None without rows
+
+
+# Reads the user's subjects through UNIQUE(user_id, subject_name) and each
+# subject's exams through idx_exams_subject_date, so the cost depends on the
+# user's own exams only, not on the size of the exams table.
+NEXT_EXAMS_SQL = """
+    SELECT e.subject_id, MIN(e.exam_date) AS next_exam
+    FROM subjects s
+    JOIN exams e ON e.subject_id = s.subject_id AND e.exam_date >= %s
+    WHERE s.user_id = %s
+    GROUP BY e.subject_id
+"""
+
+
+# Like NEXT_EXAMS_SQL, but every upcoming exam, for plans past the next one
+EXAM_DATES_SQL = """
+    SELECT DISTINCT e.subject_id, e.exam_date
+    FROM subjects s
+    JOIN exams e ON e.subject_id = s.subject_id AND e.exam_date >= %s
+    WHERE s.user_id = %s
+    ORDER BY e.subject_id, e.exam_date
+"""
+
+
+def load_exam_dates(cur, user_id, start_date):
+    """{subject_id: ascending exam dates from start_date} of user_id, with a dictionary cursor."""
+    cur.execute(EXAM_DATES_SQL, (start_date, user_id))
+    exam_dates_by_subject = {}
+    for r in cur.fetchall():
+        exam_dates_by_subject.setdefault(r["subject_id"], []).append(r["exam_date"])
+    return exam_dates_by_subject
+
+
+# Topics due for review by a date, most overdue first: a range read per subject
+# on idx_topics_subject_review, so only due topics are read and sorted. Like
+# planner_reviews.due_review_entries(), topics with a study session left to
+# plan (remaining minutes, minutes_from_hours() in SQL) are not reviewed.
+DUE_REVIEWS_SQL = f"""
+    SELECT t.topic_id, t.subject_id, s.subject_name, t.topic_name, t.times_studied,
+           t.last_studied, t.next_review_date
+    FROM subjects s
+    JOIN topics t ON t.subject_id = s.subject_id AND t.next_review_date <= %s
+    WHERE s.user_id = %s AND ROUND(t.hours_required * 60) - t.completed_minutes < {REVIEW_MINUTES}
+    ORDER BY t.next_review_date, t.topic_id
+    LIMIT %s
+"""
+
+
+def load_due_reviews(cur, user_id, on_date, limit):
+    """Up to limit topics of user_id due for review on on_date, as dicts (dictionary cursor)."""
+    cur.execute(DUE_REVIEWS_SQL, (on_date, user_id, limit))
+    return cur.fetchall()
+
+
+# Weekly windows and the blackouts from the plan start on
+AVAILABILITY_SQL = """
+    SELECT user_id, kind, weekday, on_date, start_time, end_time
+    FROM availability
+    WHERE user_id IN ({placeholders}) AND (kind='weekly' OR on_date >= %s)
+"""
+
+
+def _minutes(value, default):
+    # TIME columns come back as datetime.timedelta
+    return default if value is None else int(value.total_seconds()) // 60
+
+
+def availability_row(r):
+    """Plain tuple of an availability row: (kind, weekday, on_date, start minute, end minute)."""
+    return (r["kind"], r["weekday"], r["on_date"], _minutes(r["start_time"], 0), _minutes(r["end_time"], MINUTES_PER_DAY))
+
+
+def build_availability(rows):
+    """Availability from availability_row() tuples, None without rows."""
+    if not rows:
+        return None
+    weekly = {}
+    blackouts = {}
+    for kind, weekday, on_date, start, end in rows:
+        if kind == "weekly":
+            weekly.setdefault(weekday, []).append((start, end))
+        else:
+            blackouts.setdefault(on_date, []).append((start, end))
+    return Availability(
+        {weekday: merge_intervals(windows) for weekday, windows in weekly.items()},
+        {on_date: merge_intervals(cuts) for on_date, cuts in blackouts.items()},
+        DEFAULT_WINDOW,
+    )
+
+
+def load_plan_inputs(cur, user_id, start_date, subtract_completed=True):
+    """
+    Load the planning inputs of user_id with a dictionary cursor.
+    With subtract_completed, remaining_minutes is hours_required minus the
+    minutes of the topic's completed study sessions (topics.completed_minutes).
+    """
+    # 1) User preference (daily hours)
+    cur.execute("SELECT daily_study_hours FROM user_preferences WHERE user_id=%s", (user_id,))
+    pref = cur.fetchone()
+    daily_hours = float(pref["daily_study_hours"]) if pref and pref.get("daily_study_hours") is not None else None
+
+    # 2) Next exams (for urgency calculations), only for this user's subjects
+    cur.execute(NEXT_EXAMS_SQL, (start_date, user_id))
+    next_exam_by_subject = {r["subject_id"]: r["next_exam"] for r in cur.fetchall()}
+
+    # 3) Topics of this user, with their completed minutes rollup and review schedule
+    cur.execute("""
+        SELECT t.topic_id, t.subject_id, t.topic_name, t.difficulty_level, t.importance, t.confidence_level, t.hours_required, t.completed_minutes, t.times_studied, t.next_review_date, s.subject_name
+        FROM topics t
+        JOIN subjects s ON t.subject_id = s.subject_id
+        WHERE s.user_id=%s
+        ORDER BY t.topic_id
+    """, (user_id,))
+
+    topics = []
+    for t in cur.fetchall():
+        hours_required = float(t["hours_required"])
+        completed = t["completed_minutes"] if subtract_completed else 0
+        topics.append(TopicRecord(
+            t["topic_id"],
+            t["subject_id"],
+            t["subject_name"],
+            t["topic_name"],
+            t["difficulty_level"],
+            t["importance"],
+            t["confidence_level"],
+            hours_required,
+            minutes_from_hours(hours_required) - completed,
+            t["times_studied"] or 0,
+            t["next_review_date"],
+        ))
+
+    # 4) Availability windows and blackouts
+    cur.execute(AVAILABILITY_SQL.format(placeholders="%s"), (user_id, start_date))
+    availability = build_availability([availability_row(r) for r in cur.fetchall()])
+
+    return PlanInputs(user_id, daily_hours, next_exam_by_subject, topics, availability)
+
+
+def load_plan_inputs_bulk(cur, user_ids, start_date):
+    """
+    Set-based load_plan_inputs() for several users: one query per table
+    instead of one per user. Returns {user_id: PlanInputs} for every user_id.
+    """
+    return {
+        packed[0]: unpack_plan_inputs(packed)
+        for packed in load_packed_plan_inputs_bulk(cur, user_ids, start_date)
+    }
+
+
+def unpack_plan_inputs(packed):
+    """PlanInputs from a tuple of load_packed_plan_inputs_bulk()."""
+    user_id, daily_hours, next_exam_by_subject, topics, availability_rows = packed
+    return PlanInputs(user_id, daily_hours, next_exam_by_subject, [TopicRecord(*t) for t in topics],
+                      build_availability(availability_rows))
+
+
+def load_packed_plan_inputs_bulk(cur, user_ids, start_date):
+    """
+    Like load_plan_inputs_bulk(), but returns plain tuples
+    (user_id, daily_hours, next_exam_by_subject, [TopicRecord arguments, ...],
+    [availability_row() tuples, ...])
+    in user_ids order. They pickle several times faster than the records, so
+    this is what gets shipped to worker processes.
+    """
+    if not user_ids:
+        return []
+    user_ids = list(user_ids)
+    placeholders = ",".join(["%s"] * len(user_ids))
+
+    cur.execute(
+        f"SELECT user_id, daily_study_hours FROM user_preferences WHERE user_id IN ({placeholders})",
+        tuple(user_ids)
+    )
+    daily_hours_by_user = {
+        r["user_id"]: float(r["daily_study_hours"]) if r["daily_study_hours"] is not None else None
+        for r in cur.fetchall()
+    }
+
+    cur.execute(f"""
+        SELECT s.user_id, e.subject_id, MIN(e.exam_date) AS next_exam
+        FROM exams e
+        JOIN subjects s ON e.subject_id = s.subject_id
+        WHERE s.user_id IN ({placeholders}) AND e.exam_date >= %s
+        GROUP BY s.user_id, e.subject_id
+    """, tuple(user_ids) + (start_date,))
+    next_exams_by_user = {uid: {} for uid in user_ids}
+    for r in cur.fetchall():
+        next_exams_by_user[r["user_id"]][r["subject_id"]] = r["next_exam"]
+
+    cur.execute(f"""
+        SELECT s.user_id, t.topic_id, t.subject_id, t.topic_name, t.difficulty_level, t.importance, t.confidence_level, t.hours_required, t.completed_minutes, t.times_studied, t.next_review_date, s.subject_name
+        FROM topics t
+        JOIN subjects s ON t.subject_id = s.subject_id
+        WHERE s.user_id IN ({placeholders})
+        ORDER BY s.user_id, t.topic_id
+    """, tuple(user_ids))
+    topics_by_user = {uid: [] for uid in user_ids}
+    for t in cur.fetchall():
+        uid = t["user_id"]
+        hours_required = float(t["hours_required"])
+        topics_by_user[uid].append((
+            t["topic_id"],
+            t["subject_id"],
+            t["subject_name"],
+            t["topic_name"],
+            t["difficulty_level"],
+            t["importance"],
+            t["confidence_level"],
+            hours_required,
+            minutes_from_hours(hours_required) - t["completed_minutes"],
+            t["times_studied"] or 0,
+            t["next_review_date"],
+        ))
+
+    cur.execute(AVAILABILITY_SQL.format(placeholders=placeholders), tuple(user_ids) + (start_date,))
+    availability_by_user = {uid: [] for uid in user_ids}
+    for r in cur.fetchall():
+        availability_by_user[r["user_id"]].append(availability_row(r))
+
+    return [
+        (uid, daily_hours_by_user.get(uid), next_exams_by_user[uid], topics_by_user[uid], availability_by_user[uid])
+        for uid in user_ids
+    ]
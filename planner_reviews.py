@@ -0,0 +1,164 @@
+# planner_reviews.py
+# Spaced repetition: when a studied topic is due for review, from how often it
+# has been studied (topics.times_studied) and how confident the user is, and a
+# due-ordered queue the planner takes each day's reviews from. Pure, like
+# planner_engine.
+import heapq
+from datetime import timedelta
+
+# Days until the next review after the 1st, 2nd, ... study of a topic; the
+# last interval repeats
+REVIEW_INTERVALS_DAYS = (1, 3, 7, 16, 35, 75, 150)
+# Confidence (1-5) scales the interval, in quarters: 1 halves it, 5 makes it 1.5x
+CONFIDENCE_QUARTERS = (2, 3, 4, 5, 6)
+REVIEW_MINUTES = 25  # one minimum session
+MAX_REVIEWS_PER_DAY = 6
+MAX_REVIEW_SHARE = 0.5  # at most this share of a day's minutes goes to reviews
+
+
+def review_interval_days(times_studied, confidence):
+    """Days from a study to the next review, None if the topic was never studied."""
+    if not times_studied:
+        return None
+    base = REVIEW_INTERVALS_DAYS[min(times_studied, len(REVIEW_INTERVALS_DAYS)) - 1]
+    return max(1, (base * CONFIDENCE_QUARTERS[confidence - 1] + 2) // 4)
+
+
+def next_review_date(last_studied, times_studied, confidence):
+    interval = review_interval_days(times_studied, confidence)
+    if last_studied is None or interval is None:
+        return None
+    return last_studied + timedelta(days=interval)
+
+
+def _elt(index_sql, values):
+    return f"ELT({index_sql}, {', '.join(str(v) for v in values)})"
+
+
+# review_interval_days() / next_review_date() as SQL over a topics row, to keep
+# topics.next_review_date in step in the same statement that changes the row
+REVIEW_INTERVAL_SQL = (
+    "GREATEST(1, FLOOR(("
+    + _elt(f"LEAST(times_studied, {len(REVIEW_INTERVALS_DAYS)})", REVIEW_INTERVALS_DAYS)
+    + " * " + _elt("confidence_level", CONFIDENCE_QUARTERS)
+    + " + 2) / 4))"
+)
+NEXT_REVIEW_SQL = f"DATE_ADD(last_studied, INTERVAL {REVIEW_INTERVAL_SQL} DAY)"   # NULL if never studied
+
+
+class ReviewQueue:
+    """
+    Topics ordered by due date: a heap of (due, index) with lazy deletion, so
+    rescheduling a topic is O(log n) and taking the k reviews due by a day is
+    O(k log n), however many topics are not due.
+    """
+
+    __slots__ = ("_heap", "_due")
+
+    def __init__(self, entries=()):
+        self._due = {i: due for i, due in entries if due is not None}
+        self._heap = [(due, i) for i, due in self._due.items()]
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._due)
+
+    def update(self, index, due):
+        """(Re)schedule a topic, or drop it with due=None."""
+        if due is None:
+            self._due.pop(index, None)
+            return
+        self._due[index] = due
+        heapq.heappush(self._heap, (due, index))
+
+    def pop_due(self, day, limit):
+        """Remove and return up to limit topics due on or before day, most overdue first."""
+        return [index for index, _ in self.pop_due_items(day, limit)]
+
+    def pop_due_items(self, day, limit):
+        """pop_due() as (index, due) pairs."""
+        taken = []
+        heap = self._heap
+        while heap and len(taken) < limit and heap[0][0] <= day:
+            due, index = heapq.heappop(heap)
+            if self._due.get(index) == due:   # skip entries rescheduled since
+                del self._due[index]
+                taken.append((index, due))
+        return taken
+
+
+class ReviewScheduler:
+    """
+    Hands out each day's reviews over a plan: the topics due (at most
+    MAX_REVIEWS_PER_DAY and MAX_REVIEW_SHARE of the day), then requeues them
+    at their next interval as if they were done. Overdue reviews that don't
+    fit wait for the next day. Only topics with no study session left to
+    plan (remaining_minutes below REVIEW_MINUTES) are reviewed; for the others
+    the next study session is the review. Reviews handed out but not planned
+    (no free slot could take them) are given back with put_back().
+    topics: records as built by planner_loader; take() returns their indices.
+    entries: the (index, due date) pairs to queue (see due_review_entries()),
+    by default every topic up for review.
+    """
+
+    __slots__ = ("topics", "queue", "times_studied", "taken")
+
+    def __init__(self, topics, entries=None):
+        self.topics = topics
+        self.queue = ReviewQueue(due_review_entries(topics) if entries is None else entries)
+        self.times_studied = {}   # index -> times_studied including the planned reviews
+        self.taken = {}   # topic_id -> (index, due date) of the last take()
+
+    def take(self, day, day_minutes):
+        limit = min(MAX_REVIEWS_PER_DAY, int(day_minutes * MAX_REVIEW_SHARE) // REVIEW_MINUTES)
+        items = self.queue.pop_due_items(day, limit) if limit > 0 else []
+        self.taken = {}
+        for i, due in items:
+            t = self.topics[i]
+            times = self.times_studied.get(i, t.times_studied or 0) + 1
+            self.times_studied[i] = times
+            self.queue.update(i, day + timedelta(days=review_interval_days(times, t.confidence)))
+            self.taken[t.topic_id] = (i, due)
+        return [i for i, _ in items]
+
+    def put_back(self, topic_ids):
+        """
+        Undo take() for the reviews of topic_ids (from the last take()) that
+        were not planned: they stay due at their date, so the next day takes
+        them first.
+        """
+        for topic_id in topic_ids:
+            i, due = self.taken.pop(topic_id)
+            self.times_studied[i] -= 1
+            self.queue.update(i, due)
+
+
+def due_review_entries(topics, start_date=None, days=None):
+    """
+    (index, due date) of the topics up for review. For a plan of days days
+    from start_date, only the MAX_REVIEWS_PER_DAY * days most overdue of those
+    due by its last day: the plan never takes the others, as each of them
+    would come after more reviews than it has room for (reviews taken are
+    requeued at their next interval, after the day).
+    """
+    entries = (
+        (t.next_review_date, i) for i, t in enumerate(topics)
+        if t.next_review_date is not None and t.remaining_minutes < REVIEW_MINUTES
+    )
+    if days is not None:
+        last_day = start_date + timedelta(days=days - 1)
+        entries = heapq.nsmallest(
+            MAX_REVIEWS_PER_DAY * days, (e for e in entries if e[0] <= last_day)
+        )
+    return [(i, due) for due, i in entries]
+
+
+def review_scheduler(topics, start_date=None, days=None):
+    """
+    A ReviewScheduler for a plan of days days from start_date (see
+    due_review_entries()), None if no topic is due for review in it. Its
+    queue holds at most MAX_REVIEWS_PER_DAY entries per day, however many
+    topics there are.
+    """
+    entries = due_review_entries(topics, start_date, days)
+    return ReviewScheduler(topics, entries) if entries else None
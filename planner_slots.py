@@ -0,0 +1,145 @@
+# planner_slots.py
+# Availability windows and slot packing: turns a user's weekly windows and
+# blackouts into the free slots of each day and places a day's sessions in
+# them. Times are minutes from midnight. Like planner_engine, nothing here
+# touches the database or the clock.
+
+MINUTES_PER_DAY = 24 * 60
+DEFAULT_WINDOW = (8 * 60, MINUTES_PER_DAY)  # planner.DEFAULT_START_TIME until midnight
+
+
+def merge_intervals(intervals):
+    """Sorted, disjoint [start, end) intervals covering the same minutes."""
+    merged = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(intervals, cuts):
+    """intervals minus cuts, both sorted and disjoint (see merge_intervals())."""
+    result = []
+    k = 0
+    for start, end in intervals:
+        while k < len(cuts) and cuts[k][1] <= start:
+            k += 1
+        j = k
+        while j < len(cuts) and cuts[j][0] < end:
+            if cuts[j][0] > start:
+                result.append((start, cuts[j][0]))
+            start = max(start, cuts[j][1])
+            j += 1
+        if start < end:
+            result.append((start, end))
+    return result
+
+
+class SlotIndex:
+    """
+    The free slots of one day in a segment tree over their positions that keeps
+    the longest free slot of every subtree: finding the earliest slot with
+    enough room and shrinking it after a booking both take O(log n) for n
+    slots, however many sessions are packed.
+    """
+
+    __slots__ = ("starts", "ends", "size", "tree")
+
+    def __init__(self, slots):
+        self.starts = [start for start, _ in slots]
+        self.ends = [end for _, end in slots]
+        self.size = 1
+        while self.size < len(slots):
+            self.size *= 2
+        self.tree = [0] * (2 * self.size)
+        for k, (start, end) in enumerate(slots):
+            self.tree[self.size + k] = end - start
+        for i in range(self.size - 1, 0, -1):
+            self.tree[i] = max(self.tree[2 * i], self.tree[2 * i + 1])
+
+    def place(self, minutes, gap=0):
+        """
+        Book `minutes` at the start of the earliest slot that has them and keep
+        `gap` minutes after it free (a break, as far as the slot reaches).
+        Returns the start minute, or None if no slot is long enough.
+        """
+        if not self.starts or self.tree[1] < minutes:
+            return None
+        i = 1
+        while i < self.size:
+            i = 2 * i if self.tree[2 * i] >= minutes else 2 * i + 1
+        k = i - self.size
+        start = self.starts[k]
+        self.starts[k] = min(start + minutes + gap, self.ends[k])
+        self.tree[i] = self.ends[k] - self.starts[k]
+        i //= 2
+        while i:
+            self.tree[i] = max(self.tree[2 * i], self.tree[2 * i + 1])
+            i //= 2
+        return start
+
+
+def usable_minutes(slots, session_minutes, break_minutes, minimum_minutes):
+    """
+    Study minutes the slots can hold in sessions of at most session_minutes with
+    a break after each: an upper bound for the day's plan, the packing
+    decides the rest.
+    """
+    total = 0
+    for start, end in slots:
+        length = end - start
+        if length >= minimum_minutes:
+            total += length - break_minutes * (length // (session_minutes + break_minutes))
+    return total
+
+
+def format_minutes(minute):
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+def pack_sessions(sessions, slot_index, break_minutes):
+    """
+    Place sessions (in priority order) in the earliest free slot each fits,
+    with break_minutes after each. Returns (placed, unplaced): placed are
+    copies with a "start_time" ("HH:MM") in time order, unplaced the sessions
+    no slot could take.
+    """
+    placed = []
+    unplaced = []
+    for s in sessions:
+        start = slot_index.place(s["duration_minutes"], break_minutes)
+        if start is None:
+            unplaced.append(s)
+        else:
+            placed.append((start, dict(s, start_time=format_minutes(start))))
+    placed.sort(key=lambda p: p[0])
+    return [s for _, s in placed], unplaced
+
+
+class Availability:
+    """
+    A user's study windows: weekly windows per weekday (0 = Monday) and
+    blackouts per date, each a list of merged (start, end) minute intervals.
+    Without any weekly window every day has default_window; otherwise only
+    the weekdays with windows have slots.
+    """
+
+    __slots__ = ("weekly", "blackouts", "default_window")
+
+    def __init__(self, weekly, blackouts, default_window):
+        self.weekly = weekly
+        self.blackouts = blackouts
+        self.default_window = default_window
+
+    def free_slots(self, day):
+        windows = self.weekly.get(day.weekday(), []) if self.weekly else [self.default_window]
+        cuts = self.blackouts.get(day)
+        return subtract_intervals(windows, cuts) if cuts else list(windows)
+
+    def slot_index(self, day):
+        return SlotIndex(self.free_slots(day))
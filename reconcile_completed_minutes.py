@@ -0,0 +1,112 @@
+"""
+Rebuild the per-topic study rollup from study_sessions: topics.completed_minutes,
+times_studied and last_studied, and the next_review_date derived from them
+(planner_reviews). planner.set_session_status() keeps them in
+step as sessions are completed; run this once after adding the
+completed_minutes column (backfill) and then now and then, e.g. nightly, to
+repair drift from sessions changed outside the app.
+
+Topics are processed in topic_id ranges of --chunk-size, one transaction per
+range (an UPDATE for the rollup, then one for next_review_date, which has to
+see the rebuilt rollup), and only rows that differ are written.
+
+    python reconcile_completed_minutes.py
+    python reconcile_completed_minutes.py --dry-run   # only count drifted topics
+"""
+import argparse
+import sys
+import time
+
+from db import get_connection
+from planner_reviews import NEXT_REVIEW_SQL
+
+COMPLETED_SQL = """
+    SELECT topic_id,
+           SUM(duration_minutes) AS minutes,
+           COUNT(*) AS sessions,
+           MAX(DATE(completion_date)) AS last_completed
+    FROM study_sessions
+    WHERE status='completed' AND topic_id BETWEEN %s AND %s
+    GROUP BY topic_id
+"""
+
+DRIFT_CONDITION = """
+    t.topic_id BETWEEN %s AND %s
+    AND (t.completed_minutes <> COALESCE(c.minutes, 0)
+         OR COALESCE(t.times_studied, 0) <> COALESCE(c.sessions, 0)
+         OR (c.last_completed IS NOT NULL AND NOT (t.last_studied <=> c.last_completed)))
+"""
+
+COUNT_DRIFT_SQL = f"""
+    SELECT COUNT(*)
+    FROM topics t
+    LEFT JOIN ({COMPLETED_SQL}) c ON c.topic_id = t.topic_id
+    WHERE {DRIFT_CONDITION}
+"""
+
+RECONCILE_SQL = f"""
+    UPDATE topics t
+    LEFT JOIN ({COMPLETED_SQL}) c ON c.topic_id = t.topic_id
+    SET t.completed_minutes = COALESCE(c.minutes, 0),
+        t.times_studied = COALESCE(c.sessions, 0),
+        t.last_studied = COALESCE(c.last_completed, t.last_studied)
+    WHERE {DRIFT_CONDITION}
+"""
+
+# A multiple-table UPDATE does not guarantee the order of its assignments, so
+# next_review_date is recomputed by a single-table UPDATE after RECONCILE_SQL
+REVIEW_DRIFT_CONDITION = f"topic_id BETWEEN %s AND %s AND NOT (next_review_date <=> {NEXT_REVIEW_SQL})"
+
+COUNT_REVIEW_DRIFT_SQL = f"SELECT COUNT(*) FROM topics WHERE {REVIEW_DRIFT_CONDITION}"
+
+RECONCILE_REVIEW_SQL = f"UPDATE topics SET next_review_date = {NEXT_REVIEW_SQL} WHERE {REVIEW_DRIFT_CONDITION}"
+
+
+def reconcile(chunk_size, dry_run=False):
+    """Returns (topics scanned up to, drifted rows; a topic whose rollup and review date drifted counts twice)."""
+    db = get_connection()
+    cur = db.cursor()
+    drifted = 0
+    try:
+        cur.execute("SELECT COALESCE(MIN(topic_id), 0), COALESCE(MAX(topic_id), 0) FROM topics")
+        first, last = cur.fetchone()
+        db.commit()
+        for lo in range(first, last + 1, chunk_size):
+            hi = lo + chunk_size - 1
+            params = (lo, hi, lo, hi)
+            try:
+                if dry_run:
+                    cur.execute(COUNT_DRIFT_SQL, params)
+                    drifted += cur.fetchone()[0]
+                    cur.execute(COUNT_REVIEW_DRIFT_SQL, (lo, hi))
+                    drifted += cur.fetchone()[0]
+                else:
+                    cur.execute(RECONCILE_SQL, params)
+                    drifted += cur.rowcount
+                    cur.execute(RECONCILE_REVIEW_SQL, (lo, hi))
+                    drifted += cur.rowcount
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            print(f"topics {lo}-{hi}: {drifted} drifted so far", file=sys.stderr)
+    finally:
+        cur.close()
+        db.close()
+    return last, drifted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=5000, help="topic_ids per UPDATE / transaction")
+    parser.add_argument("--dry-run", action="store_true", help="count drifted topics without fixing them")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    last, drifted = reconcile(args.chunk_size, args.dry_run)
+    action = "found" if args.dry_run else "fixed"
+    print(f"{action} {drifted} drifted topics up to topic_id {last} in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
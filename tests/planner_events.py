@@ -0,0 +1,104 @@
+"""
+Change events for the incremental re-planning tests and benchmarks: synthetic
+topics, random edits (completed sessions, topic edits, moved exams) and
+apply_change(), which applies one to the inputs of a planner_engine.WeekPlan
+for planner_engine.replan_week().
+"""
+import copy
+import datetime
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planner_engine import minutes_from_hours  # noqa: E402
+from planner_loader import TopicRecord  # noqa: E402
+
+START_DATE = datetime.date(2025, 1, 6)
+
+
+def review_fields(rng):
+    """(times_studied, next_review_date) of a topic, studied or not."""
+    if rng.random() < 0.5:
+        return 0, None
+    return rng.randint(1, 8), START_DATE + datetime.timedelta(days=rng.randint(-10, 10))
+
+
+def synthetic_topics(rng, n_topics):
+    n_subjects = max(1, n_topics // 5)
+    topics = []
+    for tid in range(1, n_topics + 1):
+        hours = rng.choice([0.5, 1.0, 2.0, 4.0, 8.0])
+        topics.append(TopicRecord(
+            tid, rng.randint(1, n_subjects), "Subject", f"Topic {tid}",
+            rng.randint(1, 5), rng.randint(1, 5), rng.randint(1, 5), hours,
+            rng.choice([0, 10, 30, 60, 120, 240, int(hours * 60)]),
+            *review_fields(rng),
+        ))
+    next_exam_by_subject = {
+        sid: START_DATE + datetime.timedelta(days=rng.randint(-2, 40))
+        for sid in range(1, n_subjects + 1) if rng.random() < 0.7
+    }
+    return topics, next_exam_by_subject
+
+
+def random_event(rng, state):
+    topic = rng.choice(state.topics)
+    kind = rng.random()
+    if kind < 0.35:
+        return {"type": "session_completed", "topic_id": topic.topic_id, "minutes": rng.choice([10, 25, 50, 200, -50])}
+    if kind < 0.7:
+        field, value = rng.choice([
+            ("confidence", rng.randint(1, 5)),
+            ("difficulty", rng.randint(1, 5)),
+            ("importance", rng.randint(1, 5)),
+            ("hours_required", rng.choice([0.5, 1.0, 3.0, 10.0])),
+            ("topic_name", "Renamed"),
+            ("next_review_date", review_fields(rng)[1]),
+        ])
+        return {"type": "topic_updated", "topic_id": topic.topic_id, field: value}
+    exam_date = rng.choice([None, START_DATE + datetime.timedelta(days=rng.randint(-2, 45))])
+    return {"type": "exam_moved", "subject_id": topic.subject_id, "exam_date": exam_date}
+
+
+def apply_change(previous, event):
+    """
+    The inputs of a WeekPlan with one change event applied, as
+    (topics, next_exam_by_subject) for replan_week(). Events:
+    - {"type": "session_completed", "topic_id": ..., "minutes": ...}
+      (negative minutes undo a completion)
+    - {"type": "topic_updated", "topic_id": ..., <TopicRecord field>: value, ...}
+      (a new hours_required also moves remaining_minutes, unless given)
+    - {"type": "exam_moved", "subject_id": ..., "exam_date": date or None}
+    The changed topic is copied; previous is not modified. The app replans
+    from reloaded rows instead; this simulates its edits.
+    """
+    topics = list(previous.topics)
+    next_exam_by_subject = dict(previous.next_exam_by_subject)
+    kind = event["type"]
+
+    if kind == "exam_moved":
+        if event["exam_date"] is None:
+            next_exam_by_subject.pop(event["subject_id"], None)
+        else:
+            next_exam_by_subject[event["subject_id"]] = event["exam_date"]
+        return topics, next_exam_by_subject
+
+    if kind not in ("session_completed", "topic_updated"):
+        raise ValueError(f"Unknown change event type: {kind}")
+    for i, t in enumerate(topics):
+        if t.topic_id == event["topic_id"]:
+            break
+    else:
+        raise KeyError(f"Topic {event['topic_id']} is not in the plan")
+
+    t = topics[i] = copy.copy(t)
+    if kind == "session_completed":
+        t.remaining_minutes -= event["minutes"]
+    else:
+        fields = {k: v for k, v in event.items() if k not in ("type", "topic_id")}
+        if "hours_required" in fields and "remaining_minutes" not in fields:
+            t.remaining_minutes += minutes_from_hours(fields["hours_required"]) - minutes_from_hours(t.hours_required)
+        for name, value in fields.items():
+            setattr(t, name, value)
+    return topics, next_exam_by_subject
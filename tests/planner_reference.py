@@ -0,0 +1,129 @@
+"""
+Reference weekly allocator for the planner tests and benchmarks: the former
+day loop of generate_weekly_plan (per-day scoring and sort-and-rescan greedy
+passes), which planner_engine.plan_week must reproduce, and the synthetic
+users both are run on.
+"""
+import datetime
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planner_engine import (  # noqa: E402
+    SESSION_MINIMUM_MINUTES,
+    SESSION_PREFERRED_MINUTES,
+    compute_priority_score,
+    compute_urgency_multiplier,
+    plan_week,
+)
+from planner_loader import TopicRecord  # noqa: E402
+
+
+def reference_allocate_day(todays, minutes_left):
+    """The greedy passes as they were before planner_engine.allocate_day()."""
+    todays.sort(key=lambda x: x["effective_priority"], reverse=True)
+    sessions = []
+    for cand in todays:
+        while minutes_left >= SESSION_PREFERRED_MINUTES and cand["remaining_minutes"] >= SESSION_PREFERRED_MINUTES:
+            alloc = SESSION_PREFERRED_MINUTES
+            sessions.append({
+                "topic_id": cand["topic_id"],
+                "subject_id": cand["subject_id"],
+                "subject_name": cand["subject_name"],
+                "topic_name": cand["topic_name"],
+                "duration_minutes": alloc,
+                "days_until_exam": cand["days_until_exam"]
+            })
+            cand["remaining_minutes"] -= alloc
+            minutes_left -= alloc
+
+    todays = [t for t in todays if t["remaining_minutes"] >= SESSION_MINIMUM_MINUTES]
+    todays.sort(key=lambda x: x["effective_priority"], reverse=True)
+    while minutes_left >= SESSION_MINIMUM_MINUTES and todays:
+        chosen = None
+        for c in todays:
+            if c["remaining_minutes"] >= SESSION_MINIMUM_MINUTES:
+                chosen = c
+                break
+        if not chosen:
+            break
+        alloc = min(chosen["remaining_minutes"], SESSION_PREFERRED_MINUTES, minutes_left)
+        if alloc < SESSION_MINIMUM_MINUTES:
+            break
+        sessions.append({
+            "topic_id": chosen["topic_id"],
+            "subject_id": chosen["subject_id"],
+            "subject_name": chosen["subject_name"],
+            "topic_name": chosen["topic_name"],
+            "duration_minutes": int(alloc),
+            "days_until_exam": chosen["days_until_exam"]
+        })
+        chosen["remaining_minutes"] -= alloc
+        minutes_left -= alloc
+        todays = [t for t in todays if t["remaining_minutes"] >= SESSION_MINIMUM_MINUTES]
+        todays.sort(key=lambda x: x["effective_priority"], reverse=True)
+    return sessions, minutes_left
+
+
+def reference_week(topics_by_id, next_exam_by_subject, daily_minutes, start_date):
+    """The day loop of generate_weekly_plan as it was before planner_engine."""
+    week = []
+    for day_offset in range(7):
+        plan_date = start_date + datetime.timedelta(days=day_offset)
+        todays = []
+        for t in topics_by_id.values():
+            if t["remaining_minutes"] <= 0:
+                continue
+            next_exam = next_exam_by_subject.get(t["subject_id"])
+            days_until = (next_exam - plan_date).days if next_exam else None
+            priority_score = compute_priority_score(t["difficulty"], t["importance"], t["confidence"])
+            urgency_multiplier = compute_urgency_multiplier(days_until if days_until is not None else 9999)
+            spaced = 1.2 if t["confidence"] < 3 else 1.0
+            todays.append({
+                "topic_id": t["topic_id"],
+                "subject_id": t["subject_id"],
+                "subject_name": t["subject_name"],
+                "topic_name": t["topic_name"],
+                "remaining_minutes": t["remaining_minutes"],
+                "effective_priority": priority_score * urgency_multiplier * spaced,
+                "days_until_exam": days_until
+            })
+        sessions, minutes_left = reference_allocate_day(todays, daily_minutes)
+        for s in sessions:
+            topics_by_id[s["topic_id"]]["remaining_minutes"] -= s["duration_minutes"]
+        week.append((sessions, minutes_left))
+    return week
+
+
+def engine_week(topics_by_id, next_exam_by_subject, daily_minutes, start_date):
+    topics = [
+        TopicRecord(t["topic_id"], t["subject_id"], t["subject_name"], t["topic_name"], t["difficulty"],
+                    t["importance"], t["confidence"], t["remaining_minutes"] / 60, t["remaining_minutes"])
+        for t in topics_by_id.values()
+    ]
+    plan = plan_week(topics, daily_minutes / 60, next_exam_by_subject, start_date)
+    return [(day["sessions"], day["available_minutes_left"]) for day in plan]
+
+
+def synthetic_user(rng, n_topics, start_date):
+    n_subjects = max(1, n_topics // 10)
+    topics_by_id = {}
+    for tid in range(1, n_topics + 1):
+        subject_id = rng.randint(1, n_subjects)
+        topics_by_id[tid] = {
+            "topic_id": tid,
+            "subject_id": subject_id,
+            "subject_name": f"Subject {subject_id}",
+            "topic_name": f"Topic {tid}",
+            # small ranges so equal priorities (ties) are common
+            "difficulty": rng.randint(1, 5),
+            "importance": rng.randint(1, 5),
+            "confidence": rng.randint(1, 5),
+            "remaining_minutes": rng.choice([5, 20, 25, 30, 45, 50, 60, 75, 100, 150, 240]),
+        }
+    next_exam_by_subject = {
+        sid: start_date + datetime.timedelta(days=rng.randint(-2, 40))
+        for sid in range(1, n_subjects + 1) if rng.random() < 0.8
+    }
+    return topics_by_id, next_exam_by_subject
@@ -0,0 +1,68 @@
+"""
+Opening connections on demand in the vendored MySQL connector pool: when
+opening the connection for a reserved slot fails, a caller waiting for that
+slot gets it instead of waiting forever. Runs without a server:
+
+    python -m unittest discover tests
+"""
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "libs"))
+
+from mysql.connector import errors  # noqa: E402
+from mysql.connector.connection import MySQLConnection  # noqa: E402
+from mysql.connector.pooling import MySQLConnectionPool  # noqa: E402
+
+
+class GrowFailureTest(unittest.TestCase):
+    def test_failed_connect_hands_slot_to_waiter(self):
+        pool = MySQLConnectionPool(
+            pool_size=1, pool_name="grow_failure", pool_lazy=True, pool_block=True,
+            pool_reset_session=False, pool_validation="lazy", host="127.0.0.1",
+        )
+        self.addCleanup(pool.close)
+        fresh = MySQLConnection()
+        fresh.pool_config_version = pool._config_version
+        connecting = threading.Event()
+        fail = threading.Event()
+
+        def open_connection():
+            if not connecting.is_set():
+                connecting.set()
+                fail.wait(5)
+                raise errors.InterfaceError("Can't connect to MySQL server")
+            return fresh
+
+        results = {}
+
+        def checkout(name):
+            try:
+                results[name] = pool.get_connection(timeout=5)
+            except errors.Error as err:
+                results[name] = err
+
+        with mock.patch.object(pool, "_open_connection", side_effect=open_connection):
+            first = threading.Thread(target=checkout, args=("first",))
+            first.start()
+            self.assertTrue(connecting.wait(5))
+            second = threading.Thread(target=checkout, args=("second",))
+            second.start()
+            while not pool.stats()["waiting"]:
+                time.sleep(0.001)
+            fail.set()
+            first.join(5)
+            second.join(5)
+
+        self.assertIsInstance(results["first"], errors.InterfaceError)
+        self.assertIs(results["second"]._cnx, fresh)
+        self.assertEqual(pool.stats()["waiting"], 0)
+        self.assertEqual(pool.stats()["wait_timeouts"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
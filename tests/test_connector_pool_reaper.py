@@ -0,0 +1,109 @@
+"""
+Background validation (DB_POOL_VALIDATION="background") of the vendored MySQL
+connector pool: connections the reaper pings are not in use, and the slot of
+one found broken goes to a waiting caller. Runs without a server:
+
+    python -m unittest discover tests
+"""
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "libs"))
+
+from mysql.connector.connection import MySQLConnection  # noqa: E402
+from mysql.connector.pooling import MySQLConnectionPool  # noqa: E402
+
+
+class SlowPingConnection(MySQLConnection):
+    """Answers a ping once `answer` is set, with `alive`."""
+
+    def __init__(self, alive):
+        super().__init__()
+        self.alive = alive
+        self.pinging = threading.Event()
+        self.answer = threading.Event()
+
+    def is_connected(self):
+        self.pinging.set()
+        self.answer.wait(5)
+        return self.alive
+
+    def disconnect(self):
+        pass
+
+
+class ReaperTest(unittest.TestCase):
+    def make_pool(self, cnx):
+        pool = MySQLConnectionPool(
+            pool_size=1, pool_name="background_validation", pool_lazy=True,
+            pool_reset_session=False, pool_validation="background",
+            pool_validation_interval=3600.0, host="127.0.0.1",
+        )
+        self.addCleanup(pool.close)
+        # Due for a ping on the next _reap_connections(), run by the test
+        # rather than by the hourly reaper thread
+        pool._validation_interval = 0.0
+        cnx.pool_config_version = pool._config_version
+        with pool._lock:
+            pool._cnx_created[cnx] = 0.0
+            pool._queue_connection(cnx)
+        return pool
+
+    def reap_in_background(self, pool, cnx):
+        reaper = threading.Thread(target=pool._reap_connections)
+        reaper.start()
+        self.assertTrue(cnx.pinging.wait(5))
+        return reaper
+
+    def test_checkout_waits_for_connection_being_pinged(self):
+        cnx = SlowPingConnection(alive=True)
+        pool = self.make_pool(cnx)
+        reaper = self.reap_in_background(pool, cnx)
+        self.assertEqual(pool.stats()["validating"], 1)
+        self.assertEqual(pool.stats()["in_use"], 0)
+
+        got = []
+        checkout = threading.Thread(target=lambda: got.append(pool.get_connection(block=False)))
+        checkout.start()
+        cnx.answer.set()
+        checkout.join(5)
+        reaper.join(5)
+
+        self.assertIs(got[0]._cnx, cnx)
+        self.assertEqual(pool.stats()["exhausted"], 0)
+
+    def test_broken_connection_hands_its_slot_to_a_waiter(self):
+        cnx = SlowPingConnection(alive=False)
+        pool = self.make_pool(cnx)
+        reaper = self.reap_in_background(pool, cnx)
+
+        fresh = SlowPingConnection(alive=True)
+        fresh.answer.set()
+        fresh.pool_config_version = pool._config_version
+        got = []
+        with mock.patch.object(pool, "_open_connection", return_value=fresh):
+            checkout = threading.Thread(target=lambda: got.append(pool.get_connection(timeout=5)))
+            checkout.start()
+            while not pool.stats()["waiting"]:
+                time.sleep(0.001)
+            cnx.answer.set()
+            checkout.join(5)
+            reaper.join(5)
+
+        self.assertIs(got[0]._cnx, fresh)
+        self.assertEqual(pool.open_connections, 1)
+
+    def test_close_stops_reaper(self):
+        cnx = SlowPingConnection(alive=True)
+        pool = self.make_pool(cnx)
+        self.assertEqual(pool.close(), 1)
+        self.assertTrue(pool._reaper_stop.is_set())
+        self.assertEqual(pool.open_connections, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+"""
+Lazy pool validation (DB_POOL_VALIDATION="lazy") of the vendored MySQL
+connector: a connection whose command failed with a connection error is
+validated on its next checkout, even when the caller handled the error.
+Runs without a server:
+
+    python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "libs"))
+
+from mysql.connector import errors  # noqa: E402
+from mysql.connector.connection import MySQLConnection  # noqa: E402
+from mysql.connector.pooling import MySQLConnectionPool, PooledMySQLConnection  # noqa: E402
+
+
+class ConnectionErrorTest(unittest.TestCase):
+    def test_failed_command_marks_connection_errored(self):
+        cnx = MySQLConnection()
+        self.assertFalse(cnx.connection_errored)
+        with self.assertRaises(errors.OperationalError):
+            cnx.cmd_query("SELECT 1")
+        self.assertTrue(cnx.connection_errored)
+
+    def test_pooled_close_has_errored_connection_validated(self):
+        pool = MySQLConnectionPool(
+            pool_size=1, pool_name="lazy_validation", pool_lazy=True,
+            pool_reset_session=False, pool_validation="lazy", host="127.0.0.1",
+        )
+        cnx = MySQLConnection()
+        # Stand in for a connection the pool opened and last saw working
+        pool._cnx_created[cnx] = pool._cnx_validated[cnx] = 0.0
+        pooled = PooledMySQLConnection(pool, cnx)
+        try:
+            pooled.cmd_query("SELECT 1")
+        except errors.OperationalError:
+            pass  # handled by the caller, as db.RequestConnection users may
+        pooled.close()
+
+        self.assertNotIn(cnx, pool._cnx_validated)
+        self.assertTrue(pool._needs_validation(cnx, 0.0))
+        self.assertFalse(cnx.connection_errored)
+        self.assertEqual(pool._cnx_queue.qsize(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
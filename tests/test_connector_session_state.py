@@ -0,0 +1,42 @@
+"""
+Session state tracking of the vendored MySQL connector, which decides whether
+the pool resets a connection on return (DB_POOL_RESET_STRATEGY="dirty").
+Runs without a server:
+
+    python -m unittest discover tests
+"""
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "libs"))
+
+from mysql.connector.connection import MySQLConnection  # noqa: E402
+
+try:
+    from mysql.connector.connection_cext import CMySQLConnection
+except ImportError:  # C extension not built
+    CMySQLConnection = None
+
+
+class InitDbTest(unittest.TestCase):
+    def test_init_db_marks_session_dirty(self):
+        cnx = MySQLConnection()
+        self.assertFalse(cnx.session_dirty)
+        with mock.patch.object(cnx, "_send_cmd", return_value=b""), \
+                mock.patch.object(cnx, "_handle_ok", return_value={}):
+            cnx.cmd_init_db("other_schema")
+        self.assertTrue(cnx.session_dirty)
+
+    @unittest.skipIf(CMySQLConnection is None, "C extension not available")
+    def test_cext_init_db_marks_session_dirty(self):
+        cnx = CMySQLConnection()
+        cnx._cmysql = mock.Mock()
+        self.assertFalse(cnx.session_dirty)
+        cnx.cmd_init_db("other_schema")
+        self.assertTrue(cnx.session_dirty)
+
+
+if __name__ == "__main__":
+    unittest.main()
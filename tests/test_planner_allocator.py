@@ -0,0 +1,32 @@
+"""
+planner_engine.plan_week against the reference greedy allocator
+(planner_reference.reference_week) on a fixed set of random users, ties in
+priority included:
+
+    python -m unittest discover tests
+"""
+import copy
+import datetime
+import random
+import unittest
+
+from planner_reference import engine_week, reference_week, synthetic_user
+
+START_DATE = datetime.date(2025, 1, 6)
+CASES = 300
+SEED = 1
+
+
+class PlanWeekEquivalenceTest(unittest.TestCase):
+    def test_plan_week_matches_reference(self):
+        rng = random.Random(SEED)
+        for case in range(CASES):
+            topics_by_id, exams = synthetic_user(rng, rng.randint(0, 60), START_DATE)
+            daily_minutes = rng.choice([25, 30, 60, 75, 120, 180, 300, 600])
+            expected = reference_week(copy.deepcopy(topics_by_id), exams, daily_minutes, START_DATE)
+            actual = engine_week(topics_by_id, exams, daily_minutes, START_DATE)
+            self.assertEqual(actual, expected, f"case {case}: plan_week differs from the reference")
+
+
+if __name__ == "__main__":
+    unittest.main()
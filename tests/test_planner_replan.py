@@ -0,0 +1,38 @@
+"""
+planner_engine.replan_week against planning from scratch: after each of a few
+random change events (planner_events) on a fixed set of random weeks, the
+incrementally updated plan must equal plan_week for the changed inputs:
+
+    python -m unittest discover tests
+"""
+import random
+import unittest
+
+from planner_events import START_DATE, apply_change, random_event, synthetic_topics
+from planner_engine import plan_diff, plan_week, plan_week_state, replan_week  # noqa: E402  (path set by planner_events)
+
+CASES = 300
+EVENTS = 5
+SEED = 1
+
+
+class ReplanWeekEquivalenceTest(unittest.TestCase):
+    def test_replan_week_matches_full_plan(self):
+        rng = random.Random(SEED)
+        for case in range(CASES):
+            topics, exams = synthetic_topics(rng, rng.randint(1, 40))
+            daily_hours = rng.choice([0.5, 1.0, 2.0, 3.0, 6.0])
+            state = plan_week_state(topics, daily_hours, exams, START_DATE)
+            self.assertEqual(state.plan, plan_week(topics, daily_hours, exams, START_DATE),
+                             f"case {case}: plan_week_state differs from plan_week")
+            for step in range(EVENTS):
+                previous = state.plan
+                topics, exams = apply_change(state, random_event(rng, state))
+                state, diff = replan_week(state, topics, daily_hours, exams)
+                self.assertEqual(state.plan, plan_week(topics, daily_hours, exams, START_DATE),
+                                 f"case {case}, event {step}: replan_week differs from plan_week")
+                self.assertEqual(diff, plan_diff(previous, state.plan), f"case {case}, event {step}: wrong diff")
+
+
+if __name__ == "__main__":
+    unittest.main()